@@ -19,6 +19,8 @@ from app.api.routes.update_meal_log import router as update_meal_log_router
 from app.api.routes.workout_progress import router as workout_progress_router
 from app.api.routes.progress_chart import router as progress_chart_router
 from app.api.routes.workout_charts import router as workout_charts_router
+from app.api.routes.sync import router as sync_router
+from app.api.routes.dashboard import router as dashboard_router
 
 # Main API v1 router
 api_router = APIRouter()
@@ -40,3 +42,5 @@ api_router.include_router(workout_progress_router, prefix="/progress", tags=["Wo
 api_router.include_router(api_key_router, prefix="/api-keys", tags=["API Keys"])
 api_router.include_router(progress_chart_router,  tags=["Progress Charts"])
 api_router.include_router(workout_charts_router,  tags=["Progress Charts"])
+api_router.include_router(sync_router)
+api_router.include_router(dashboard_router)
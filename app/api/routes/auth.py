@@ -7,17 +7,20 @@ from app.db.mongodb import db
 from app.models.auth import User
 from app.core.security import hash_password, verify_password
 from app.core.auth import create_jwt_token
+from app.core.rate_limit import RATE_LIMITS, enforce_rate_limit, rate_limit
 from app.utils.api_response import api_response
 from fastapi.security import OAuth2PasswordRequestForm
 import random
+from pymongo import ReturnDocument
 from app.utils.email import send_verification_email
 
 
 router = APIRouter()
 users_collection = db["users"]
 otp_collection = db["otp_codes"]
+MAX_OTP_ATTEMPTS = 5
 
-@router.post("/register")
+@router.post("/register", dependencies=[Depends(rate_limit("register"))])
 async def register_user(payload: UserCreate):
     # Check if user already exists
     if await users_collection.find_one({"email": payload.email}):
@@ -37,13 +40,17 @@ async def register_user(payload: UserCreate):
 
     insert_result = await users_collection.insert_one(user.model_dump(by_alias=True))
 
-    # Store OTP in a separate collection (recommended)
-    await otp_collection.insert_one({
-        "email": payload.email,
-        "otp": otp,
-        "created_at": datetime.now(timezone.utc), 
-        "expires_at": datetime.now(timezone.utc) + timedelta(minutes=10)
-    })
+    # Store OTP in a separate collection (recommended), expired codes are TTL-collected
+    await otp_collection.update_one(
+        {"email": payload.email},
+        {"$set": {
+            "otp": otp,
+            "created_at": datetime.now(timezone.utc),
+            "expires_at": datetime.now(timezone.utc) + timedelta(minutes=10),
+            "attempts": 0
+        }},
+        upsert=True
+    )
 
     # Send verification email
     # Send verification email
@@ -55,62 +62,55 @@ async def register_user(payload: UserCreate):
         status=status.HTTP_201_CREATED
     )
 
-@router.post("/verify")
+@router.post("/verify", dependencies=[Depends(rate_limit("verify_otp"))])
 async def verify_account(data: VerifyOTP):
-    record = await otp_collection.find_one({"email": data.email})
-
-    if not record:
-        return api_response(message="No OTP found for this email", status=404)
-
-    # Update attempt count
-    await otp_collection.update_one(
-        {"_id": record["_id"]},
-        {"$inc": {"attempts": 1}}
+    # Single atomic round trip: only an unexpired code with attempts left matches,
+    # the attempt is counted, and a correct code is consumed by expiring it now
+    record = await otp_collection.find_one_and_update(
+        {
+            "email": data.email,
+            "expires_at": {"$gt": datetime.now(timezone.utc)},
+            "attempts": {"$not": {"$gte": MAX_OTP_ATTEMPTS}}
+        },
+        [
+            {"$set": {
+                "attempts": {"$add": [{"$ifNull": ["$attempts", 0]}, 1]},
+                # $literal: a submitted "$otp" must not be read as the stored field
+                "verified": {"$eq": ["$otp", {"$literal": data.otp}]}
+            }},
+            {"$set": {"expires_at": {"$cond": ["$verified", "$$NOW", "$expires_at"]}}}
+        ],
+        projection={"verified": 1},
+        return_document=ReturnDocument.AFTER
     )
 
-    # Enforce retry limit
-    if record.get("attempts", 0) >= 5:
-        return api_response(message="Too many invalid attempts. Please request a new OTP.", status=429)
-
-    # Check expiration
-    expires_at = record["expires_at"]
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-    if datetime.now(timezone.utc) > expires_at:
-        return api_response(message="OTP expired", status=400)
+    if not record:
+        return api_response(
+            message="OTP expired or too many invalid attempts. Please request a new OTP.",
+            status=429
+        )
 
-    if data.otp != record["otp"]:
+    if not record["verified"]:
         return api_response(message="Invalid OTP", status=400)
 
     # Success
     await users_collection.update_one({"email": data.email}, {"$set": {"is_verified": True}})
-    await otp_collection.delete_one({"_id": record["_id"]})
     return api_response(message="Email verified successfully", status=200)
 
 
 
 @router.post("/resend-otp")
 async def resend_otp(data: ResendOTP):  # expects email in payload
-    user = await users_collection.find_one({"email": data.email})
+    # One resend per email per minute
+    await enforce_rate_limit(RATE_LIMITS["resend_otp"], data.email)
+
+    user = await users_collection.find_one({"email": data.email}, {"is_verified": 1})
     if not user:
-        api_response("User not found" , status.HTTP_404_NOT_FOUND)
+        return api_response("User not found" , status.HTTP_404_NOT_FOUND)
 
     if user.get("is_verified"):
         return api_response(message="User already verified", status=400)
 
-    # Rate limit check
-    recent_otp = await otp_collection.find_one({"email": data.email})
-    if recent_otp:
-        created_at = recent_otp["created_at"]
-        print(created_at)
-    if created_at.tzinfo is None:
-        created_at = created_at.replace(tzinfo=timezone.utc)
-
-    if (datetime.now(timezone.utc) - created_at).seconds < 60:
-
-            return api_response(message="Please wait 60 seconds before resending OTP", status=429)
-
     # Generate and store new OTP
     otp = str(random.randint(100000, 999999))
     await otp_collection.update_one(
@@ -128,7 +128,7 @@ async def resend_otp(data: ResendOTP):  # expects email in payload
     return api_response(message="OTP resent successfully", status=200)
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(rate_limit("login"))])
 async def login_user(payload: OAuth2PasswordRequestForm = Depends()):
     user = await users_collection.find_one({"email": payload.username})
     
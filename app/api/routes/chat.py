@@ -1,9 +1,20 @@
-from fastapi import APIRouter, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from app.utils.groq import get_groq_chat_response
+from app.core.auth import get_current_user_id, get_optional_user_id
+from app.core.chat_cache import get_chat_cache
+from app.core.chat_memory import get_chat_memory
+from app.core.metrics import CHAT_TOPIC_DECISIONS
+from app.core.rate_limit import rate_limit
+from app.core.topic_classifier import OFF_TOPIC_REPLY, content_tokens, is_off_topic
 import re
 
 router = APIRouter()
+# Messages with fewer content words than this are treated as follow-ups of the conversation
+FOLLOW_UP_TOKENS = 4
 
 # Pydantic schema for request validation
 class ChatRequest(BaseModel):
@@ -19,15 +30,60 @@ def format_response(text: str) -> str:
     text = re.sub(r"(?m)^\* ", "• ", text)
     return text
 
-@router.post("/chat")
-async def chat(message: ChatRequest, request: Request):
+def topic_text(user_message: str, context: list) -> str:
+    """
+    The text the topic filter judges. Short follow-ups like "why?" or "what
+    about the second one" only make sense with what came before, so they are
+    judged together with the previous user turn, or the conversation summary
+    when no turn is in the prompt. Full questions are judged on their own.
+    """
+    if len(content_tokens(user_message)) >= FOLLOW_UP_TOKENS:
+        return user_message
+    previous = next((m["content"] for m in reversed(context) if m["role"] == "user"), None)
+    if previous is None and context:
+        previous = context[0]["content"]
+    return f"{previous} {user_message}" if previous else user_message
+
+@router.post("/chat", dependencies=[Depends(rate_limit("chat"))])
+async def chat(message: ChatRequest, request: Request, user_id: Optional[str] = Depends(get_optional_user_id)):
     user_message = message.message.strip()
 
     if not user_message:
         return {"response": "⚠️ Please enter a message."}
 
+    # Signed-in users get a conversation; anonymous requests stay stateless
+    memory = get_chat_memory() if user_id else None
+    context = await memory.context(user_id) if memory else []
+
     # Strict check: only allow fitness-related messages
+    if is_off_topic(topic_text(user_message, context)):
+        CHAT_TOPIC_DECISIONS.inc(decision="rejected")
+        return {"response": format_response(OFF_TOPIC_REPLY)}
+    CHAT_TOPIC_DECISIONS.inc(decision="passed")
+
+    # Cached answers are only valid for questions asked without prior context
+    chat_cache = get_chat_cache() if not context else None
+    # Answers are cached and remembered as the model's markdown, formatted only for the reply
+    if chat_cache is not None:
+        cached = chat_cache.lookup(user_message)
+        if cached is not None:
+            if memory:
+                await memory.append(user_id, user_message, cached)
+            return {"response": format_response(cached)}
+
+    response = await run_in_threadpool(get_groq_chat_response, user_message, context)
+    # Errors are returned as text by get_groq_chat_response and must not be cached or remembered
+    if not response.startswith("⚠️"):
+        if memory:
+            await memory.append(user_id, user_message, response)
+        if chat_cache is not None:
+            await chat_cache.store(user_message, response)
+    return {"response": format_response(response)}
+
 
-    response = get_groq_chat_response(user_message)
-    formatted_response = format_response(response)
-    return {"response": formatted_response}
+@router.delete("/chat/session")
+async def reset_chat_session(user_id: str = Depends(get_current_user_id)):
+    memory = get_chat_memory()
+    if memory is None or not await memory.reset(user_id):
+        raise HTTPException(status_code=404, detail="No chat session found")
+    return {"message": "Chat session cleared"}
@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Query
+from starlette.responses import Response
+
+from app.api.routes.progress_chart import CHART_POINTS, get_diet_chart_data
+from app.api.routes.workout_charts import get_workout_progress_summary
+from app.core.auth import get_current_user_id
+from app.db.mongodb import db
+from app.db.user_keys import by_user, user_key
+from app.utils.api_response import api_response
+from app.utils.precompressed import render_json
+
+router = APIRouter(tags=["Dashboard"])
+profiles_collection = db["user_profiles"]
+workout_collection = db["workout_plans"]
+
+PROFILE_PROJECTION = {
+    "_id": 0, "full_name": 1, "age": 1, "gender": 1, "height": 1, "weight": 1, "activity_level": 1, "goal": 1
+}
+# The week at a glance: day names and focus, without exercises and instructions
+PLAN_PROJECTION = {
+    "goal": 1, "workout_days_per_week": 1, "workout_duration": 1, "created_at": 1, "plan.day": 1, "plan.focus": 1
+}
+
+
+async def dashboard_profile(user_id: str):
+    return await profiles_collection.find_one(by_user(profiles_collection, user_id), PROFILE_PROJECTION)
+
+
+async def dashboard_workout_plans(user_id: str):
+    plans = await workout_collection.find(by_user(workout_collection, user_id), PLAN_PROJECTION).to_list(None)
+    for plan in plans:
+        plan["_id"] = str(plan["_id"])
+    return plans
+
+
+async def dashboard_diet_today(user_id: str):
+    """Only today's meals from the stored diet plan."""
+    plan = await db["diet_plans"].find_one(
+        {"user_id": user_key(user_id)},
+        {"_id": 0, "week_start_date": 1, "week_end_date": 1, "ai_generated_plan": 1}
+    )
+    if not plan:
+        return None
+    today = datetime.now(timezone.utc).date().isoformat()
+    day, entry = next(
+        ((day, entry) for day, entry in plan.get("ai_generated_plan", {}).items() if entry.get("date") == today),
+        (None, None)
+    )
+    return {
+        "week_start_date": plan.get("week_start_date"),
+        "week_end_date": plan.get("week_end_date"),
+        "today": {"day": day, **entry} if entry else None,
+    }
+
+
+async def dashboard_diet_chart(user_id: str):
+    result = await get_diet_chart_data(user_id=user_id, start_date=None, end_date=None, points=CHART_POINTS, mode="auto")
+    return result["data"] if result["status"] == 200 else None
+
+
+async def dashboard_workout_report(user_id: str):
+    result = await get_workout_progress_summary(user_id=user_id)
+    if result["status"] != 200 or result["data"] is None:
+        return None
+    return result["data"].model_dump()
+
+
+# Section name -> reader; the same data the home screen used to fetch with five calls
+SECTIONS = {
+    "profile": dashboard_profile,
+    "workout_plans": dashboard_workout_plans,
+    "diet_plan": dashboard_diet_today,
+    "diet_chart": dashboard_diet_chart,
+    "workout_report": dashboard_workout_report,
+}
+
+
+@router.get("/dashboard")
+async def get_dashboard(
+    user_id: str = Depends(get_current_user_id),
+    fields: Optional[str] = Query(None, description=f"Comma-separated sections to include: {', '.join(SECTIONS)}")
+):
+    if not ObjectId.is_valid(user_id):
+        return api_response(message="Invalid user ID", status=400)
+
+    names = list(SECTIONS) if not fields else [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown or not names:
+        return api_response(message=f"Unknown dashboard fields: {', '.join(unknown) or fields}", status=400)
+
+    # ⚡ All sections are read concurrently; a failing one is reported without failing the rest
+    results = await asyncio.gather(*(SECTIONS[name](user_id) for name in names), return_exceptions=True)
+
+    data, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"❌ Dashboard section {name} failed:", result)
+            errors[name] = "unavailable"
+            result = None
+        data[name] = result
+    if errors:
+        data["errors"] = errors
+
+    return Response(
+        content=render_json(api_response(message="Dashboard retrieved successfully.", status=200, data=data)),
+        media_type="application/json"
+    )
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from bson import ObjectId
 from app.db.mongodb import db
+from app.db.user_keys import user_key
 from app.core.auth import get_current_user_id
+from app.core.sync import record_deletions
 from app.utils.api_response import api_response
 
 router = APIRouter(prefix="/diet", tags=["Diet"])
@@ -10,21 +12,15 @@ router = APIRouter(prefix="/diet", tags=["Diet"])
 async def delete_diet_plan(user_id: str = Depends(get_current_user_id)):
     # Validate ObjectId
     if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid plan_id")
+        raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    # Find the diet plan
-    plan = await db["diet_plans"].find_one({"_id": ObjectId(user_id)})
+    # Delete the user's plan (looked up by owner, not by plan _id)
+    deleted = await db["diet_plans"].find_one_and_delete({"user_id": user_key(user_id)}, projection={"_id": 1})
 
     # If not found
-    if not plan:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Diet plan not found")
-
-    # Ensure the user owns the plan
-    if str(plan.get("user_id")) != user_id:
-        raise HTTPException(status_code=403, detail="You are not authorized to delete this diet plan")
-
-    # Delete the plan
-    await db["diet_plans"].delete_one({"_id": ObjectId(user_id)})
+    await record_deletions("diet_plans", user_id, [deleted["_id"]])
 
     return api_response(
         message="Diet plan deleted successfully",
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.db.mongodb import db
-from bson import ObjectId
+from app.db.user_keys import user_key
 from app.utils.api_response import api_response
 from app.core.auth import get_current_user_id
+from app.utils.dates import day_filter
+from app.core.history_cache import get_history_cache
+from app.core.sync import record_deletions
 
 router = APIRouter(prefix="/meal-log", tags=["Meal Log"])
 
@@ -11,13 +14,22 @@ async def delete_meal_log(
     date: str,
     user_id: str = Depends(get_current_user_id)
 ):
-    result = await db["meal_logs"].delete_one({
-        "user_id": ObjectId(user_id),
-        "date": date
-    })
+    try:
+        date_filter = day_filter(date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format.")
 
-    if result.deleted_count == 0:
+    deleted = await db["meal_logs"].find_one_and_delete({
+        "user_id": user_key(user_id),
+        **date_filter
+    }, projection={"_id": 1})
+
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Meal log not found")
+    await record_deletions("meal_logs", user_id, [deleted["_id"]])
+    history = get_history_cache()
+    if history is not None:
+        history.apply_meal_log_deleted(user_id, date)
 
     return api_response(
         message="Meal log deleted successfully.",
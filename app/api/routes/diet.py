@@ -1,13 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import settings
 from app.core.auth import get_current_user_id
+from app.core.plan_catalog import catalog_plan, diet_bucket
+from app.core.rate_limit import rate_limit
 from app.schemas.diet_plan import DietFormRequest
 from app.db.mongodb import db
+from app.db.user_keys import by_user, user_key
 from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 import re
 import json
 from app.utils.api_response import api_response
 from app.utils.groq import get_groq_response
+from app.utils.nutrition import daily_targets, targets_prompt
+from app.utils.precompressed import render_payload, precompressed_response
 
 
 router = APIRouter(prefix="/diet", tags=["Diet"])
@@ -19,70 +27,48 @@ def extract_json_from_text(text: str):
         return json.loads(json_match.group(0))
     raise ValueError("No valid JSON found in response")
 
+def render_saved_plan(plan: dict) -> dict:
+    return render_payload(api_response(
+        message="Diet plan retrieved successfully",
+        status=200,
+        data=plan
+    ))
+
 def get_next_dates(n: int):
     today = datetime.now(timezone.utc).date()
     return [(today + timedelta(days=i)).isoformat() for i in range(n)]
 
-@router.post("/generate-diet-plan/")
-async def generate_diet_plan(request: DietFormRequest, user_id: str = Depends(get_current_user_id)):
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user_id")
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MEAL_FIELDS = ("breakfast", "lunch", "dinner", "calories")
+TARGET_PROFILE_FIELDS = {"_id": 0, "age": 1, "gender": 1, "height": 1, "weight": 1, "activity_level": 1, "goal": 1}
 
-    number_of_days = request.preferred_training_days_per_week or 7
-    days_of_week = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    selected_days = days_of_week[:min(number_of_days, 7)]
-
-    prompt = f"""
+def build_diet_prompt(request: DietFormRequest, days: list, total_days: int, targets: dict = None) -> str:
+    day_format = ",\n".join(
+        f'    "{day}": {{\n' + ",\n".join(f'        "{field}": "..."' for field in MEAL_FIELDS) + "\n    }"
+        for day in days
+    )
+    # A shard only sees its own days, so ask for variety explicitly
+    shard_note = (
+        f"\nThis request covers {len(days)} of the {total_days} days in the plan. The other days are planned "
+        "separately, so avoid defaulting to the most obvious meals.\n"
+        if len(days) < total_days else ""
+    )
+    # ⚡ Calculated targets replace the model's own estimate of the user's needs
+    targets_note = (
+        f"\n{targets_prompt(targets)}\nEach day's meals must add up to the calorie target; "
+        "put that day's total as a number in \"calories\".\n"
+        if targets else ""
+    )
+    return f"""
 You are a certified dietitian and fitness expert.
 
-Return a {len(selected_days)}-day **diet plan in strict JSON format.**
+Return a {len(days)}-day **diet plan in strict JSON format.**
 Each day must include **breakfast, lunch, and dinner.**
-Return only the following days: {', '.join(selected_days)}.
-
+Return only the following days: {', '.join(days)}.
+{shard_note}
 Strictly follow this JSON format:
 {{
-    "monday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "tuesday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "wednesday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "thursday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "friday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "saturday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }},
-    "sunday": {{
-        "breakfast": "...",
-        "lunch": "...",
-        "dinner": "...",
-        "calories": "..."
-    }}
+{day_format}
 }}
 
 User Profile:
@@ -95,20 +81,94 @@ User Profile:
 - Other Allergy: {request.other_allergy}
 - Preferred Workout Style: {request.preferred_workout_style}
 - Preferred Training Days per Week: {request.preferred_training_days_per_week}
-
-Only return JSON for the following days: {', '.join(selected_days)}.
+{targets_note}
+Only return JSON for the following days: {', '.join(days)}.
 """
 
-    ai_response = get_groq_response(prompt)
+def validate_diet_days(diet_plan: dict, days: list) -> dict:
+    """Returns the requested days, or raises ValueError naming the first malformed one."""
+    validated = {}
+    for day in days:
+        meals = diet_plan.get(day)
+        if not isinstance(meals, dict):
+            raise ValueError(f"Missing day: {day}")
+        for field in MEAL_FIELDS:
+            if not str(meals.get(field) or "").strip():
+                raise ValueError(f"Missing {field} for {day}")
+        validated[day] = meals
+    return validated
+
+async def generate_diet_shard(request: DietFormRequest, days: list, total_days: int,
+                              semaphore: asyncio.Semaphore, targets: dict = None) -> dict:
+    """Generates and validates one group of days, retrying just this group on failure."""
+    prompt = build_diet_prompt(request, days, total_days, targets)
+    for attempt in range(settings.DIET_PLAN_SHARD_RETRIES + 1):
+        async with semaphore:
+            ai_response = await run_in_threadpool(get_groq_response, prompt)
+        try:
+            return validate_diet_days(extract_json_from_text(ai_response), days)
+        except Exception as e:
+            error = e
+            print(f"⚠️ Diet plan shard {days} failed (attempt {attempt + 1}):", e)
+    raise ValueError(f"{', '.join(days)}: {error}")
+
+async def generate_diet_days(request: DietFormRequest, days: list, targets: dict = None) -> dict:
+    """
+    Generates meals for `days`. With DIET_PLAN_SHARD_DAYS set, the week is split
+    into groups of that many days which are generated concurrently (at most
+    DIET_PLAN_MAX_CONCURRENCY at a time), so wall-clock time approaches that of
+    a single group and a malformed group is retried without redoing the rest.
+    Raises ValueError when any group still fails.
+    """
+    shard_size = settings.DIET_PLAN_SHARD_DAYS or len(days)
+    shards = [days[i:i + shard_size] for i in range(0, len(days), shard_size)]
+    semaphore = asyncio.Semaphore(settings.DIET_PLAN_MAX_CONCURRENCY)
+
+    results = await asyncio.gather(
+        *(generate_diet_shard(request, shard, len(days), semaphore, targets) for shard in shards),
+        return_exceptions=True
+    )
+    errors = [str(result) for result in results if isinstance(result, Exception)]
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    diet_plan = {}
+    for result in results:
+        diet_plan.update(result)
+    return diet_plan
+
+@router.post("/generate-diet-plan/", dependencies=[Depends(rate_limit("generate_diet_plan"))])
+async def generate_diet_plan(request: DietFormRequest, user_id: str = Depends(get_current_user_id)):
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+
+    number_of_days = request.preferred_training_days_per_week or 7
+    selected_days = DAYS_OF_WEEK[:min(number_of_days, 7)]
 
-    try:
-        diet_plan = extract_json_from_text(ai_response)
-    except Exception as e:
-        return api_response(
-            message="AI did not return valid JSON after cleanup",
-            status=400,
-            data={"error": str(e), "raw_response": ai_response}
-        )
+    # Body stats come from the profile; the form's activity level and goal take precedence
+    # The plan being replaced keeps its _id, which the stored payload and sync clients carry
+    profile, existing = await asyncio.gather(
+        db["user_profiles"].find_one(by_user(db["user_profiles"], user_id), TARGET_PROFILE_FIELDS),
+        db["diet_plans"].find_one({"user_id": user_key(user_id)}, {"_id": 1})
+    )
+    targets = daily_targets({
+        **(profile or {}),
+        "activity_level": request.activity_level or (profile or {}).get("activity_level"),
+        "goal": request.fitness_goal or (profile or {}).get("goal"),
+    })
+
+    # ⚡ Profiles without conditions or allergies are served from the pre-generated catalog,
+    # built for the calorie band of their targets
+    diet_plan = await catalog_plan("diet", diet_bucket(request, len(selected_days), targets))
+    if diet_plan is None:
+        try:
+            diet_plan = await generate_diet_days(request, selected_days, targets)
+        except ValueError as e:
+            return api_response(
+                message="AI did not return a valid diet plan",
+                status=400,
+                data={"error": str(e)}
+            )
 
     week_dates = get_next_dates(len(selected_days))
 
@@ -120,16 +180,21 @@ Only return JSON for the following days: {', '.join(selected_days)}.
         for day, date in zip(selected_days, week_dates)
     }
 
+    plan_doc = {
+        "_id": existing["_id"] if existing else ObjectId(),
+        "user_id": user_key(user_id),
+        "user_profile": request.dict(),
+        "week_start_date": week_dates[0],
+        "week_end_date": week_dates[-1],
+        "ai_generated_plan": dated_plan,
+        "targets": targets,
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc)
+    }
+    # ⚡ Render the read payload up front so GET /diet-plan/ can serve stored bytes; one write saves both
     await db["diet_plans"].replace_one(
-        {"user_id": ObjectId(user_id)},
-        {
-            "user_id": ObjectId(user_id),
-            "user_profile": request.dict(),
-            "week_start_date": week_dates[0],
-            "week_end_date": week_dates[-1],
-            "ai_generated_plan": dated_plan,
-            "created_at": datetime.now(timezone.utc)
-        },
+        {"user_id": user_key(user_id)},
+        {**plan_doc, "rendered": render_saved_plan(plan_doc)},
         upsert=True
     )
 
@@ -137,28 +202,29 @@ Only return JSON for the following days: {', '.join(selected_days)}.
         message="AI Diet Plan generated successfully",
         status=201,
         data={
-            "ai_generated_diet_plan": dated_plan
+            "ai_generated_diet_plan": dated_plan,
+            "targets": targets
         }
     )
 
 
 
 @router.get("/diet-plan/")
-async def get_saved_diet_plan(user_id: str = Depends(get_current_user_id)):
+async def get_saved_diet_plan(request: Request, user_id: str = Depends(get_current_user_id)):
     if not ObjectId.is_valid(user_id):
         raise HTTPException(status_code=400, detail="Invalid plan_id")
 
-    plan = await db["diet_plans"].find_one({"user_id": ObjectId(user_id)})
+    stored = await db["diet_plans"].find_one({"user_id": user_key(user_id)}, {"rendered": 1})
 
-    if not plan:
+    if not stored:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    plan["_id"] = str(plan["_id"])
-    if "user_id" in plan:
-        plan["user_id"] = str(plan["user_id"])
+    if stored.get("rendered"):
+        return precompressed_response(request, stored["rendered"])
 
-    return api_response(
-        message="Diet plan retrieved successfully",
-        status=200,
-        data=plan
-    )
+    # Backfill plans written before payloads were pre-rendered
+    plan = await db["diet_plans"].find_one({"_id": stored["_id"]}, {"rendered": 0})
+    rendered = render_saved_plan(plan)
+    await db["diet_plans"].update_one({"_id": stored["_id"]}, {"$set": {"rendered": rendered}})
+
+    return precompressed_response(request, rendered)
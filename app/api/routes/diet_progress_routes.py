@@ -1,24 +1,77 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from app.core.auth import get_current_user_id
+from app.core.rate_limit import rate_limit
+from app.config.settings import settings
 from app.utils.api_response import api_response
 from app.utils.groq import get_groq_response
 from app.db.mongodb import db
-from bson import ObjectId
+from app.db.user_keys import by_user, user_key
+from app.utils.dates import day_range_filter, day_string
+from app.utils.adherence import score_adherence
+from app.utils.nutrition import daily_targets, targets_prompt
 from datetime import datetime
 import json
 from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 users_profile = db["user_profiles"]
-
-@router.get("/Diet/generate")
+progress_collection = db["diet_progress_logs"]
+
+
+def save_report_pipeline(data: dict, history_size: int) -> list:
+    """
+    Replaces the current report and pushes the one it supersedes onto `history`,
+    keeping the newest `history_size` generations, in one pipeline update.
+    """
+    previous = {"generated_summary": "$generated_summary", "generated_at": "$generated_at"}
+    return [
+        {"$set": {
+            "history": {"$slice": [
+                {"$concatArrays": [
+                    {"$ifNull": ["$history", []]},
+                    {"$cond": [{"$ifNull": ["$generated_summary", False]}, [previous], []]}
+                ]},
+                -history_size
+            ]}
+        }},
+        {"$set": {"generated_summary": {"$literal": data}, "generated_at": "$$NOW"}}
+    ]
+
+def apply_local_scores(data: dict, scores: dict, targets: dict = None):
+    """
+    Adds the adherence and consistency percentages scored locally
+    (app.utils.adherence), which the model is not asked for, and records the
+    calculated targets.
+    """
+    report = data.get("dietProgressReport")
+    if not isinstance(report, dict):
+        return
+    if targets:
+        report["dailyTargets"] = targets
+    if isinstance(report.get("adherenceAnalysis"), dict):
+        report["adherenceAnalysis"]["adherencePercentage"] = scores["adherence_percentage"]
+    if isinstance(report.get("mealLoggingConsistency"), dict):
+        report["mealLoggingConsistency"]["consistencyPercentage"] = scores["consistency_percentage"]
+        report["mealLoggingConsistency"]["missedMealCounts"] = scores["missed_meals"]
+
+def reported_daily_calories(data: dict) -> dict:
+    """The model's estimated calorie total per date, for days logged without item calories."""
+    report = data.get("dietProgressReport")
+    if not isinstance(report, dict):
+        return {}
+    daily_log = (report.get("estimatedCalorieBreakdown") or {}).get("dailyLog") or []
+    return {
+        entry["date"]: entry["calories"].get("total")
+        for entry in daily_log
+        if isinstance(entry, dict) and isinstance(entry.get("calories"), dict) and isinstance(entry.get("date"), str)
+    }
+
+@router.get("/Diet/generate", dependencies=[Depends(rate_limit("diet_progress_report"))])
 async def generate_ai_progress(
     user_id: str = Depends(get_current_user_id),
     start_date: str = Query(..., description="YYYY-MM-DD"),
     end_date: str = Query(..., description="YYYY-MM-DD")
 ):
-    print(f"Generating AI diet progress for user {user_id} from {start_date} to {end_date}")
-
     # Validate dates
     try:
         start = datetime.fromisoformat(start_date)
@@ -30,14 +83,15 @@ async def generate_ai_progress(
 
     # Fetch meal logs
     logs_cursor = db["meal_logs"].find({
-        "user_id": ObjectId(user_id),
-        "date": {"$gte": start_date, "$lte": end_date}
-    })
+        "user_id": user_key(user_id),
+        **day_range_filter(start, end)
+    }).sort("date", 1)
 
-    logs = []
+    logs, meals_by_date = [], {}
     async for log in logs_cursor:
+        meals_by_date[day_string(log["date"])] = log["meals"]
         logs.append({
-            "date": log["date"],
+            "date": day_string(log["date"]),
             "breakfast": log["meals"].get("breakfast", []),
             "lunch": log["meals"].get("lunch", []),
             "dinner": log["meals"].get("dinner", [])
@@ -47,18 +101,20 @@ async def generate_ai_progress(
         raise HTTPException(status_code=404, detail="No meal logs found in this date range.")
 
     # Fetch user profile
-    profile = await users_profile.find_one({"user_id": user_id})
+    profile = await users_profile.find_one(by_user(users_profile, user_id))
     if not profile or "weight" not in profile:
         raise HTTPException(status_code=404, detail="User profile not found or missing weight info.")
 
     weight = profile["weight"]
+    targets = daily_targets(profile)
+    targets_note = f"\n{targets_prompt(targets)}\nJudge adherence against these targets.\n" if targets else ""
 
     # Prompt for Groq AI
     prompt = f"""
 You are a certified AI dietitian.
 
 Your task is to analyze the user's diet between {start_date} and {end_date} based on their meal logs and weight. The user's weight is {weight} kg.
-
+{targets_note}
 == USER DATA ==
 Meal Logs:
 {logs}
@@ -110,12 +166,10 @@ You must respond with ONE valid JSON object only.
         }}
     }},
     "mealLoggingConsistency": {{
-        "consistencyPercentage": 0.0,
         "summary": "...",
         "missedMeals": "..."
     }},
     "adherenceAnalysis": {{
-        "adherencePercentage": 0.0,
         "summary": "...",
         "bestAdherenceDays": "...",
         "consumptionPattern": "..."
@@ -163,13 +217,21 @@ ONLY return this JSON object. NOTHING else.
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse AI response: {str(e)}")
 
-    await db["diet_progress_logs"].insert_one({
-        "user_id": ObjectId(user_id),
-        "start_date": start_date,
-        "end_date": end_date,
-        "generated_summary": data,
-        "generated_at": datetime.utcnow()
-    })
+    # ⚡ Adherence and consistency are scored here, deterministically, in one pass over the range
+    plan = await db["diet_plans"].find_one({"user_id": user_key(user_id)}, {"_id": 0, "ai_generated_plan": 1})
+    scores = score_adherence(
+        start.date(), end.date(), meals_by_date, plan,
+        calorie_target=targets["calories"] if targets else None,
+        daily_calories=reported_daily_calories(data)
+    )
+    apply_local_scores(data, scores, targets)
+
+    # One document per (user, range); older generations are kept in a capped history
+    await progress_collection.update_one(
+        {"user_id": user_key(user_id), "start_date": start_date, "end_date": end_date},
+        save_report_pipeline(data, settings.DIET_REPORT_HISTORY),
+        upsert=True
+    )
 
     return api_response(
         message="AI-generated diet progress report.",
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends
 from app.schemas.meal_log import MealLogRequest
 from app.db.mongodb import db
-from bson import ObjectId
-from datetime import datetime
+from app.db.user_keys import user_key
+from datetime import datetime, timezone
 from app.utils.api_response import api_response
 from app.core.auth import get_current_user_id
+from app.utils.dates import day_filter, day_start
+from app.core.history_cache import get_history_cache
 
 router = APIRouter(prefix="/meal-log", tags=["Meal Log"])
 
@@ -34,13 +36,16 @@ async def log_meal(
     lunch_items = [item.dict() for item in data.lunch]
     dinner_items = [item.dict() for item in data.dinner]
 
-    # Upsert the meal log
+    day = day_start(data.date)
+
+    # Upsert the meal log; a not yet migrated string-dated log of the day is matched and converted in the same write
     await db["meal_logs"].update_one(
-        {"user_id": ObjectId(user_id), "date": data.date},
+        {"user_id": user_key(user_id), **day_filter(data.date)},
         {
             "$set": {
-                "user_id": ObjectId(user_id),
-                "date": data.date,
+                "user_id": user_key(user_id),
+                "date": day,
+                "updated_at": datetime.now(timezone.utc),
                 "meals": {
                     "breakfast": breakfast_items,
                     "lunch": lunch_items,
@@ -50,6 +55,9 @@ async def log_meal(
         },
         upsert=True
     )
+    history = get_history_cache()
+    if history is not None:
+        history.apply_meal_log(user_id, day, {"breakfast": breakfast_items, "lunch": lunch_items, "dinner": dinner_items})
 
     return api_response(
         message="Meal log saved successfully (updated if existed).",
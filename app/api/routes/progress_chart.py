@@ -1,43 +1,121 @@
-from fastapi import APIRouter, Depends
-from bson import ObjectId
+from fastapi import APIRouter, Depends, Query
 from app.db.mongodb import db
+from app.db.user_keys import user_key
 from app.core.auth import get_current_user_id
 from app.utils.api_response import api_response
+from app.core.history_cache import get_history_cache, read_user_history
+from app.utils.downsample import downsample
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
 
 router = APIRouter()
 diet_logs_collection = db["diet_progress_logs"]
 
+CHART_DAYS = 15
+# Long ranges are reduced to at most this many points by default
+CHART_POINTS = 60
+CHART_MAX_POINTS = 500
+# Reports with the latest end dates are enough to cover the last CHART_DAYS days
+CHART_MAX_REPORTS = 30
+CHART_PROJECTION = {
+    "_id": 0,
+    "generated_at": 1,
+    "generated_summary.dietProgressReport.estimatedCalorieBreakdown.dailyLog": 1,
+    "generated_summary.dietProgressReport.userProfile.weight": 1,
+    "generated_summary.dietProgressReport.adherenceAnalysis.adherencePercentage": 1,
+    "generated_summary.dietProgressReport.mealLoggingConsistency.consistencyPercentage": 1,
+}
+
+async def logged_calories(user_id: str, start: date, end: date) -> dict:
+    """{"YYYY-MM-DD": kcal} for days between two dates whose logged items carry calories."""
+    cache = get_history_cache()
+    if cache is not None:
+        history = await cache.get(user_id)
+    else:
+        history = await read_user_history(db["meal_logs"], db["workout_completions"], user_id, start, end)
+    meals = history.range(start, end)["meals"]
+    return {day: kcal for day, kcal in zip(meals["dates"], meals["kcal"]) if kcal > 0}
+
+def in_range(entry: dict, start_date: str, end_date: str) -> bool:
+    """True for a well-formed AI daily entry (ISO date, numeric total) inside the range."""
+    try:
+        date.fromisoformat(entry["date"])
+        float(entry["calories"].get("total", 0))
+    except (TypeError, ValueError, AttributeError):
+        return False
+    return start_date <= entry["date"] <= end_date
+
 @router.get("/progress/diet/chart/progress")
-async def get_diet_chart_data(user_id: str = Depends(get_current_user_id)):
-    logs = await diet_logs_collection.find({"user_id": ObjectId(user_id)}).to_list(None)
+async def get_diet_chart_data(
+    user_id: str = Depends(get_current_user_id),
+    start_date: Optional[str] = Query(None, description="YYYY-MM-DD; with end_date, charts this range instead of the last 15 days"),
+    end_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    points: int = Query(CHART_POINTS, ge=5, le=CHART_MAX_POINTS, description="Most points returned for a range"),
+    mode: Literal["auto", "lttb", "week", "month"] = Query("auto", description="auto: raw days if they fit, else LTTB")
+):
+    ranged = start_date is not None or end_date is not None
+    if ranged:
+        try:
+            if date.fromisoformat(start_date) > date.fromisoformat(end_date):
+                raise ValueError
+        except (TypeError, ValueError):
+            return api_response(message="Invalid date range.", status=400)
+        # Every report overlapping the range, served by the (user_id, end_date) index
+        logs = await diet_logs_collection.find(
+            {"user_id": user_key(user_id), "start_date": {"$lte": end_date}, "end_date": {"$gte": start_date}},
+            CHART_PROJECTION
+        ).to_list(None)
+    else:
+        # ⚡ Bounded read: newest ranges only, without history or report text
+        logs = await diet_logs_collection.find(
+            {"user_id": user_key(user_id)}, CHART_PROJECTION
+        ).sort("end_date", -1).limit(CHART_MAX_REPORTS).to_list(None)
+    # Oldest generation first, so later reports win below
+    logs.sort(key=lambda log: log.get("generated_at") or datetime.min)
 
-    if not logs:
+    # ⚡ Calories of logged items come from the in-process history columns
+    if ranged:
+        logged = await logged_calories(user_id, date.fromisoformat(start_date), date.fromisoformat(end_date))
+    else:
+        today = date.today()
+        logged = await logged_calories(user_id, today - timedelta(days=CHART_DAYS - 1), today)
+
+    if not logs and not logged:
         return api_response(
             message="No diet progress data found.",
             status=404
         )
 
-    # Flatten all daily logs from all entries
-    all_entries = []
+    # Flatten all daily logs from all entries; overlapping ranges keep the newest estimate per date
+    entries_by_date = {}
     for log in logs:
         data_log = log.get("generated_summary", {})
         daily_logs = data_log.get("dietProgressReport", {}).get("estimatedCalorieBreakdown", {}).get("dailyLog", [])
         for entry in daily_logs:
-            if "calories" in entry:
-                all_entries.append({
+            if "calories" in entry and entry.get("date"):
+                if ranged and not in_range(entry, start_date, end_date):
+                    continue
+                entries_by_date[entry["date"]] = {
                     "date": entry.get("date"),
                     "breakfast": entry["calories"].get("breakfast", 0),
                     "lunch": entry["calories"].get("lunch", 0),
                     "dinner": entry["calories"].get("dinner", 0),
                     "total": entry["calories"].get("total", 0),
-                })
+                }
+    # The report only estimates what was eaten; days logged with item calories use those
+    for day, kcal in logged.items():
+        entries_by_date[day] = {"date": day, "total": kcal}
+    all_entries = list(entries_by_date.values())
 
     if not all_entries:
         return api_response(message="No daily calorie logs found.", status=404)
 
-    # Sort and slice last 15 days
-    sorted_logs = sorted(all_entries, key=lambda x: x.get("date"), reverse=True)[:15]
-    sorted_logs.reverse()
+    if ranged:
+        sorted_logs = sorted(all_entries, key=lambda x: x.get("date"))
+    else:
+        # Sort and slice last 15 days
+        sorted_logs = sorted(all_entries, key=lambda x: x.get("date"), reverse=True)[:CHART_DAYS]
+        sorted_logs.reverse()
 
     # Get weight from latest userProfile
     last_weight = "N/A"
@@ -60,24 +138,55 @@ async def get_diet_chart_data(user_id: str = Depends(get_current_user_id)):
             consistency_percentage = consistency_data.get("consistencyPercentage", 0.0)
             break
 
-    # Daily chart data (only total calories per day)
-    daily_chart_data = []
-    for entry in sorted_logs:
-        daily_chart_data.append({
-            "date": entry.get("date"),
-            "total": entry.get("total", 0)
-        })
+    # Daily chart data (only total calories per day); ranges come back with a bounded number of points
+    chart = downsample(
+        [entry["date"] for entry in sorted_logs],
+        [float(entry.get("total", 0)) if ranged else entry.get("total", 0) for entry in sorted_logs],
+        points if ranged else CHART_DAYS,
+        mode if ranged else "auto",
+        key="total"
+    )
 
     response_data = {
         "period": f"{sorted_logs[0]['date']} to {sorted_logs[-1]['date']}",
         "weight": last_weight,
         "consistency_percentage": consistency_percentage,
         "adherence_percentage": adherence_percentage,
-        "daily_chart_data": daily_chart_data
+        "daily_chart_data": chart["points"]
     }
+    if ranged:
+        response_data["mode"] = chart["mode"]
 
     return api_response(
         message="Diet chart progress generated successfully.",
         status=200,
         data=response_data
     )
+
+
+@router.get("/progress/history/chart")
+async def get_history_chart_data(
+    user_id: str = Depends(get_current_user_id),
+    start_date: str = Query(..., description="YYYY-MM-DD"),
+    end_date: str = Query(..., description="YYYY-MM-DD")
+):
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        if start > end:
+            raise ValueError
+    except ValueError:
+        return api_response(message="Invalid date range.", status=400)
+
+    # ⚡ Warm users are answered from the in-process columns without touching Mongo
+    cache = get_history_cache()
+    if cache is not None:
+        history = await cache.get(user_id)
+    else:
+        history = await read_user_history(db["meal_logs"], db["workout_completions"], user_id, start, end)
+
+    return api_response(
+        message="History chart data generated successfully.",
+        status=200,
+        data={"start_date": start_date, "end_date": end_date, **history.range(start, end)}
+    )
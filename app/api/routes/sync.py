@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from starlette.responses import Response
+
+from app.config.settings import settings
+from app.core.auth import get_current_user_id
+from app.core.sync import SYNC_COLLECTIONS, decode_cursor, encode_cursor
+from app.db.mongodb import db
+from app.db.user_keys import by_user, public_user_id, user_key
+from app.utils.api_response import api_response
+from app.utils.dates import day_string
+from app.utils.precompressed import render_json
+
+router = APIRouter(tags=["Sync"])
+# Pre-rendered response bytes are a server-side detail
+SYNC_PROJECTION = {"rendered": 0, "rendered_for": 0}
+
+
+def client_doc(collection: str, doc: dict) -> dict:
+    """The document as the regular read routes present it: string ids, 'YYYY-MM-DD' log dates."""
+    doc["_id"] = str(doc["_id"])
+    if collection in ("meal_logs", "workout_completions") and doc.get("date") is not None:
+        doc["date"] = day_string(doc["date"])
+    return public_user_id(doc)
+
+
+@router.get("/sync")
+async def sync_changes(
+    user_id: str = Depends(get_current_user_id),
+    since: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full sync")
+):
+    now = datetime.now(timezone.utc)
+    full = since is None
+    if not full:
+        try:
+            since_at = decode_cursor(since)
+        except ValueError:
+            return api_response(message="Invalid sync cursor.", status=400)
+        # Tombstones older than their TTL are gone, so such a client has to start over
+        full = now - since_at > timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS)
+
+    changed = {}
+    if not full:
+        # Writes stamped just before the previous cursor may have committed after it was read
+        changed = {"updated_at": {"$gt": since_at - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP_SECONDS)}}
+
+    reads = [
+        db[name].find(by_user(db[name], user_id, **changed), SYNC_PROJECTION).to_list(None)
+        for name in SYNC_COLLECTIONS
+    ]
+    if not full:
+        reads.append(db["sync_tombstones"].find(
+            {"user_id": user_key(user_id), "deleted_at": changed["updated_at"]},
+            {"_id": 0, "collection": 1, "doc_id": 1}
+        ).to_list(None))
+    results = await asyncio.gather(*reads)
+
+    deleted = {name: [] for name in SYNC_COLLECTIONS}
+    if not full:
+        for tombstone in results[-1]:
+            deleted.setdefault(tombstone["collection"], []).append(str(tombstone["doc_id"]))
+
+    data = {
+        "cursor": encode_cursor(now),
+        "full": full,
+        "changes": {
+            name: [client_doc(name, doc) for doc in docs]
+            for name, docs in zip(SYNC_COLLECTIONS, results)
+        },
+        "deleted": deleted,
+    }
+    # render_json knows ObjectIds, which can still sit inside nested documents
+    return Response(
+        content=render_json(api_response(message="Sync changes retrieved successfully.", status=200, data=data)),
+        media_type="application/json"
+    )
@@ -1,12 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.schemas.meal_log import MealLogRequest
 from app.db.mongodb import db
-from bson import ObjectId
+from app.db.user_keys import user_key
+from pymongo import ReturnDocument
 from datetime import datetime
 from app.utils.api_response import api_response
 from app.core.auth import get_current_user_id
+from app.utils.dates import day_filter, day_start
+from app.core.history_cache import get_history_cache
 
 router = APIRouter(prefix="/meal-log", tags=["Meal Log"])
+MEAL_SLOTS = ("breakfast", "lunch", "dinner")
+
+
+def merge_meal_slot(slot: str, items) -> dict:
+    """
+    Aggregation expression for one meal slot: items whose item_name is already
+    logged are replaced in place, new ones are appended, and a slot with no
+    incoming items is left as it is.
+    """
+    existing = {"$ifNull": [f"$meals.{slot}", []]}
+    if not items:
+        return existing
+
+    # Last occurrence wins, like the old dict-based merge
+    incoming = list({item.item_name: item.dict() for item in items}.values())
+    names = [item["item_name"] for item in incoming]
+
+    replaced = {"$map": {
+        "input": existing,
+        "as": "item",
+        "in": {"$let": {
+            "vars": {"idx": {"$indexOfArray": [{"$literal": names}, "$$item.item_name"]}},
+            "in": {"$cond": [
+                {"$eq": ["$$idx", -1]},
+                "$$item",
+                {"$arrayElemAt": [{"$literal": incoming}, "$$idx"]}
+            ]}
+        }}
+    }}
+    appended = {"$filter": {
+        "input": {"$literal": incoming},
+        "as": "item",
+        "cond": {"$not": [{"$in": ["$$item.item_name", {"$map": {
+            "input": existing, "as": "e", "in": "$$e.item_name"
+        }}]}]}
+    }}
+    return {"$concatArrays": [replaced, appended]}
 
 
 @router.put("/")
@@ -19,45 +59,23 @@ async def update_meal_log(
     except ValueError:
         return api_response(message="Invalid date format.", status=400)
 
-    existing_log = await db["meal_logs"].find_one({
-        "user_id": ObjectId(user_id),
-        "date": data.date
-    })
-
-    # Merge without duplicates (based on item_name)
-    def merge_meals(existing, new):
-        if not new:
-            return existing
-        existing_map = {item["item_name"]: item for item in existing}
-        for item in new:
-            item_dict = item.dict()
-            existing_map[item_dict["item_name"]] = item_dict  # add or update
-        return list(existing_map.values())
-
-    if existing_log:
-        updated_meals = {
-            "breakfast": merge_meals(existing_log["meals"].get("breakfast", []), data.breakfast),
-            "lunch": merge_meals(existing_log["meals"].get("lunch", []), data.lunch),
-            "dinner": merge_meals(existing_log["meals"].get("dinner", []), data.dinner),
-        }
-
-        await db["meal_logs"].update_one(
-            {"_id": existing_log["_id"]},
-            {"$set": {"meals": updated_meals}}
-        )
-    else:
-        # If no log exists, create a new one
-        updated_meals = {
-            "breakfast": [item.dict() for item in data.breakfast],
-            "lunch": [item.dict() for item in data.lunch],
-            "dinner": [item.dict() for item in data.dinner],
-        }
-
-        await db["meal_logs"].insert_one({
-            "user_id": ObjectId(user_id),
-            "date": data.date,
-            "meals": updated_meals
-        })
+    # Merge without duplicates (based on item_name) in one atomic upsert, which also
+    # moves a not yet migrated string-dated log of the day to its native date
+    meal_log = await db["meal_logs"].find_one_and_update(
+        {"user_id": user_key(user_id), **day_filter(data.date)},
+        [{"$set": {
+            "date": day_start(data.date),
+            **{f"meals.{slot}": merge_meal_slot(slot, getattr(data, slot)) for slot in MEAL_SLOTS},
+            "updated_at": "$$NOW"
+        }}],
+        projection={"meals": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    updated_meals = meal_log["meals"]
+    history = get_history_cache()
+    if history is not None:
+        history.apply_meal_log(user_id, data.date, updated_meals)
 
     return api_response(
         message="Meal log updated successfully.",
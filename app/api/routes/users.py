@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, Body, status
 from app.core.auth import get_current_user_id
 from app.db.mongodb import db
+from app.db.user_keys import by_user, public_user_id, user_key
 from app.utils.api_response import api_response
 from bson import ObjectId
 from app.schemas.user_profile import UserProfileCreate, UserProfileUpdate
 from app.models.user_profile import UserProfile
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -26,7 +28,7 @@ async def create_user_profile(
     if not user:
         return api_response("User not found", status.HTTP_404_NOT_FOUND)
 
-    existing_profile = await profiles_collection.find_one({"user_id": user_id})
+    existing_profile = await profiles_collection.find_one(by_user(profiles_collection, user_id))
     if existing_profile:
         return api_response("User profile already exists", status.HTTP_409_CONFLICT)
 
@@ -41,7 +43,9 @@ async def create_user_profile(
         goal=payload.goal
     )
 
-    result = await profiles_collection.insert_one(profile.model_dump(by_alias=True))
+    result = await profiles_collection.insert_one({
+        **profile.model_dump(by_alias=True), "user_id": user_key(user_id), "updated_at": datetime.now(timezone.utc)
+    })
     return api_response(
         message="User profile created successfully",
         status=status.HTTP_201_CREATED,
@@ -53,11 +57,12 @@ async def get_user_profile(user_id: str = Depends(get_current_user_id)):
     if not user_id or not is_valid_object_id(user_id):
         return api_response("Invalid or missing user ID", status.HTTP_400_BAD_REQUEST)
 
-    profile = await profiles_collection.find_one({"user_id": user_id})
+    profile = await profiles_collection.find_one(by_user(profiles_collection, user_id))
     if not profile:
         return api_response("User profile not found", status.HTTP_404_NOT_FOUND)
 
     profile["_id"] = str(profile["_id"])
+    public_user_id(profile)
     return api_response(
         message="User profile fetched successfully",
         status=status.HTTP_200_OK,
@@ -72,7 +77,7 @@ async def update_user_profile(
     if not is_valid_object_id(user_id):
         return api_response("Invalid user ID", status.HTTP_400_BAD_REQUEST)
 
-    profile = await profiles_collection.find_one({"user_id": user_id})
+    profile = await profiles_collection.find_one(by_user(profiles_collection, user_id))
     if not profile:
         return api_response("User profile not found", status.HTTP_404_NOT_FOUND)
 
@@ -85,12 +90,13 @@ async def update_user_profile(
         return api_response("No valid fields to update", status.HTTP_400_BAD_REQUEST)
 
     await profiles_collection.update_one(
-        {"user_id": user_id},
-        {"$set": update_data}
+        by_user(profiles_collection, user_id),
+        {"$set": {**update_data, "updated_at": datetime.now(timezone.utc)}}
     )
 
-    updated_profile = await profiles_collection.find_one({"user_id": user_id})
+    updated_profile = await profiles_collection.find_one(by_user(profiles_collection, user_id))
     updated_profile["_id"] = str(updated_profile["_id"])
+    public_user_id(updated_profile)
 
     return api_response(
         message="User profile updated successfully",
@@ -1,22 +1,52 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import json
 import re
 from app.core.auth import get_current_user_id
+from app.core.rate_limit import rate_limit
 from app.db.mongodb import db
+from app.db.user_keys import by_user, public_user_id, user_key
 from app.utils.api_response import api_response
-from app.schemas.workout import WorkoutDietPlanRequest, WorkoutPlanDay , WorkoutDayLogRequest
+from app.utils.precompressed import render_payload, precompressed_response
+from app.utils.dates import day_filter, day_start
+from app.core.history_cache import get_history_cache
+from app.core.plan_catalog import catalog_plan, workout_bucket
+from app.core.sync import record_deletions
+from app.schemas.workout import WorkoutDietPlanRequest, WorkoutPlanDay , WorkoutDayLogRequest, WorkoutDaysRegenerateRequest
 from app.models.workout import WorkoutDietPlan
-from datetime import datetime, timezone , time , timedelta ,date
+from datetime import datetime, timezone, date
 from app.models.user_profile import UserProfileUpdate
 
 from app.utils.groq import get_groq_response
+from starlette.concurrency import run_in_threadpool
 
 
 router = APIRouter(dependencies=[Depends(get_current_user_id)])
 workout_collection = db["workout_plans"]
 workout_log_collection = db["workout_completions"]
 profiles_collection = db["user_profiles"]
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+async def delete_user_plans(user_id: str) -> int:
+    """Deletes all of a user's workout plans, leaving sync tombstones; returns how many."""
+    plans = await workout_collection.find(by_user(workout_collection, user_id), {"_id": 1}).to_list(None)
+    ids = [plan["_id"] for plan in plans]
+    if not ids:
+        return 0
+    result = await workout_collection.delete_many({"_id": {"$in": ids}})
+    await record_deletions("workout_plans", user_id, ids)
+    return result.deleted_count
+
+def render_user_plans(plan_docs: list) -> dict:
+    return render_payload(api_response(
+        message="User workout plans retrieved successfully",
+        status=200,
+        data=plan_docs
+    ))
+
 # 🔧 Prompt builder
 def build_workout_prompt(data: WorkoutDietPlanRequest) -> str:
     return (
@@ -62,7 +92,7 @@ def build_workout_prompt(data: WorkoutDietPlanRequest) -> str:
     )
 
 # 🚀 Create weekly workout plan
-@router.post("/workout/plan/week")
+@router.post("/workout/plan/week", dependencies=[Depends(rate_limit("generate_workout_plan"))])
 async def create_weekly_workout_plan(
     payload: WorkoutDietPlanRequest,
     user_id: str = Depends(get_current_user_id)
@@ -72,24 +102,27 @@ async def create_weekly_workout_plan(
 
     try:
         # 1️⃣ Delete any existing workout plans for the user
-        await workout_collection.delete_many({"user_id": user_id})
+        await delete_user_plans(user_id)
 
 
-        raw_response = get_groq_response(build_workout_prompt(payload))
-        cleaned_response = re.sub(r"^```(?:json)?\n|\n```$", "", raw_response.strip())
+        # ⚡ Profiles without conditions or injuries are served from the pre-generated catalog
+        plan_data = await catalog_plan("workout", workout_bucket(payload))
+        if plan_data is None:
+            raw_response = await run_in_threadpool(get_groq_response, build_workout_prompt(payload))
+            cleaned_response = re.sub(r"^```(?:json)?\n|\n```$", "", raw_response.strip())
 
-        # 🔍 Check for empty or invalid response
-        if not cleaned_response:
-            return api_response(message="Empty response from Groq model", status=502)
+            # 🔍 Check for empty or invalid response
+            if not cleaned_response:
+                return api_response(message="Empty response from Groq model", status=502)
 
-        try:
-            plan_data = json.loads(cleaned_response)
-        except json.JSONDecodeError as e:
-            return api_response(
-                message="Invalid JSON from Groq response",
-                status=400,
-                data={"raw_response": raw_response}
-            )
+            try:
+                plan_data = json.loads(cleaned_response)
+            except json.JSONDecodeError as e:
+                return api_response(
+                    message="Invalid JSON from Groq response",
+                    status=400,
+                    data={"raw_response": raw_response}
+                )
 
         validated_plan = [WorkoutPlanDay(**day) for day in plan_data]
 
@@ -118,12 +151,20 @@ async def create_weekly_workout_plan(
             activity_level=payload.activity_level,
             goal=payload.goal
         )
-        # 4️⃣ Save to MongoDB
+        # 4️⃣ Save to MongoDB, with the read payload rendered once up front
+        plan_doc = {
+            "_id": ObjectId(),
+            **workout_plan_doc.model_dump(by_alias=True),
+            "user_id": user_key(user_id),
+            "updated_at": datetime.now(timezone.utc)
+        }
+        rendered = render_user_plans([plan_doc])
+
         await profiles_collection.update_one(
-            {"user_id": user_id},
-            {"$set": user_profile_docs.model_dump(exclude_unset=True)}
+            by_user(profiles_collection, user_id),
+            {"$set": {**user_profile_docs.model_dump(exclude_unset=True), "updated_at": datetime.now(timezone.utc)}}
         )
-        result = await workout_collection.insert_one(workout_plan_doc.model_dump(by_alias=True))
+        result = await workout_collection.insert_one({**plan_doc, "rendered": rendered})
         inserted_id = str(result.inserted_id)
 
         return api_response(
@@ -136,26 +177,146 @@ async def create_weekly_workout_plan(
         return api_response(message=f"Failed to generate or save workout plan: {str(e)}", status=500)
 
 
+# 🔧 Prompt for regenerating some days of an existing plan
+def build_workout_days_prompt(plan: dict, days: list, notes: str = None) -> str:
+    # Kept days are context only, so exercise names are enough
+    fixed_days = "\n".join(
+        f"- {d['day']}: {d['focus']} ({', '.join(e['name'] for e in d['exercises']) or 'no exercises'})"
+        for d in plan["plan"] if d["day"].capitalize() not in days
+    )
+    return (
+        f"You are a certified physiotherapist and fitness trainer specializing in injury recovery and adaptive workouts. "
+        f"A user already has a weekly workout plan. Regenerate these days only: {', '.join(days)}.\n\n"
+        f"User profile:\n"
+        f"- Age: {plan['age']}\n"
+        f"- Gender: {plan['gender']}\n"
+        f"- Height: {plan['height_cm']} cm\n"
+        f"- Weight: {plan['weight_kg']} kg\n"
+        f"- Activity Level: {plan['activity_level']}\n"
+        f"- Goal: {plan['goal']}\n"
+        f"- Workout Days per Week: {plan['workout_days_per_week']}\n"
+        f"- Workout Duration: {plan['workout_duration']}\n"
+        f"- Medical Conditions: {', '.join(plan.get('medical_conditions') or []) or 'None'}\n"
+        f"- Injuries or Limitations: {', '.join(plan.get('injuries_or_limitations') or []) or 'None'}\n\n"
+        f"The rest of the week stays as it is:\n{fixed_days or '- (none)'}\n\n"
+        + (f"Requested change: {notes}\n\n" if notes else "")
+        + f"Important Notes:\n"
+        f"- Balance the regenerated days against the rest of the week (avoid training the same muscles on consecutive days).\n"
+        f"- Keep the number of workout days per week; a regenerated rest day stays a rest day unless the change asks otherwise.\n"
+        f"- Do NOT assign exercises that can aggravate the injuries or limitations.\n"
+        f"- ⚠️ On rest days, DO NOT include any exercises – the 'exercises' list should be empty.\n\n"
+        f"Output Instructions:\n"
+        f"- Output ONLY a valid JSON array with exactly {len(days)} object(s), one per regenerated day, in the same "
+        f"format as before: 'day', 'focus', 'exercises' (each with 'name', 'sets' (integer), 'reps' (string), "
+        f"'equipment', 'duration_per_set', 'instructions' (list of short tips)).\n"
+        f"Strictly return ONLY the JSON array, with no markdown or extra text."
+    )
+
+# ♻️ Regenerate selected days of a plan
+@router.patch("/workout/plan/{plan_id}/days", dependencies=[Depends(rate_limit("regenerate_workout_days"))])
+async def regenerate_workout_days(
+    plan_id: str,
+    payload: WorkoutDaysRegenerateRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    if not ObjectId.is_valid(user_id) or not ObjectId.is_valid(plan_id):
+        return api_response(message="Invalid user ID or plan ID", status=400)
+
+    days = []
+    for day in payload.days:
+        if day.capitalize() not in WEEK_DAYS:
+            return api_response(message=f"Invalid day: {day}", status=400)
+        if day.capitalize() not in days:
+            days.append(day.capitalize())
+
+    plan = await workout_collection.find_one(by_user(workout_collection, user_id, _id=ObjectId(plan_id)), {"rendered": 0, "rendered_for": 0})
+    if not plan:
+        return api_response(message="Workout plan not found", status=404)
+
+    positions = {d["day"].capitalize(): i for i, d in enumerate(plan["plan"])}
+    missing = [day for day in days if day not in positions]
+    if missing:
+        return api_response(message=f"Days not in this plan: {', '.join(missing)}", status=400)
+
+    profile_changes = payload.model_dump(
+        include={"workout_duration", "medical_conditions", "injuries_or_limitations"}, exclude_none=True
+    )
+    plan.update(profile_changes)
+
+    raw_response = await run_in_threadpool(get_groq_response, build_workout_days_prompt(plan, days, payload.notes))
+    cleaned_response = re.sub(r"^```(?:json)?\n|\n```$", "", raw_response.strip())
+    try:
+        new_days = [WorkoutPlanDay(**day) for day in json.loads(cleaned_response)]
+    except Exception as e:
+        return api_response(
+            message="Invalid JSON from Groq response",
+            status=400,
+            data={"error": str(e), "raw_response": raw_response}
+        )
+    if sorted(d.day.capitalize() for d in new_days) != sorted(days):
+        return api_response(
+            message="Groq response did not cover exactly the requested days",
+            status=400,
+            data={"raw_response": raw_response}
+        )
+
+    # Only the regenerated elements are written; the stored payload is re-rendered on the next read
+    updates = {f"plan.{positions[d.day.capitalize()]}": d.model_dump() for d in new_days}
+    result = await workout_collection.update_one(
+        by_user(workout_collection, user_id, _id=ObjectId(plan_id)),
+        {
+            "$set": {**updates, **profile_changes, "updated_at": datetime.now(timezone.utc)},
+            "$unset": {"rendered": "", "rendered_for": ""}
+        }
+    )
+    if result.matched_count == 0:
+        return api_response(message="Workout plan not found", status=404)
+    # A list payload kept on another of the user's plans includes this one too
+    await workout_collection.update_many(
+        by_user(workout_collection, user_id, rendered_for=ObjectId(plan_id)),
+        {"$unset": {"rendered": "", "rendered_for": ""}}
+    )
+
+    return api_response(
+        message="Workout plan days regenerated successfully",
+        status=200,
+        data={"plan_id": plan_id, "updated_days": new_days}
+    )
+
+
 # 📋 Get all workout plans for current user
 @router.get("/workout/plans/user")
-async def get_user_workout_plans(user_id: str = Depends(get_current_user_id)):
+async def get_user_workout_plans(request: Request, user_id: str = Depends(get_current_user_id)):
     if not ObjectId.is_valid(user_id):
         return api_response(message="Unauthorized: Invalid user ID", status=400)
 
-    plans_cursor = workout_collection.find({"user_id": user_id})
+    # ⚡ Serve the stored payload when one of the user's plans holds it for exactly their current plans
+    # (a plan without `rendered_for` holds it for itself, as written by create_weekly_workout_plan)
+    stored = await workout_collection.find(
+        by_user(workout_collection, user_id), {"rendered": 1, "rendered_for": 1}
+    ).to_list(None)
+    ids = {doc["_id"] for doc in stored}
+    for doc in stored:
+        if doc.get("rendered") and set(doc.get("rendered_for") or [doc["_id"]]) == ids:
+            return precompressed_response(request, doc["rendered"])
+
+    plans_cursor = workout_collection.find(by_user(workout_collection, user_id), {"rendered": 0, "rendered_for": 0})
     user_plans = []
     async for plan_doc in plans_cursor:
         plan_doc["_id"] = str(plan_doc["_id"])
-        user_plans.append(plan_doc)
+        user_plans.append(public_user_id(plan_doc))
 
     if not user_plans:
         return api_response(message="No workout plans found for this user", status=404)
 
-    return api_response(
-        message="User workout plans retrieved successfully",
-        status=200,
-        data=user_plans
+    # Render the list once and keep it on the first plan, for plans written before
+    # payloads were pre-rendered and for users with several plans
+    rendered = render_user_plans(user_plans)
+    await workout_collection.update_one(
+        {"_id": ObjectId(user_plans[0]["_id"])},
+        {"$set": {"rendered": rendered, "rendered_for": [ObjectId(plan["_id"]) for plan in user_plans]}}
     )
+    return precompressed_response(request, rendered)
 
 # ❌ Delete a workout plan
 @router.delete("/workout/plan/")
@@ -163,9 +324,7 @@ async def delete_workout_plans(user_id: str = Depends(get_current_user_id)):
     if not ObjectId.is_valid(user_id):
         return api_response(message="Invalid user ID", status=400)
 
-    delete_result = await workout_collection.delete_many({"user_id": user_id})
-
-    if delete_result.deleted_count == 0:
+    if await delete_user_plans(user_id) == 0:
         return api_response(message="No workout plans found for this user", status=404)
 
     return api_response(message="All workout plans deleted successfully", status=200)
@@ -179,29 +338,25 @@ async def log_workout_day(
     if not ObjectId.is_valid(user_id) or not ObjectId.is_valid(payload.plan_id):
         return api_response(message="Invalid user ID or plan ID", status=400)
 
-    # 🔎 Fetch workout plan
-    plan_doc = await workout_collection.find_one({
-        "_id": ObjectId(payload.plan_id),
-        "user_id": user_id
-    })
-
-    if not plan_doc:
-        return api_response(message="Workout plan not found", status=404)
+    if payload.date > date.today():
+        return api_response(message="Cannot log workout for a future date.", status=400)
 
     # 🗓 Get day name from date (e.g., "Sunday")
     day_name = payload.date.strftime("%A")
 
-    # 🔍 Find matching day from the plan
-    day_plan = next(
-        (d for d in plan_doc.get("plan", []) if d.get("day", "").lower() == day_name.lower()),
-        None
+    # 🔎 Fetch only the matching day from the workout plan
+    plan_doc = await workout_collection.find_one(
+        by_user(workout_collection, user_id, _id=ObjectId(payload.plan_id)),
+        {"plan": {"$elemMatch": {"day": {"$regex": f"^{day_name}$", "$options": "i"}}}}
     )
 
+    if not plan_doc:
+        return api_response(message="Workout plan not found", status=404)
+
+    day_plan = next(iter(plan_doc.get("plan", [])), None)
+
     if not day_plan:
         return api_response(message=f"No workout found for day: {day_name}", status=404)
-    
-    if payload.date > date.today():
-        return api_response(message="Cannot log workout for a future date.", status=400)
 
     # 🚫 Prevent logging rest day
     if not day_plan.get("exercises") or day_plan.get("focus", "").lower() == "rest":
@@ -210,19 +365,6 @@ async def log_workout_day(
 
     log_timestamp = payload.created_at or datetime.now(timezone.utc)
 
-    # 📆 Check for duplicates using logged_at range
-    start_dt = datetime.combine(payload.date, time.min).replace(tzinfo=timezone.utc)
-    end_dt = start_dt + timedelta(days=1)
-
-    existing_log = await workout_log_collection.find_one({
-        "user_id": ObjectId(user_id),
-        "plan_id": ObjectId(payload.plan_id),
-        "logged_at": {"$gte": start_dt, "$lt": end_dt}
-    })
-
-    if existing_log:
-        return api_response(message=f"Workout for {payload.date} already logged.", status=409)
-
     # ✅ Map exercises
     completion_flags = {e.name.lower(): e.completed for e in (payload.exercises or [])}
     mapped_exercises = []
@@ -238,20 +380,35 @@ async def log_workout_day(
 
     # 🧾 Final log document
     log_doc = {
-        "user_id": ObjectId(user_id),
+        "user_id": user_key(user_id),
         "plan_id": ObjectId(payload.plan_id),
-        "date": payload.date.isoformat(),
+        "date": day_start(payload.date),
         "status": payload.status,
         "logged_at": log_timestamp,
+        "updated_at": datetime.now(timezone.utc),
         "exercises": mapped_exercises
     }
 
+    # 📆 One write: inserts unless the day is already logged (a not yet migrated string date
+    # included); concurrent duplicates are rejected by the unique (user_id, plan_id, date) index
     try:
-        result = await workout_log_collection.insert_one(log_doc)
+        result = await workout_log_collection.update_one(
+            {"user_id": user_key(user_id), "plan_id": ObjectId(payload.plan_id), **day_filter(payload.date)},
+            {"$setOnInsert": log_doc},
+            upsert=True
+        )
+        if result.upserted_id is None:
+            return api_response(message=f"Workout for {payload.date} already logged.", status=409)
+        log_doc["_id"] = result.upserted_id
+        history = get_history_cache()
+        if history is not None:
+            history.apply_workout_log(user_id, log_doc)
         return api_response(
             message=f"Workout for {payload.date} logged with {len(mapped_exercises)} exercises.",
             status=201,
-            data={"log_id": str(result.inserted_id)}
+            data={"log_id": str(result.upserted_id)}
         )
+    except DuplicateKeyError:
+        return api_response(message=f"Workout for {payload.date} already logged.", status=409)
     except Exception as e:
         return api_response(message=f"Error logging workout: {str(e)}", status=500)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
-from bson import ObjectId
+from datetime import date, datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
 from app.core.auth import get_current_user_id
 from app.db.mongodb import db
+from app.db.user_keys import user_key
 from app.utils.api_response import api_response
+from app.utils.downsample import downsample
+from app.core.history_cache import get_history_cache, read_user_history
 from app.schemas.workout_charts import (
     WorkoutProgressAPIResponse,
     WorkoutProgressResponse,
@@ -18,10 +22,13 @@ workout_logs = db["workout_progress_logs"]
 @router.get("/workout/progress/report", response_model=WorkoutProgressAPIResponse)
 async def get_workout_progress_summary(user_id: str = Depends(get_current_user_id)):
     try:
-        log = await workout_logs.find_one({"user_id": ObjectId(user_id)})
-        if not log or "generated_summary" not in log:
+        # A user has one report per range and regeneration; the summary is the newest one
+        log = await workout_logs.find_one(
+            {"user_id": user_key(user_id), "generated_summary": {"$exists": True}},
+            sort=[("generated_at", -1)]
+        )
+        if not log:
             return api_response(
-                success=False,
                 message="No workout progress summary found.",
                 status=404,
                 data=None
@@ -68,3 +75,60 @@ async def get_workout_progress_summary(user_id: str = Depends(get_current_user_i
             status=500,
             data=None
         )
+
+
+@router.get("/workout/progress/chart")
+async def get_workout_chart_data(
+    user_id: str = Depends(get_current_user_id),
+    start_date: str = Query(..., description="YYYY-MM-DD"),
+    end_date: str = Query(..., description="YYYY-MM-DD"),
+    points: int = Query(60, ge=5, le=500, description="Most points returned per series"),
+    mode: Literal["auto", "lttb", "week", "month"] = Query("auto", description="auto: raw days if they fit, else LTTB")
+):
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        if start > end:
+            raise ValueError
+    except ValueError:
+        return api_response(message="Invalid date range.", status=400)
+
+    # 🔥 Calorie burn comes from the AI reports overlapping the range, newest generation winning per date
+    reports = await workout_logs.find(
+        {"user_id": user_key(user_id), "start_date": {"$lte": end_date}, "end_date": {"$gte": start_date}},
+        {"_id": 0, "generated_at": 1, "generated_summary.dailyLog": 1}
+    ).to_list(None)
+    reports.sort(key=lambda report: report.get("generated_at") or datetime.min)
+    burn_by_date = {}
+    for report in reports:
+        for entry in report.get("generated_summary", {}).get("dailyLog", []):
+            try:
+                day = date.fromisoformat(entry["date"])
+                burn = float(entry.get("calorie_burnout", 0))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if start <= day <= end:
+                burn_by_date[entry["date"]] = burn
+    burn_dates = sorted(burn_by_date)
+
+    # 🏋️ Volume comes from the logged workouts themselves
+    cache = get_history_cache()
+    if cache is not None:
+        history = await cache.get(user_id)
+    else:
+        history = await read_user_history(db["meal_logs"], db["workout_completions"], user_id, start, end)
+    workouts = history.range(start, end)["workouts"]
+
+    if not burn_dates and not workouts["dates"]:
+        return api_response(message="No workout data found in this date range.", status=404)
+
+    series = {
+        "calorie_burnout": downsample(burn_dates, [burn_by_date[d] for d in burn_dates], points, mode),
+        "sets": downsample(workouts["dates"], workouts["sets"], points, mode),
+        "reps": downsample(workouts["dates"], workouts["reps"], points, mode),
+    }
+    return api_response(
+        message="Workout chart data generated successfully.",
+        status=200,
+        data={"start_date": start_date, "end_date": end_date, **series}
+    )
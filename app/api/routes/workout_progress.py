@@ -1,8 +1,12 @@
+import asyncio
 from fastapi import APIRouter, Depends, Query, HTTPException
 from app.core.auth import get_current_user_id
+from app.core.metrics import REPORT_CACHE_LOOKUPS
+from app.core.rate_limit import RATE_LIMITS, enforce_rate_limit
 from app.utils.api_response import api_response
 from app.db.mongodb import db
-from bson import ObjectId
+from app.db.user_keys import by_user, user_key
+from app.utils.dates import day_range_filter, day_string
 from datetime import datetime, timezone
 import re
 import json
@@ -13,15 +17,29 @@ from starlette.concurrency import run_in_threadpool
 router = APIRouter()
 users_profile = db["user_profiles"]
 workout_logs = db["workout_completions"]
-workout_plans = db["workout_plans"]
 progress_collection = db["workout_progress_logs"]
 
 
-@router.get("/Workout/generate", response_model=WorkoutProgressAPIResponse)
+async def probe_workout_logs(user_id: str, start_date: str, end_date: str) -> dict:
+    """
+    Version of the logs in a date range: their count and newest _id. Logs are
+    insert-only, so any new log changes it; covered by the (user_id, date, _id) index.
+    """
+    result = await workout_logs.aggregate([
+        {"$match": {"user_id": user_key(user_id), **day_range_filter(start_date, end_date)}},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "last_id": {"$max": "$_id"}}},
+        {"$project": {"_id": 0}}
+    ]).to_list(1)
+    return result[0] if result else {"count": 0, "last_id": None}
+
+
+# Documented with the response model but not validated against it, so error responses (data=None) pass through
+@router.get("/Workout/generate", responses={200: {"model": WorkoutProgressAPIResponse}})
 async def generate_ai_workout_progress(
     user_id: str = Depends(get_current_user_id),
     start_date: str = Query(..., description="YYYY-MM-DD"),
-    end_date: str = Query(..., description="YYYY-MM-DD")
+    end_date: str = Query(..., description="YYYY-MM-DD"),
+    refresh: bool = Query(False, description="Regenerate even if no workout was logged since the last report")
 ):
     try:
         start = datetime.fromisoformat(start_date)
@@ -31,10 +49,35 @@ async def generate_ai_workout_progress(
     except ValueError:
         return api_response(message="Invalid date range.", status=400)
 
+    report_key = {"user_id": user_key(user_id), "start_date": start_date, "end_date": end_date}
+    version, stored = await asyncio.gather(
+        probe_workout_logs(user_id, start_date, end_date),
+        progress_collection.find_one(report_key, {"generated_summary": 1, "source_version": 1})
+    )
+    if version["count"] == 0:
+        return api_response(message="No workout logs found in this date range.", status=404)
+
+    # ⚡ Nothing logged in the range since the stored report was generated: reuse it
+    if not refresh and stored and stored.get("source_version") == version:
+        REPORT_CACHE_LOOKUPS.inc(report="workout_progress", result="hit")
+        return api_response(
+            message="AI-generated workout progress report.",
+            status=200,
+            data={
+                "start_date": start_date,
+                "end_date": end_date,
+                "summary": stored["generated_summary"]
+            }
+        )
+    REPORT_CACHE_LOOKUPS.inc(report="workout_progress", result="refresh" if refresh else "miss")
+
+    # Only reports that reach the LLM count against the limit
+    await enforce_rate_limit(RATE_LIMITS["workout_progress_report"], user_id)
+
     logs_cursor = workout_logs.find({
-        "user_id": ObjectId(user_id),
-        "date": {"$gte": start_date, "$lte": end_date}
-    })
+        "user_id": user_key(user_id),
+        **day_range_filter(start, end)
+    }).sort("date", 1)
 
     logs = []
     async for log in logs_cursor:
@@ -49,7 +92,7 @@ async def generate_ai_workout_progress(
             for ex in log.get("exercises", [])
         ]
         logs.append({
-            "date": log["date"],
+            "date": day_string(log["date"]),
             "status": log.get("status", ""),
             "exercises": exercises
         })
@@ -57,15 +100,10 @@ async def generate_ai_workout_progress(
     if not logs:
         return api_response(message="No workout logs found in this date range.", status=404)
 
-    profile = await users_profile.find_one({"user_id": user_id})
+    profile = await users_profile.find_one(by_user(users_profile, user_id))
     if not profile:
         return api_response(message="User profile not found.", status=404)
 
-    latest_plan = await workout_plans.find_one(
-        {"user_id": ObjectId(user_id)},
-        sort=[("created_at", -1)]
-    )
-
     prompt = f"""
 You are a certified fitness coach AI. Based on the user's profile and workout logs between {start_date} and {end_date}, return a minimal progress summary in structured JSON format for tracking and visualization.
 
@@ -157,16 +195,11 @@ Return only a valid JSON object in the following exact format:
 
     # ✅ Save to DB (replacing existing progress for that user and date range)
     await progress_collection.replace_one(
+        report_key,
         {
-            "user_id": ObjectId(user_id),
-            "start_date": start_date,
-            "end_date": end_date
-        },
-        {
-            "user_id": ObjectId(user_id),
-            "start_date": start_date,
-            "end_date": end_date,
+            **report_key,
             "generated_summary": data,
+            "source_version": version,
             "generated_at": datetime.now(timezone.utc)
         },
         upsert=True
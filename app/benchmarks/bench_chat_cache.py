@@ -0,0 +1,97 @@
+# python -m app.benchmarks.bench_chat_cache [--queries 5000] [--log queries.txt] [--thresholds 0.5,0.6,0.7]
+#
+# Replays a chat query log through the near-duplicate answer cache and an
+# exact-match cache (lowercased, whitespace-trimmed text) and reports hit
+# rates and lookup latency. Without --log, a synthetic log is generated:
+# questions from the bundled fitness set are drawn with a Zipf-like skew and
+# rewritten with paraphrase noise (fillers, punctuation, casing, dropped
+# words), so the source question of every query is known and answers served
+# for a *different* question are reported as false hits.
+import argparse
+import asyncio
+import random
+import time
+
+from app.core.chat_cache import ChatAnswerCache
+from app.core.topic_classifier import load_examples
+
+PREFIXES = ["", "", "hey ", "hi, ", "quick question: ", "can you tell me ", "i was wondering ", "coach, "]
+SUFFIXES = ["", "", "?", "??", " please", " thanks!", " :)", " asap"]
+REWRITES = [("what is", "what's"), ("how do i", "how can i"), ("should i", "do i need to"), ("best", "top")]
+
+
+def paraphrase(question: str, rng: random.Random) -> str:
+    text = question.rstrip("?")
+    for old, new in REWRITES:
+        if old in text.lower() and rng.random() < 0.5:
+            text = text.lower().replace(old, new)
+    words = text.split()
+    if len(words) > 5 and rng.random() < 0.3:
+        del words[rng.randrange(len(words))]
+    text = " ".join(words)
+    text = text.lower() if rng.random() < 0.5 else text
+    return f"{rng.choice(PREFIXES)}{text}{rng.choice(SUFFIXES)}"
+
+
+def synthetic_log(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    questions = [text for text, is_fitness in load_examples() if is_fitness]
+    rng.shuffle(questions)
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(questions))]
+    sources = rng.choices(range(len(questions)), weights, k=count)
+    return [(paraphrase(questions[i], rng), i) for i in sources]
+
+
+def replay(log: list, threshold: float, max_entries: int) -> dict:
+    cache = ChatAnswerCache(threshold=threshold, max_entries=max_entries)
+    exact = set()
+    hits = exact_hits = false_hits = 0
+    lookup_time = 0.0
+
+    for message, source in log:
+        normalized = " ".join(message.lower().split())
+        exact_hits += normalized in exact
+        exact.add(normalized)
+
+        start = time.perf_counter()
+        answer = cache.lookup(message)
+        lookup_time += time.perf_counter() - start
+        if answer is None:
+            asyncio.run(cache.store(message, str(source)))
+        else:
+            hits += 1
+            false_hits += source is not None and answer != str(source)
+
+    return {
+        "hit_rate": hits / len(log),
+        "exact_hit_rate": exact_hits / len(log),
+        "false_hit_rate": false_hits / max(1, hits),
+        "lookup_us": lookup_time / len(log) * 1e6,
+    }
+
+
+def main(args):
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            log = [(line.strip(), None) for line in f if line.strip()]
+    else:
+        log = synthetic_log(args.queries, args.seed)
+    print(f"replaying {len(log)} queries, cache size {args.max_entries}\n")
+
+    print(f"{'threshold':>9} {'hit rate':>9} {'exact-match':>12} {'false hits':>11} {'lookup µs':>10}")
+    for threshold in args.thresholds:
+        result = replay(log, threshold, args.max_entries)
+        print(
+            f"{threshold:>9} {result['hit_rate']:>9.1%} {result['exact_hit_rate']:>12.1%} "
+            f"{result['false_hit_rate']:>11.1%} {result['lookup_us']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat answer cache hit-rate benchmark")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--log", help="replay this file (one message per line) instead of a synthetic log")
+    parser.add_argument("--thresholds", type=lambda v: [float(x) for x in v.split(",")], default=[0.5, 0.6, 0.7, 0.8])
+    parser.add_argument("--max-entries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=3)
+    main(parser.parse_args())
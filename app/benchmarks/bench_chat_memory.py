@@ -0,0 +1,99 @@
+# python -m app.benchmarks.bench_chat_memory --mongo-url mongodb://127.0.0.1:27017 --turns 200 \
+#     [--llm-latency-ms 300 --llm-ms-per-1k-tokens 400]
+#
+# Plays one long chat session against a local mongod and the LLM stub twice:
+# once with the bounded memory (summary + last CHAT_MEMORY_TURNS turns within
+# CHAT_CONTEXT_TOKENS) and once sending the full history verbatim. The stub
+# charges latency per prompt token like real prefill, so per-turn latency
+# tracks prompt size. Reports prompt tokens and latency along the session.
+import argparse
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+from bson import ObjectId
+
+from app.benchmarks.loadtest import REQUIRED_SETTINGS, start_llm_stub
+
+CHECKPOINTS = (1, 25, 50, 100, 150, 200)
+
+
+async def play_session(memory, questions: list, turns: int) -> list:
+    from starlette.concurrency import run_in_threadpool
+
+    from app.core.chat_memory import estimate_tokens
+    from app.utils.groq import get_groq_chat_response
+
+    user_id = str(ObjectId())
+    results = []
+    for turn in range(turns):
+        message = questions[turn % len(questions)]
+        start = time.perf_counter()
+        context = await memory.context(user_id)
+        reply = await run_in_threadpool(get_groq_chat_response, message, context)
+        await memory.append(user_id, message, reply)
+        elapsed = time.perf_counter() - start
+
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in context) + estimate_tokens(message)
+        results.append((prompt_tokens, elapsed * 1000))
+    # Let a pending summarization finish before the collection is dropped
+    await asyncio.sleep(0.5)
+    return results
+
+
+def window(results: list, turn: int, size: int = 5) -> tuple:
+    chunk = results[max(0, turn - size):turn]
+    return sum(t for t, _ in chunk) / len(chunk), sum(ms for _, ms in chunk) / len(chunk)
+
+
+async def main(args):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
+
+    from app.config.settings import settings
+    from app.core.chat_memory import ChatMemory
+    from app.core.topic_classifier import load_examples
+    from app.db.mongodb import client, db
+
+    questions = [text for text, is_fitness in load_examples() if is_fitness]
+    stub = start_llm_stub(args.llm_port, args.llm_latency_ms, 0.0, args.llm_ms_per_1k_tokens)
+
+    modes = {
+        "bounded": ChatMemory(
+            db["bench_bounded"], settings.CHAT_MEMORY_TURNS, settings.CHAT_CONTEXT_TOKENS,
+            settings.CHAT_SUMMARY_MAX_CHARS
+        ),
+        # Never folds or trims: every earlier turn goes into the prompt
+        "full history": ChatMemory(db["bench_full"], max_turns=args.turns, token_budget=10 ** 9),
+    }
+    try:
+        results = {name: await play_session(memory, questions, args.turns) for name, memory in modes.items()}
+    finally:
+        stub.should_exit = True
+        await client.drop_database(args.db_name)
+
+    print(f"{args.turns}-turn session, LLM {args.llm_latency_ms} ms + {args.llm_ms_per_1k_tokens} ms/1k prompt tokens\n")
+    print(f"{'turn':>5} " + " ".join(f"{name + ' tokens':>20} {name + ' ms':>16}" for name in results))
+    for turn in (t for t in CHECKPOINTS if t <= args.turns):
+        cells = []
+        for series in results.values():
+            tokens, ms = window(series, turn)
+            cells.append(f"{tokens:>20.0f} {ms:>16.1f}")
+        print(f"{turn:>5} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat memory prompt size and latency over a long session")
+    parser.add_argument("--mongo-url", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--db-name", default=f"workoutbuddy_bench_{uuid4().hex[:6]}")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--llm-port", type=int, default=8901)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-ms-per-1k-tokens", type=float, default=200.0)
+    asyncio.run(main(parser.parse_args()))
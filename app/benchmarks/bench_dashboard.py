@@ -0,0 +1,144 @@
+# python -m app.benchmarks.bench_dashboard --mongo-url mongodb://127.0.0.1:27017 [--users 20 --rtt-ms 60]
+#
+# Seeds a profile, workout plans, a diet plan and diet/workout reports per
+# user into a scratch database and times the home screen two ways: the five
+# calls the app used to make one after another, and one GET /dashboard. The
+# app runs in-process, so --rtt-ms adds a simulated mobile round trip before
+# each request; the server-side time is reported separately with --rtt-ms 0.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+from bson import ObjectId
+
+from app.benchmarks.bench_history_cache import percentile
+from app.benchmarks.loadtest import REQUIRED_SETTINGS
+
+SEQUENTIAL = (
+    "/api/user/profile",
+    "/api/workout/plans/user",
+    "/api/diet/diet-plan/",
+    "/api/progress/diet/chart/progress",
+    "/api/workout/progress/report",
+)
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def seed_docs(user_id: ObjectId, today: date) -> dict:
+    exercise = {"name": "Squat", "sets": 3, "reps": "10", "equipment": "Barbell", "instructions": "Brace and sit back. " * 8}
+    week = [today + timedelta(days=i) for i in range(7)]
+    reports = []
+    for i in range(30):
+        end = today - timedelta(days=15 * i)
+        start = end - timedelta(days=14)
+        reports.append({
+            "user_id": user_id, "start_date": start.isoformat(), "end_date": end.isoformat(),
+            "generated_summary": {"dietProgressReport": {
+                "estimatedCalorieBreakdown": {"dailyLog": [
+                    {"date": (start + timedelta(days=d)).isoformat(),
+                     "calories": {"breakfast": 500, "lunch": 700, "dinner": 800 + d, "total": 2000 + d}}
+                    for d in range(15)
+                ]},
+                "userProfile": {"weight": 65},
+                "adherenceAnalysis": {"adherencePercentage": 82.0, "summary": "Kept protein up. " * 10},
+                "mealLoggingConsistency": {"consistencyPercentage": 90.0},
+            }},
+        })
+    return {
+        "user_profiles": [{
+            "user_id": user_id, "full_name": "Bench User", "age": 30, "gender": "female", "height": 170,
+            "weight": 65, "activity_level": "moderate", "goal": "lose weight",
+        }],
+        "workout_plans": [{
+            "user_id": user_id, "goal": "lose weight", "workout_days_per_week": 4, "workout_duration": 45,
+            "plan": [{"day": DAYS[d], "focus": "Full body", "exercises": [exercise] * 6} for d in range(4)],
+        }],
+        "diet_plans": [{
+            "user_id": user_id, "week_start_date": week[0].isoformat(), "week_end_date": week[-1].isoformat(),
+            "ai_generated_plan": {
+                DAYS[day.weekday()]: {
+                    "date": day.isoformat(), "calories": 1900,
+                    "meals": {slot: ["oats", "eggs", "salad"] for slot in ("breakfast", "lunch", "dinner")},
+                }
+                for day in week
+            },
+        }],
+        "diet_progress_logs": reports,
+        "workout_progress_logs": [{
+            "user_id": user_id,
+            "generated_summary": {
+                "start_date": (today - timedelta(days=14)).isoformat(), "end_date": today.isoformat(),
+                "completed_days": 8, "total_days": 10, "consistency": 80.0, "total_sets": 120,
+                "dailyLog": [{"date": (today - timedelta(days=d)).isoformat(), "calorie_burnout": 300} for d in range(15)],
+                "muscle_distribution": {"chest": 20, "legs": 30, "back": 20, "arms": 10, "shoulders": 10, "core": 10, "other": 0},
+                "tips": [{"title": "Recovery", "tips": ["Sleep 8 hours", "Deload every fourth week"]}],
+            },
+        }],
+    }
+
+
+async def main(args):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
+
+    import httpx
+
+    from app.core.auth import create_jwt_token
+    from app.db.mongodb import db, ensure_indexes
+    from app.main import app
+
+    today = date.today()
+    users = [ObjectId() for _ in range(args.users)]
+    for user in users:
+        for collection, docs in seed_docs(user, today).items():
+            await db[collection].insert_many(docs)
+    await ensure_indexes()
+    headers = {str(u): {"Authorization": f"Bearer {create_jwt_token(str(u), 'bench@example.com')}"} for u in users}
+
+    async def get(client, path, user) -> int:
+        await asyncio.sleep(args.rtt_ms / 1000)
+        response = await client.get(path, headers=headers[str(user)])
+        assert response.status_code == 200, response.text
+        return len(response.content)
+
+    async def sequential(client, user) -> int:
+        return sum([await get(client, path, user) for path in SEQUENTIAL])
+
+    async def dashboard(client, user) -> int:
+        return await get(client, "/api/dashboard", user)
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for label, screen in (("5 calls", sequential), ("dashboard", dashboard)):
+                timings, sizes = [], []
+                for _ in range(args.rounds):
+                    for user in users:
+                        start = time.perf_counter()
+                        sizes.append(await screen(client, user))
+                        timings.append((time.perf_counter() - start) * 1000)
+                results[label] = (timings, statistics.mean(sizes))
+    finally:
+        await db.client.drop_database(args.db_name)
+
+    print(f"{args.users} users, simulated round trip {args.rtt_ms} ms\n")
+    print(f"{'screen':>10} {'loads':>6} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>8}")
+    for label, (timings, size) in results.items():
+        print(f"{label:>10} {len(timings):>6} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f} {size:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard aggregation benchmark")
+    parser.add_argument("--mongo-url", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--db-name", default="workoutbuddy_bench_dashboard")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=60)
+    asyncio.run(main(parser.parse_args()))
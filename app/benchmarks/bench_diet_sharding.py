@@ -0,0 +1,72 @@
+# python -m app.benchmarks.bench_diet_sharding [--trials 5] [--ms-per-output-token 15] [--failure-rate 0.1]
+#
+# Times 7-day diet plan generation against the LLM stub for several
+# DIET_PLAN_SHARD_DAYS values (0 = one completion for the whole week). The
+# stub charges latency per output token like real decoding, and can truncate
+# a share of its JSON answers to exercise per-shard retries.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from app.benchmarks.loadtest import REQUIRED_SETTINGS, start_llm_stub
+
+
+async def main(args):
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
+
+    from app.api.routes.diet import DAYS_OF_WEEK, generate_diet_days
+    from app.config.settings import settings
+    from app.core.metrics import LLM_LATENCY
+    from app.schemas.diet_plan import DietFormRequest
+
+    request = DietFormRequest(
+        diet_type="vegetarian", activity_level="moderate", fitness_goal="gain_muscle",
+        experience_level="beginner", medical_conditions=[], allergies=[], other_allergy="",
+        preferred_workout_style="strength", preferred_training_days_per_week=7
+    )
+    stub = start_llm_stub(
+        args.llm_port, args.llm_latency_ms, 0.0,
+        ms_per_output_token=args.ms_per_output_token, failure_rate=args.failure_rate
+    )
+
+    def llm_calls() -> int:
+        state = LLM_LATENCY._values.get(("groq", "completion"))
+        return state[-1] if state else 0
+
+    print(f"7-day plan, LLM {args.llm_latency_ms} ms + {args.ms_per_output_token} ms/output token, "
+          f"failure rate {args.failure_rate:.0%}, {args.trials} trials\n")
+    print(f"{'shard days':>10} {'median ms':>10} {'max ms':>8} {'LLM calls':>10} {'failed plans':>13}")
+    try:
+        for shard_days in args.shard_days:
+            settings.DIET_PLAN_SHARD_DAYS = shard_days
+            timings, failures, calls_before = [], 0, llm_calls()
+            for _ in range(args.trials):
+                start = time.perf_counter()
+                try:
+                    await generate_diet_days(request, DAYS_OF_WEEK)
+                except ValueError:
+                    failures += 1
+                timings.append((time.perf_counter() - start) * 1000)
+            calls = (llm_calls() - calls_before) / args.trials
+            label = shard_days or "whole"
+            print(f"{label:>10} {statistics.median(timings):>10.0f} {max(timings):>8.0f} {calls:>10.1f} {failures:>13}")
+    finally:
+        stub.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded diet plan generation benchmark")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--shard-days", type=lambda v: [int(x) for x in v.split(",")], default=[0, 3, 2, 1])
+    parser.add_argument("--llm-port", type=int, default=8902)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ms-per-output-token", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    asyncio.run(main(parser.parse_args()))
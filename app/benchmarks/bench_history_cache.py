@@ -0,0 +1,111 @@
+# python -m app.benchmarks.bench_history_cache --mongo-url mongodb://127.0.0.1:27017 [--users 20 --days 365]
+#
+# Seeds a year of meal and workout logs per user into a scratch database and
+# times GET /progress/history/chart (90-day range) three ways: reading the
+# range from Mongo per request (cache disabled), the first request of a user
+# (cold: whole history read into columns) and later requests (warm: served
+# from the in-process columns). The "columns" row times only the cached range
+# read, without the HTTP stack around it.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.benchmarks.loadtest import REQUIRED_SETTINGS
+
+MEAL = [{"item_name": "oats", "quantity": 1, "weight_in_grams": 80}, {"item_name": "banana", "quantity": 1}]
+EXERCISES = [
+    {"name": name, "sets": 3, "reps": "10", "equipment": "Dumbbells", "duration_per_set": None, "completed": i != 2}
+    for i, name in enumerate(("Squat", "Bench Press", "Row", "Plank"))
+]
+
+
+def seed_docs(user_id: ObjectId, days: int, today: date) -> tuple:
+    meals, workouts = [], []
+    for i in range(days):
+        day = datetime.combine(today - timedelta(days=i), datetime.min.time(), tzinfo=timezone.utc)
+        meals.append({"user_id": user_id, "date": day, "meals": {"breakfast": MEAL, "lunch": MEAL, "dinner": MEAL}})
+        if i % 2 == 0:
+            workouts.append({
+                "user_id": user_id, "plan_id": ObjectId(), "date": day, "status": "completed",
+                "logged_at": day, "exercises": EXERCISES
+            })
+    return meals, workouts
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * q))]
+
+
+async def main(args):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
+
+    import httpx
+
+    from app.config.settings import settings
+    from app.core.auth import create_jwt_token
+    from app.core.history_cache import get_history_cache
+    from app.db.mongodb import db, ensure_indexes
+    from app.main import app
+
+    today = date.today()
+    users = [ObjectId() for _ in range(args.users)]
+    for user in users:
+        meals, workouts = seed_docs(user, args.days, today)
+        await db["meal_logs"].insert_many(meals)
+        await db["workout_completions"].insert_many(workouts)
+    await ensure_indexes()
+
+    params = {"start_date": (today - timedelta(days=89)).isoformat(), "end_date": today.isoformat()}
+    headers = {str(u): {"Authorization": f"Bearer {create_jwt_token(str(u), 'bench@example.com')}"} for u in users}
+
+    async def timed(client, user) -> float:
+        start = time.perf_counter()
+        response = await client.get("/api/progress/history/chart", params=params, headers=headers[str(user)])
+        elapsed = (time.perf_counter() - start) * 1000
+        assert response.json()["status"] == 200, response.text
+        return elapsed
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            settings.HISTORY_CACHE_ENABLED = False
+            results["uncached"] = [await timed(client, u) for _ in range(args.rounds) for u in users]
+            settings.HISTORY_CACHE_ENABLED = True
+            results["cold"] = [await timed(client, u) for u in users]
+            results["warm"] = [await timed(client, u) for _ in range(args.rounds) for u in users]
+
+        start_day, end_day = (date.fromisoformat(params[k]) for k in ("start_date", "end_date"))
+        results["columns"] = []
+        for _ in range(args.rounds):
+            for user in users:
+                history = await get_history_cache().get(str(user))
+                start = time.perf_counter()
+                history.range(start_day, end_day)
+                results["columns"].append((time.perf_counter() - start) * 1000)
+    finally:
+        await db.client.drop_database(args.db_name)
+
+    print(f"{args.users} users x {args.days} days, 90-day range\n")
+    print(f"{'path':>9} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, timings in results.items():
+        print(f"{label:>9} {len(timings):>9} {statistics.median(timings):>8.2f} {percentile(timings, 0.95):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar history cache benchmark")
+    parser.add_argument("--mongo-url", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--db-name", default="workoutbuddy_bench_history")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
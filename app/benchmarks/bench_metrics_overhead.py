@@ -0,0 +1,64 @@
+# python -m app.benchmarks.bench_metrics_overhead
+#
+# Measures what the metrics instrumentation adds per request: a trivial route
+# is served in-process with and without MetricsMiddleware, and the raw cost of
+# a histogram observation and a Mongo listener callback is timed on its own.
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import HTTP_LATENCY, MetricsMiddleware, MongoCommandMetrics
+
+REQUESTS = 3000
+OBSERVATIONS = 200_000
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{item_id}")
+    async def ping(item_id: int):
+        return {"item_id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def per_request_us(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(200):  # warm up
+            await client.get(f"/ping/{i}")
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            await client.get(f"/ping/{i}")
+        return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def per_call_ns(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(OBSERVATIONS):
+        fn()
+    return (time.perf_counter() - start) / OBSERVATIONS * 1e9
+
+
+async def main():
+    baseline = await per_request_us(build_app(instrumented=False))
+    instrumented = await per_request_us(build_app(instrumented=True))
+
+    listener = MongoCommandMetrics()
+    event = SimpleNamespace(duration_micros=850, command_name="find")
+
+    print(f"request without metrics:  {baseline:8.1f} us")
+    print(f"request with metrics:     {instrumented:8.1f} us")
+    print(f"middleware overhead:      {instrumented - baseline:8.1f} us/request")
+    print(f"histogram observe:        {per_call_ns(lambda: HTTP_LATENCY.observe(0.012, method='GET', route='/x')):8.0f} ns")
+    print(f"mongo listener callback:  {per_call_ns(lambda: listener.succeeded(event)):8.0f} ns")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+# python -m app.benchmarks.bench_otp_bruteforce
+#
+# Fires a burst of concurrent wrong guesses at /verify against the Mongo
+# instance in MONGO_URL (use a local mongod) and checks that exactly
+# MAX_OTP_ATTEMPTS of them are evaluated, and that each verification
+# costs a single round trip to the OTP collection.
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)  # must happen before the app creates its client
+
+from app.api.routes import auth  # noqa: E402
+from app.schemas.auth import VerifyOTP  # noqa: E402
+
+BURST = 200
+
+
+async def main():
+    email = f"bench-{uuid4().hex}@example.com"
+    await auth.otp_collection.insert_one({
+        "email": email,
+        "otp": "123456",
+        "created_at": datetime.now(timezone.utc),
+        "expires_at": datetime.now(timezone.utc) + timedelta(minutes=10),
+        "attempts": 0
+    })
+    counter.commands.clear()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        auth.verify_account(VerifyOTP(email=email, otp="000000")) for _ in range(BURST)
+    ))
+    elapsed = time.perf_counter() - start
+
+    evaluated = sum(1 for r in results if r["message"] == "Invalid OTP")
+    rejected = sum(1 for r in results if r["status"] == 429)
+    stored = await auth.otp_collection.find_one({"email": email})
+    await auth.otp_collection.delete_one({"email": email})
+
+    print(f"guesses fired:          {BURST}")
+    print(f"guesses evaluated:      {evaluated} (limit {auth.MAX_OTP_ATTEMPTS})")
+    print(f"guesses rejected:       {rejected}")
+    print(f"stored attempts:        {stored['attempts']}")
+    print(f"round trips per verify: {counter.commands['findAndModify'] / BURST:.2f}")
+    print(f"other commands:         {sum(counter.commands.values()) - counter.commands['findAndModify']}")
+    print(f"mean latency:           {elapsed / BURST * 1000:.2f} ms")
+
+    assert evaluated == auth.MAX_OTP_ATTEMPTS
+    assert stored["attempts"] == auth.MAX_OTP_ATTEMPTS
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
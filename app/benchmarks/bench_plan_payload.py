@@ -0,0 +1,85 @@
+# python -m app.benchmarks.bench_plan_payload
+#
+# Compares the old read path (BSON decode of the full plan, ObjectId
+# stringification, JSON encoding) with serving the pre-rendered bytes.
+import time
+from datetime import datetime, timezone
+
+import bson
+from bson import ObjectId
+
+from app.utils.api_response import api_response
+from app.utils.precompressed import negotiate_encoding, render_payload, render_json
+
+ITERATIONS = 2000
+
+
+def sample_workout_plan() -> dict:
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    return {
+        "_id": ObjectId(),
+        "user_id": str(ObjectId()),
+        "age": 29,
+        "gender": "female",
+        "height_cm": 168.0,
+        "weight_kg": 64.5,
+        "activity_level": "moderate",
+        "goal": "gain_muscle",
+        "workout_days_per_week": 5,
+        "workout_duration": "45 minutes",
+        "medical_conditions": [],
+        "injuries_or_limitations": ["mild knee pain"],
+        "plan": [
+            {
+                "day": day,
+                "focus": "Rest" if day in ("Saturday", "Sunday") else "Full Body Strength",
+                "exercises": [] if day in ("Saturday", "Sunday") else [
+                    {
+                        "name": f"Exercise {i}",
+                        "sets": 3,
+                        "reps": "10-12",
+                        "equipment": "Dumbbells",
+                        "duration_per_set": "45 sec",
+                        "instructions": ["Keep your core braced", "Control the lowering phase"],
+                    }
+                    for i in range(6)
+                ],
+            }
+            for day in days
+        ],
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def per_read_us(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    plan = sample_workout_plan()
+    rendered = render_payload(api_response("User workout plans retrieved successfully", 200, [plan]))
+    full_bson = bson.encode({**plan, "rendered": rendered})
+    projected_bson = bson.encode({"_id": plan["_id"], "rendered": rendered})
+
+    def old_read():
+        doc = bson.decode(full_bson)
+        doc.pop("rendered")
+        doc["_id"] = str(doc["_id"])
+        return render_json(api_response("User workout plans retrieved successfully", 200, [doc]))
+
+    def new_read():
+        doc = bson.decode(projected_bson)
+        encoding = negotiate_encoding("gzip, deflate, br", doc["rendered"])
+        return bytes(doc["rendered"][encoding])
+
+    print(f"old read path:      {per_read_us(old_read):8.1f} us/read")
+    print(f"pre-rendered path:  {per_read_us(new_read):8.1f} us/read")
+    for encoding, body in rendered.items():
+        print(f"bytes on the wire ({encoding}): {len(body)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# python -m app.benchmarks.bench_topic_classifier [--folds 5] [--thresholds 0.1,0.2,0.3,0.5]
+#
+# Evaluates the /chat topic pre-classifier with k-fold cross-validation over
+# the bundled labeled set. "Positive" means rejected as off-topic, so
+# precision is the share of rejections that really were off-topic (a miss
+# here refuses a genuine fitness question) and recall is the share of
+# off-topic messages that never reach the LLM. Also times predict().
+import argparse
+import time
+
+from app.core.topic_classifier import TopicClassifier, load_examples
+
+
+def cross_validate(examples: list, folds: int) -> list:
+    scored = []
+    for k in range(folds):
+        train = [e for i, e in enumerate(examples) if i % folds != k]
+        test = [e for i, e in enumerate(examples) if i % folds == k]
+        model = TopicClassifier().fit(train)
+        scored += [(model.predict(text), is_fitness) for text, is_fitness in test]
+    return scored
+
+
+def precision_recall(scored: list, threshold: float) -> tuple:
+    rejected_off_topic = sum(1 for p, is_fitness in scored if p < threshold and not is_fitness)
+    rejected_fitness = sum(1 for p, is_fitness in scored if p < threshold and is_fitness)
+    off_topic = sum(1 for _, is_fitness in scored if not is_fitness)
+    precision = rejected_off_topic / max(1, rejected_off_topic + rejected_fitness)
+    return precision, rejected_off_topic / max(1, off_topic), rejected_fitness
+
+
+def main(args):
+    examples = load_examples()
+    print(f"{len(examples)} labeled messages, {args.folds}-fold cross-validation\n")
+
+    scored = cross_validate(examples, args.folds)
+    print(f"{'threshold':>9} {'precision':>10} {'recall':>8} {'fitness refused':>16}")
+    for threshold in args.thresholds:
+        precision, recall, refused = precision_recall(scored, threshold)
+        print(f"{threshold:>9} {precision:>10.3f} {recall:>8.3f} {refused:>16}")
+
+    start = time.perf_counter()
+    model = TopicClassifier().fit(examples)
+    print(f"\ntraining on the full set: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    texts = [text for text, _ in examples]
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            model.predict(text)
+    per_message = (time.perf_counter() - start) / (args.rounds * len(texts))
+    print(f"predict: {per_message * 1e6:.1f} µs/message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat topic classifier benchmark")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--thresholds", type=lambda v: [float(x) for x in v.split(",")], default=[0.1, 0.2, 0.3, 0.5])
+    parser.add_argument("--rounds", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,66 @@
+# python -m app.benchmarks.bench_workout_regeneration [--trials 3] [--ms-per-output-token 10]
+#
+# Compares regenerating a whole weekly workout plan with regenerating 1-3
+# days through PATCH /workout/plan/{id}/days, against the LLM stub. Reports
+# prompt/completion tokens per call and latency; the stub charges latency
+# per output token like real decoding.
+import argparse
+import os
+import statistics
+import time
+
+from app.benchmarks.loadtest import REQUIRED_SETTINGS, start_llm_stub
+from app.benchmarks.llm_stub import WORKOUT_PLAN
+
+
+def main(args):
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "bench")
+
+    from app.api.routes.workout import build_workout_days_prompt, build_workout_prompt
+    from app.core.metrics import LLM_COMPLETION_TOKENS, LLM_PROMPT_TOKENS
+    from app.schemas.workout import WorkoutDietPlanRequest
+    from app.utils.groq import get_groq_response
+
+    payload = WorkoutDietPlanRequest(
+        age=30, gender="female", height_cm=168, weight_kg=64, activity_level="moderate", goal="gain_muscle",
+        workout_days_per_week=5, workout_duration="45 minutes", injuries_or_limitations=["sore left wrist"]
+    )
+    plan = {**payload.model_dump(), "plan": WORKOUT_PLAN}
+    stub = start_llm_stub(args.llm_port, args.llm_latency_ms, 0.0, ms_per_output_token=args.ms_per_output_token)
+
+    def tokens() -> tuple:
+        key = ("groq", "completion")
+        return LLM_PROMPT_TOKENS._values.get(key, 0), LLM_COMPLETION_TOKENS._values.get(key, 0)
+
+    cases = [("full plan", build_workout_prompt(payload))] + [
+        (f"{n} day(s)", build_workout_days_prompt(plan, ["Monday", "Wednesday", "Friday"][:n], "avoid wrist load"))
+        for n in (3, 2, 1)
+    ]
+    print(f"LLM {args.llm_latency_ms} ms + {args.ms_per_output_token} ms/output token, {args.trials} trials\n")
+    print(f"{'regenerate':>10} {'prompt tok':>11} {'output tok':>11} {'median ms':>10}")
+    try:
+        for label, prompt in cases:
+            before = tokens()
+            timings = []
+            for _ in range(args.trials):
+                start = time.perf_counter()
+                get_groq_response(prompt)
+                timings.append((time.perf_counter() - start) * 1000)
+            prompt_tokens, output_tokens = ((a - b) / args.trials for a, b in zip(tokens(), before))
+            print(f"{label:>10} {prompt_tokens:>11.0f} {output_tokens:>11.0f} {statistics.median(timings):>10.0f}")
+    finally:
+        stub.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partial workout plan regeneration benchmark")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--llm-port", type=int, default=8904)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ms-per-output-token", type=float, default=10.0)
+    main(parser.parse_args())
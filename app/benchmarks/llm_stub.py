@@ -0,0 +1,183 @@
+# python -m app.benchmarks.llm_stub --port 8900 --latency-ms 800 --jitter-ms 200 \
+#     [--ms-per-1k-tokens 300] [--ms-per-output-token 15] [--failure-rate 0.1]
+#
+# Minimal OpenAI-compatible /v1/chat/completions server for load tests.
+# It answers every prompt the app sends with a canned, schema-valid output
+# after a configurable simulated latency, optionally growing with prompt
+# size (prefill) and output size (decoding) like a real model. A failure rate
+# makes some JSON answers malformed. Point the app at it with
+# GROQ_BASE_URL=http://127.0.0.1:8900/v1
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WORKOUT_DAYS = DAYS[:5]
+
+WORKOUT_PLAN = [
+    {
+        "day": day,
+        "focus": "Full Body Strength" if day in WORKOUT_DAYS else "Rest",
+        "exercises": [
+            {
+                "name": name,
+                "sets": 3,
+                "reps": "10-12",
+                "equipment": equipment,
+                "duration_per_set": "45 sec",
+                "instructions": ["Keep your core braced", "Control the lowering phase"]
+            }
+            for name, equipment in [
+                ("Goblet Squat", "Dumbbell"),
+                ("Push-Up", "Bodyweight"),
+                ("Bent-Over Row", "Dumbbells"),
+                ("Glute Bridge", "Bodyweight"),
+                ("Plank", "Bodyweight"),
+            ]
+        ] if day in WORKOUT_DAYS else []
+    }
+    for day in DAYS
+]
+
+DIET_PLAN = {
+    day.lower(): {
+        "breakfast": "Oatmeal with berries, almonds and a boiled egg",
+        "lunch": "Grilled chicken, brown rice and steamed broccoli",
+        "dinner": "Baked salmon, quinoa and a green salad",
+        "calories": "2100"
+    }
+    for day in DAYS
+}
+
+DIET_REPORT = {
+    "dietProgressReport": {
+        "userProfile": {"weight": "70 kg", "period": "range"},
+        "overviewSummary": ["Meals were logged consistently with balanced macros."],
+        "estimatedCalorieBreakdown": {
+            "notes": "Estimates based on typical portion sizes.",
+            "dailyAverages": {"breakfast": 450, "lunch": 700, "dinner": 650, "totalDaily": 1800},
+            "dailyLog": [],
+            "visualizationSuggestion": {
+                "title": "Daily calories",
+                "charts": [{"type": "line", "description": "Total calories per day"}]
+            }
+        },
+        "mealLoggingConsistency": {"consistencyPercentage": 85.0, "summary": "Good", "missedMeals": "Few dinners"},
+        "adherenceAnalysis": {
+            "adherencePercentage": 80.0,
+            "summary": "Mostly on plan",
+            "bestAdherenceDays": "Weekdays",
+            "consumptionPattern": "Larger lunches"
+        },
+        "insightsAndRecommendations": {
+            "nutritionalFeedback": [{"area": "Positives", "points": ["Good protein intake"]}],
+            "recommendations": [{"title": "Hydration", "suggestions": ["Drink more water"]}]
+        },
+        "conclusion": "Keep going."
+    }
+}
+
+WORKOUT_REPORT = {
+    "start_date": "",
+    "end_date": "",
+    "completed_days": 4,
+    "total_days": 5,
+    "consistency": 80.0,
+    "average_rpe": 7.0,
+    "total_sets": 60,
+    "total_reps": 600,
+    "sum_of_all_calorie_burnout": 1400,
+    "dailyLog": [],
+    "muscle_distribution": {"chest": 20, "legs": 25, "back": 20, "arms": 10, "shoulders": 10, "core": 15, "other": 0},
+    "weight": 70.0,
+    "tips": [{"title": "Recovery", "tips": ["Sleep 7-9 hours"]}]
+}
+
+CHAT_REPLY = "A good starting point is **0.8-1g of protein per pound** of body weight.\n* Spread it across meals\n* Prioritize whole foods"
+
+
+def canned_reply(prompt: str) -> str:
+    if "7-day personalized workout plan" in prompt:
+        return json.dumps(WORKOUT_PLAN)
+    if "Regenerate these days only" in prompt:
+        days = re.search(r"Regenerate these days only: ([A-Za-z, ]+)\.", prompt).group(1).split(", ")
+        return json.dumps([day for day in WORKOUT_PLAN if day["day"] in days])
+    if "diet plan in strict JSON" in prompt:
+        requested = re.search(r"Return only the following days: ([a-z, ]+)\.", prompt)
+        days = requested.group(1).split(", ") if requested else list(DIET_PLAN)
+        return json.dumps({day: DIET_PLAN[day] for day in days if day in DIET_PLAN})
+    if "dietProgressReport" in prompt:
+        return json.dumps(DIET_REPORT)
+    if "minimal progress summary" in prompt:
+        return json.dumps(WORKOUT_REPORT)
+    return CHAT_REPLY
+
+
+def create_stub_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, ms_per_1k_tokens: float = 0.0,
+                    ms_per_output_token: float = 0.0, failure_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+
+        content = canned_reply(prompt)
+        if failure_rate and content.startswith(("{", "[")) and random.random() < failure_rate:
+            content = content[:len(content) // 2]  # truncated JSON
+        completion_tokens = len(content) // 4
+
+        delay = max(0.0, random.gauss(latency_ms, jitter_ms)) if jitter_ms else latency_ms
+        delay += ms_per_1k_tokens * prompt_tokens / 1000 + ms_per_output_token * completion_tokens
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        return {
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=0.0, help="extra latency per 1k prompt tokens")
+    parser.add_argument("--ms-per-output-token", type=float, default=0.0, help="extra latency per completion token")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of JSON answers to truncate")
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        args.latency_ms, args.jitter_ms, args.ms_per_1k_tokens, args.ms_per_output_token, args.failure_rate
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# python -m app.benchmarks.loadtest --mongo-url mongodb://127.0.0.1:27017 --users 20 --duration 60 \
+#     --llm-latency-ms 800 --output loadtest.json [--compare previous.json]
+#
+# Boots the API in-process against a local mongod (in a throwaway database)
+# and the LLM stub from app.benchmarks.llm_stub, then drives a weighted mix
+# of realistic user actions from concurrent virtual users. Per-endpoint
+# p50/p95/p99 latency and RPS are written as JSON, tagged with the current
+# commit so runs can be compared across commits.
+#
+# Requires a real, running mongod at --mongo-url (e.g. `docker run -p 27017:27017
+# mongo`); there is no in-memory backend. The app talks to MongoDB through Motor,
+# which mongomock cannot stand in for, and the endpoint latencies are only worth
+# comparing when queries, indexes and round trips are the real ones.
+#
+# --cassette-mode record|replay (with --cassette PATH) records the LLM answers
+# of one run and replays them in later runs without the stub, so only the
+# non-LLM work of each endpoint is measured (see app.utils.llm_cassette).
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+import uvicorn
+
+from app.benchmarks.llm_stub import WORKOUT_DAYS, create_stub_app
+
+# (action, weight): the relative share of each action in the traffic mix
+ACTION_MIX = [
+    ("log_meal", 20),
+    ("update_meal", 10),
+    ("complete_workout", 10),
+    ("read_workout_plan", 15),
+    ("read_diet_plan", 15),
+    ("read_diet_chart", 8),
+    ("read_workout_report", 8),
+    ("read_profile", 8),
+    ("chat", 4),
+    ("generate_diet_report", 1),
+    ("generate_workout_report", 1),
+]
+
+REQUIRED_SETTINGS = [
+    "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "SESSION_SECRET_KEY", "API_SECRET", "SECRET_KEY",
+    "FERNET_KEY", "MAILTRAP_USERNAME", "MAILTRAP_PASSWORD",
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, name: str, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+
+        failed = response.status_code >= 400
+        if not failed and response.headers.get("content-type", "").startswith("application/json"):
+            body = response.json()
+            failed = isinstance(body, dict) and body.get("success") is False
+        if failed:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {"endpoints": endpoints, "total_requests": total, "total_rps": round(total / elapsed, 2)}
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder):
+        self.client = client
+        self.recorder = recorder
+        self.email = f"loadtest-{uuid4().hex[:12]}@example.com"
+        self.headers = {}
+        self.plan_id = None
+        # Distinct past training days, so each completion is a new log
+        self.workout_dates = [
+            d for d in (date.today() - timedelta(days=i) for i in range(1, 400))
+            if d.strftime("%A") in WORKOUT_DAYS
+        ]
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.recorder.call(name, self.client, method, url, headers=self.headers, **kwargs)
+
+    async def setup(self, db):
+        await self.call("register", "POST", "/api/register", json={"email": self.email, "password": "Passw0rd!"})
+        otp = await db["otp_codes"].find_one({"email": self.email})
+        await self.call("verify", "POST", "/api/verify", json={"email": self.email, "otp": otp["otp"]})
+
+        response = await self.call("login", "POST", "/api/login", data={"username": self.email, "password": "Passw0rd!"})
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        await self.call("create_profile", "POST", "/api/user/profile", json={
+            "full_name": "Load Test", "age": 30, "gender": "female", "height": 168,
+            "weight": 64, "activity_level": "moderate", "goal": "gain_muscle"
+        })
+        response = await self.call("generate_workout_plan", "POST", "/api/workout/plan/week", json={
+            "age": 30, "gender": "female", "height_cm": 168, "weight_kg": 64, "activity_level": "moderate",
+            "goal": "gain_muscle", "workout_days_per_week": 5, "workout_duration": "45 minutes"
+        })
+        self.plan_id = response.json()["data"]["plan_id"]
+        await self.call("generate_diet_plan", "POST", "/api/diet/generate-diet-plan/", json={
+            "diet_type": "vegetarian", "activity_level": "moderate", "fitness_goal": "gain_muscle",
+            "experience_level": "beginner", "medical_conditions": [], "allergies": [], "other_allergy": "",
+            "preferred_workout_style": "strength", "preferred_training_days_per_week": 7
+        })
+
+    def random_past_day(self) -> str:
+        return (date.today() - timedelta(days=random.randint(1, 30))).isoformat()
+
+    async def act(self, action: str):
+        if action == "log_meal":
+            await self.call(action, "POST", "/api/progress/meal-log/", json={
+                "date": self.random_past_day(),
+                "breakfast": [{"item_name": "oatmeal", "quantity": 1}],
+                "lunch": [{"item_name": "rice", "weight_in_grams": 200}],
+                "dinner": [{"item_name": "salmon", "weight_in_grams": 150}],
+            })
+        elif action == "update_meal":
+            await self.call(action, "PUT", "/api/meal-log/", json={
+                "date": self.random_past_day(),
+                "lunch": [{"item_name": random.choice(["salad", "rice", "lentils"]), "quantity": 1}],
+            })
+        elif action == "complete_workout" and self.workout_dates:
+            day = self.workout_dates.pop(0)
+            await self.call(action, "POST", "/api/workout/complete", json={
+                "plan_id": self.plan_id, "date": day.isoformat(), "status": "completed",
+                "exercises": [{"name": "Push-Up", "completed": True}, {"name": "Plank", "completed": True}],
+            })
+        elif action == "read_workout_plan":
+            await self.call(action, "GET", "/api/workout/plans/user")
+        elif action == "read_diet_plan":
+            await self.call(action, "GET", "/api/diet/diet-plan/")
+        elif action == "read_diet_chart":
+            await self.call(action, "GET", "/api/progress/diet/chart/progress")
+        elif action == "read_workout_report":
+            await self.call(action, "GET", "/api/workout/progress/report")
+        elif action == "read_profile":
+            await self.call(action, "GET", "/api/user/profile")
+        elif action == "chat":
+            await self.call(action, "POST", "/api/chat", json={"message": "How much protein should I eat?"})
+        elif action in ("generate_diet_report", "generate_workout_report"):
+            path = "Diet" if action == "generate_diet_report" else "Workout"
+            params = {"start_date": (date.today() - timedelta(days=30)).isoformat(), "end_date": date.today().isoformat()}
+            await self.call(action, "GET", f"/api/progress/{path}/generate", params=params)
+
+    async def run_until(self, deadline: float):
+        actions, weights = zip(*ACTION_MIX)
+        while time.perf_counter() < deadline:
+            await self.act(random.choices(actions, weights)[0])
+
+
+def start_llm_stub(port: int, latency_ms: float, jitter_ms: float, ms_per_1k_tokens: float = 0.0,
+                   ms_per_output_token: float = 0.0, failure_rate: float = 0.0) -> uvicorn.Server:
+    app = create_stub_app(latency_ms, jitter_ms, ms_per_1k_tokens, ms_per_output_token, failure_rate)
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_comparison(report: dict, previous: dict):
+    print(f"\n{'endpoint':28} {'p50 ms':>18} {'p95 ms':>18} {'rps':>16}")
+    for name, current in report["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        cells = [
+            f"{before[key]:>7} -> {current[key]:<7}" for key in ("p50_ms", "p95_ms", "rps")
+        ]
+        print(f"{name:28} {cells[0]:>18} {cells[1]:>18} {cells[2]:>16}")
+
+
+async def main(args):
+    # Settings are read at import time, so configure the app before importing it
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"  # every virtual user shares one IP
+    os.environ["LLM_CASSETTE_MODE"] = args.cassette_mode
+    os.environ["LLM_CASSETTE_PATH"] = args.cassette
+    os.environ.setdefault("FROM_EMAIL", "loadtest@example.com")
+    for name in REQUIRED_SETTINGS:
+        os.environ.setdefault(name, "loadtest")
+
+    from app.api.routes import auth
+    from app.db.mongodb import client as mongo_client, db, ensure_indexes
+    from app.main import app
+
+    # Verification emails are an external side effect; the OTP is read from Mongo instead
+    auth.send_verification_email = lambda to_email, otp: None
+
+    stub = None
+    if args.cassette_mode != "replay":
+        stub = start_llm_stub(args.llm_port, args.llm_latency_ms, args.llm_jitter_ms)
+    await ensure_indexes()
+    recorder = Recorder()
+
+    try:
+        # App exceptions become 500 responses and are counted as errors
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+            users = [VirtualUser(client, recorder) for _ in range(args.users)]
+            await asyncio.gather(*(user.setup(db) for user in users))
+
+            start = time.perf_counter()
+            await asyncio.gather(*(user.run_until(start + args.duration) for user in users))
+            elapsed = time.perf_counter() - start
+    finally:
+        if stub is not None:
+            stub.should_exit = True
+        if not args.keep_data:
+            await mongo_client.drop_database(args.db_name)
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "cassette_mode": args.cassette_mode,
+            "mix": dict(ACTION_MIX),
+        },
+        **recorder.report(elapsed),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Workout Buddy load test")
+    parser.add_argument("--mongo-url", default="mongodb://127.0.0.1:27017", help="a running mongod (required)")
+    parser.add_argument("--db-name", default=f"workoutbuddy_loadtest_{uuid4().hex[:6]}")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of steady-state traffic")
+    parser.add_argument("--llm-port", type=int, default=8900)
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--cassette-mode", choices=["off", "record", "replay"], default="off")
+    parser.add_argument("--cassette", default="cassettes/loadtest.jsonl.gz", help="LLM cassette file")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    parser.add_argument("--keep-data", action="store_true", help="keep the load test database")
+    asyncio.run(main(parser.parse_args()))
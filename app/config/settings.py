@@ -23,6 +23,70 @@ class Settings(BaseSettings):
     MAILTRAP_PASSWORD: str = Field(..., json_schema_extra={"env": "MAILTRAP_PASSWORD"})
     FROM_EMAIL: str = Field(..., json_schema_extra={"env": "FROM_EMAIL"})
     GROQ_API_KEY: str = Field(..., json_schema_extra={"env": "GROQ_API_KEY"})
+    GROQ_BASE_URL: str = Field("https://api.groq.com/openai/v1", json_schema_extra={"env": "GROQ_BASE_URL"})
+
+    # LLM cassettes: "off", "record" real completions, or "replay" them offline
+    LLM_CASSETTE_MODE: str = Field("off", json_schema_extra={"env": "LLM_CASSETTE_MODE"})
+    LLM_CASSETTE_PATH: str = Field("cassettes/llm.jsonl.gz", json_schema_extra={"env": "LLM_CASSETTE_PATH"})
+    LLM_CASSETTE_LATENCY: str = Field("none", json_schema_extra={"env": "LLM_CASSETTE_LATENCY"})  # none | recorded | gauss
+    LLM_CASSETTE_LATENCY_MS: float = Field(0.0, json_schema_extra={"env": "LLM_CASSETTE_LATENCY_MS"})
+    LLM_CASSETTE_JITTER_MS: float = Field(0.0, json_schema_extra={"env": "LLM_CASSETTE_JITTER_MS"})
+
+    # Local pre-classifier that answers clearly off-topic /chat messages without the LLM
+    CHAT_TOPIC_FILTER_ENABLED: bool = Field(True, json_schema_extra={"env": "CHAT_TOPIC_FILTER_ENABLED"})
+    CHAT_TOPIC_THRESHOLD: float = Field(0.1, json_schema_extra={"env": "CHAT_TOPIC_THRESHOLD"})
+
+    # Near-duplicate answer cache for /chat (estimated Jaccard similarity of word shingles)
+    CHAT_CACHE_ENABLED: bool = Field(True, json_schema_extra={"env": "CHAT_CACHE_ENABLED"})
+    CHAT_CACHE_THRESHOLD: float = Field(0.7, json_schema_extra={"env": "CHAT_CACHE_THRESHOLD"})
+    CHAT_CACHE_MAX_ENTRIES: int = Field(5000, json_schema_extra={"env": "CHAT_CACHE_MAX_ENTRIES"})
+    CHAT_CACHE_TTL_DAYS: int = Field(30, json_schema_extra={"env": "CHAT_CACHE_TTL_DAYS"})
+
+    # Per-user chat sessions: last N turns verbatim plus a rolling summary, within a token budget
+    CHAT_MEMORY_ENABLED: bool = Field(True, json_schema_extra={"env": "CHAT_MEMORY_ENABLED"})
+    CHAT_MEMORY_TURNS: int = Field(6, json_schema_extra={"env": "CHAT_MEMORY_TURNS"})
+    CHAT_CONTEXT_TOKENS: int = Field(1500, json_schema_extra={"env": "CHAT_CONTEXT_TOKENS"})
+    CHAT_SUMMARY_MAX_CHARS: int = Field(1200, json_schema_extra={"env": "CHAT_SUMMARY_MAX_CHARS"})
+    CHAT_SESSION_TTL_DAYS: int = Field(90, json_schema_extra={"env": "CHAT_SESSION_TTL_DAYS"})
+
+    # Diet plans are generated in groups of this many days concurrently (0 = whole plan in one completion)
+    DIET_PLAN_SHARD_DAYS: int = Field(1, json_schema_extra={"env": "DIET_PLAN_SHARD_DAYS"})
+    DIET_PLAN_MAX_CONCURRENCY: int = Field(7, json_schema_extra={"env": "DIET_PLAN_MAX_CONCURRENCY"})
+    DIET_PLAN_SHARD_RETRIES: int = Field(2, json_schema_extra={"env": "DIET_PLAN_SHARD_RETRIES"})
+
+    # Diet progress reports: superseded generations kept per range, and expiry of untouched reports
+    DIET_REPORT_HISTORY: int = Field(5, json_schema_extra={"env": "DIET_REPORT_HISTORY"})
+    DIET_REPORT_TTL_DAYS: int = Field(365, json_schema_extra={"env": "DIET_REPORT_TTL_DAYS"})
+
+    # Meal/workout log dates are native datetimes; keep matching the old strings until
+    # python -m app.jobs.migrate_log_dates reports none left, then set this to false
+    LEGACY_DATE_STRINGS: bool = Field(True, json_schema_extra={"env": "LEGACY_DATE_STRINGS"})
+
+    # user_profiles/workout_plans still hold string user ids; keep matching them until they are migrated
+    LEGACY_USER_ID_STRINGS: bool = Field(True, json_schema_extra={"env": "LEGACY_USER_ID_STRINGS"})
+
+    # In-process columnar meal/workout history for the analytics endpoints
+    HISTORY_CACHE_ENABLED: bool = Field(True, json_schema_extra={"env": "HISTORY_CACHE_ENABLED"})
+    HISTORY_CACHE_MAX_MB: int = Field(32, json_schema_extra={"env": "HISTORY_CACHE_MAX_MB"})
+    HISTORY_CACHE_TTL_SECONDS: int = Field(300, json_schema_extra={"env": "HISTORY_CACHE_TTL_SECONDS"})
+
+    # Delta sync: how long deletions are remembered, and how far back each sync re-reads
+    SYNC_TOMBSTONE_TTL_DAYS: int = Field(90, json_schema_extra={"env": "SYNC_TOMBSTONE_TTL_DAYS"})
+    SYNC_CURSOR_OVERLAP_SECONDS: int = Field(5, json_schema_extra={"env": "SYNC_CURSOR_OVERLAP_SECONDS"})
+
+    # Serve pre-generated plans (app.jobs.build_plan_catalog) to profiles without conditions or injuries
+    PLAN_CATALOG_ENABLED: bool = Field(True, json_schema_extra={"env": "PLAN_CATALOG_ENABLED"})
+
+    # Rate limiting ("memory" per process, "mongo" shared across workers)
+    RATE_LIMIT_ENABLED: bool = Field(True, json_schema_extra={"env": "RATE_LIMIT_ENABLED"})
+    RATE_LIMIT_BACKEND: str = Field("memory", json_schema_extra={"env": "RATE_LIMIT_BACKEND"})
+
+    # Observability
+    METRICS_ENABLED: bool = Field(True, json_schema_extra={"env": "METRICS_ENABLED"})
+    PROFILING_ENABLED: bool = Field(False, json_schema_extra={"env": "PROFILING_ENABLED"})
+    PROFILING_SAMPLE_RATE: float = Field(0.0, json_schema_extra={"env": "PROFILING_SAMPLE_RATE"})
+    PROFILING_INTERVAL_MS: float = Field(5.0, json_schema_extra={"env": "PROFILING_INTERVAL_MS"})
+    PROFILING_OUTPUT_DIR: str = Field("profiles", json_schema_extra={"env": "PROFILING_OUTPUT_DIR"})
 
     model_config = {
         "env_file": ".env",
@@ -2,7 +2,7 @@ from jose import jwt, JWTError
 from fastapi import status, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
-from typing import Union
+from typing import Optional, Union
 from app.config.settings import settings
  
 SECRET_KEY = settings.SECRET_KEY
@@ -45,4 +45,12 @@ def create_reset_token(email: str) -> str:
         "sub": email,
         "exp": datetime.now(timezone.utc) + timedelta(hours=1)
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login", auto_error=False)
+
+# For routes that also serve anonymous users: None without a token, 401 for a bad one
+def get_optional_user_id(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    if token is None:
+        return None
+    return get_current_user_id(token)
@@ -0,0 +1,200 @@
+import random
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from hashlib import sha1
+from typing import Optional
+
+from app.config.settings import settings
+from app.core.metrics import CHAT_CACHE_ENTRIES, CHAT_CACHE_EVICTIONS, CHAT_CACHE_LOOKUPS
+from app.core.topic_classifier import STOPWORDS, TOKEN_RE
+
+MERSENNE_PRIME = (1 << 61) - 1
+# Greetings and politeness that do not change what is being asked
+FILLERS = STOPWORDS | frozenset(
+    "please thanks thank hey hi hello tell know quick question wondering was am im could would just "
+    "really some any need".split()
+)
+# "hi", "why?" or "is it good?" normalize to (almost) nothing, so they would all share one
+# entry whatever they follow; such messages are neither looked up nor stored
+MIN_TOKENS = 2
+
+
+def normalize(message: str) -> list:
+    """Lowercased, crudely singularized word tokens without punctuation or filler words."""
+    tokens = []
+    for t in TOKEN_RE.findall(message.lower()):
+        if t in FILLERS:
+            continue
+        if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+            t = t[:-1]
+        tokens.append(t)
+    return tokens
+
+
+def shingles(tokens: list) -> set:
+    """
+    Word unigrams and bigrams. Word-level shingles keep "lose weight" and
+    "gain weight" apart, which character shingles would happily merge.
+    """
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items: set) -> tuple:
+        hashes = [zlib.crc32(item.encode()) for item in items] or [0]
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self.params)
+
+
+def similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """Estimated Jaccard similarity: the share of matching MinHash slots."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class ChatAnswerCache:
+    """
+    Near-duplicate question -> answer cache for /chat (raw model markdown).
+
+    Messages are normalized, shingled and MinHashed; an LSH index over
+    `bands` x `rows` signature slices finds candidates, and a candidate is a
+    hit when its estimated Jaccard similarity reaches `threshold`. Entries
+    live in an in-memory LRU of `max_entries` and are written through to
+    Mongo (`chat_answer_cache`, expired by a TTL index) so that restarts and
+    other workers start warm via load().
+    """
+
+    def __init__(self, collection=None, threshold: float = 0.7, max_entries: int = 5000,
+                 num_perm: int = 64, bands: int = 16):
+        self.collection = collection
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._entries = OrderedDict()  # key -> (signature, response)
+        self._buckets = {}  # (band, slice) -> set of keys
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature: tuple) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _index(self, key: str, signature: tuple, response: str):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._entries[key] = (signature, response)
+            return
+        self._entries[key] = (signature, response)
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            old_key, (old_signature, _) = self._entries.popitem(last=False)
+            for band_key in self._band_keys(old_signature):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(old_key)
+                    if not bucket:
+                        del self._buckets[band_key]
+            CHAT_CACHE_EVICTIONS.inc()
+        CHAT_CACHE_ENTRIES.set(len(self._entries))
+
+    def _signature(self, message: str) -> Optional[tuple]:
+        """Returns (exact key, MinHash signature) for a message, or None when it has fewer than MIN_TOKENS tokens."""
+        tokens = normalize(message)
+        if len(tokens) < MIN_TOKENS:
+            return None
+        key = sha1(" ".join(tokens).encode()).hexdigest()
+        return key, self.hasher.signature(shingles(tokens))
+
+    def lookup(self, message: str) -> Optional[str]:
+        signed = self._signature(message)
+        if signed is None:
+            CHAT_CACHE_LOOKUPS.inc(result="skipped")
+            return None
+        key, signature = signed
+
+        best_key, best_score = None, 0.0
+        if key in self._entries:
+            best_key, best_score = key, 1.0
+        else:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+            for candidate in candidates:
+                score = similarity(signature, self._entries[candidate][0])
+                if score > best_score:
+                    best_key, best_score = candidate, score
+
+        if best_key is None or best_score < self.threshold:
+            CHAT_CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        CHAT_CACHE_LOOKUPS.inc(result="hit")
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+
+    async def store(self, message: str, response: str):
+        signed = self._signature(message)
+        if signed is None:
+            return
+        key, signature = signed
+        self._index(key, signature, response)
+        if self.collection is None:
+            return
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "question": message,
+                    "signature": list(signature),
+                    "response": response,
+                    "created_at": datetime.now(timezone.utc)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            # The answer is already served and cached in memory
+            print("❌ Failed to persist chat answer:", e)
+
+    async def load(self):
+        """Warms the in-memory index with the most recent persisted answers."""
+        if self.collection is None:
+            return
+        start = time.perf_counter()
+        try:
+            cursor = self.collection.find(
+                {}, {"signature": 1, "response": 1}
+            ).sort("created_at", -1).limit(self.max_entries)
+            docs = await cursor.to_list(length=self.max_entries)
+        except Exception as e:
+            print("❌ Failed to load cached chat answers:", e)
+            return
+        # Oldest first, so the newest answers end up most recently used
+        for doc in reversed(docs):
+            self._index(doc["_id"], tuple(doc["signature"]), doc["response"])
+        print(f"💬 Loaded {len(docs)} cached chat answers in {time.perf_counter() - start:.2f}s")
+
+
+_cache = None
+
+
+def get_chat_cache() -> Optional[ChatAnswerCache]:
+    global _cache
+    if not settings.CHAT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        from app.db.mongodb import db
+        _cache = ChatAnswerCache(
+            db["chat_answer_cache"],
+            threshold=settings.CHAT_CACHE_THRESHOLD,
+            max_entries=settings.CHAT_CACHE_MAX_ENTRIES
+        )
+    return _cache
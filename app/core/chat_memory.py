@@ -0,0 +1,161 @@
+import asyncio
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from starlette.concurrency import run_in_threadpool
+
+from app.config.settings import settings
+from app.utils.groq import create_completion
+
+# Stored turns beyond this many windows are dropped even if summarization lags
+BUFFER_WINDOWS = 4
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and their fitness assistant. "
+    "Update the summary with the new exchanges below. Keep facts that matter for future advice "
+    "(goals, injuries, preferences, equipment, diet restrictions, plans agreed on) and drop small talk. "
+    "Reply with the updated summary only, in at most {max_words} words.\n\n"
+    "Current summary:\n{summary}\n\nNew exchanges:\n{exchanges}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; only used for budgeting
+    return len(text) // 4 + 1
+
+
+def build_context(summary: str, turns: list, token_budget: int) -> list:
+    """
+    Chat messages for the prompt: the rolling summary, then as many of the
+    most recent turns as fit in `token_budget` (newest kept first).
+    """
+    messages = []
+    budget = token_budget
+    if summary:
+        budget -= estimate_tokens(summary)
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+
+    recent = []
+    for turn in reversed(turns):
+        cost = estimate_tokens(turn["user"]) + estimate_tokens(turn["assistant"])
+        if cost > budget:
+            break
+        budget -= cost
+        recent.append(turn)
+
+    for turn in reversed(recent):
+        messages.append({"role": "user", "content": turn["user"]})
+        messages.append({"role": "assistant", "content": turn["assistant"]})
+    return messages
+
+
+class ChatMemory:
+    """
+    Per-user chat sessions (`chat_sessions`, one document per user).
+
+    Every turn is appended with a sequence number. The prompt carries the
+    rolling summary plus every turn not yet folded into it, trimmed to
+    `token_budget`. Once `2 * max_turns` turns are unsummarized, all but the
+    newest `max_turns` are folded into the summary by a background task and
+    pulled from the document, so the prompt holds fewer than `2 * max_turns`
+    turns and its size does not grow with the conversation.
+    """
+
+    def __init__(self, collection, max_turns: int = 6, token_budget: int = 1500, summary_max_chars: int = 1200):
+        self.collection = collection
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_max_chars = summary_max_chars
+        self._summarizing = set()
+
+    async def context(self, user_id: str) -> list:
+        session = await self.collection.find_one(
+            {"_id": ObjectId(user_id)}, {"summary": 1, "summarized_through": 1, "turns": 1}
+        )
+        if not session:
+            return []
+        # Turns leave the prompt only once they are in the summary
+        summarized_through = session.get("summarized_through", 0)
+        turns = [t for t in session.get("turns", []) if t["seq"] > summarized_through]
+        return build_context(session.get("summary", ""), turns, self.token_budget)
+
+    async def append(self, user_id: str, user_message: str, reply: str):
+        session = await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            [
+                {"$set": {"turn_count": {"$add": [{"$ifNull": ["$turn_count", 0]}, 1]}}},
+                {"$set": {
+                    "turns": {"$slice": [
+                        {"$concatArrays": [
+                            {"$ifNull": ["$turns", []]},
+                            [{"seq": "$turn_count", "user": {"$literal": user_message}, "assistant": {"$literal": reply}}]
+                        ]},
+                        -self.max_turns * BUFFER_WINDOWS
+                    ]},
+                    "summary": {"$ifNull": ["$summary", ""]},
+                    "summarized_through": {"$ifNull": ["$summarized_through", 0]},
+                    "updated_at": "$$NOW"
+                }}
+            ],
+            projection={"turn_count": 1, "summarized_through": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        unsummarized = session["turn_count"] - session["summarized_through"]
+        if unsummarized >= 2 * self.max_turns and user_id not in self._summarizing:
+            self._summarizing.add(user_id)
+            asyncio.create_task(self._summarize(user_id))
+
+    async def _summarize(self, user_id: str):
+        try:
+            session = await self.collection.find_one(
+                {"_id": ObjectId(user_id)}, {"summary": 1, "summarized_through": 1, "turns": 1}
+            )
+            old = [t for t in session["turns"] if t["seq"] > session["summarized_through"]][:-self.max_turns]
+            if not old:
+                return
+
+            exchanges = "\n".join(f"User: {t['user']}\nAssistant: {t['assistant']}" for t in old)
+            prompt = SUMMARY_PROMPT.format(
+                max_words=self.summary_max_chars // 6,
+                summary=session["summary"] or "(none yet)",
+                exchanges=exchanges
+            )
+            summary = await run_in_threadpool(create_completion, "chat_summary", [{"role": "user", "content": prompt}])
+
+            # Guarded on summarized_through, so a concurrent summarizer in another worker cannot fold twice
+            await self.collection.update_one(
+                {"_id": ObjectId(user_id), "summarized_through": session["summarized_through"]},
+                {
+                    "$set": {"summary": summary[:self.summary_max_chars], "summarized_through": old[-1]["seq"]},
+                    "$pull": {"turns": {"seq": {"$lte": old[-1]["seq"]}}}
+                }
+            )
+        except Exception as e:
+            print(f"❌ Failed to summarize chat session {user_id}:", e)
+        finally:
+            self._summarizing.discard(user_id)
+
+    async def reset(self, user_id: str) -> bool:
+        result = await self.collection.delete_one({"_id": ObjectId(user_id)})
+        return result.deleted_count > 0
+
+
+_memory = None
+
+
+def get_chat_memory() -> Optional[ChatMemory]:
+    global _memory
+    if not settings.CHAT_MEMORY_ENABLED:
+        return None
+    if _memory is None:
+        from app.db.mongodb import db
+        _memory = ChatMemory(
+            db["chat_sessions"],
+            max_turns=settings.CHAT_MEMORY_TURNS,
+            token_budget=settings.CHAT_CONTEXT_TOKENS,
+            summary_max_chars=settings.CHAT_SUMMARY_MAX_CHARS
+        )
+    return _memory
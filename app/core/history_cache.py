@@ -0,0 +1,260 @@
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+from app.config.settings import settings
+from app.core.metrics import HISTORY_CACHE_BYTES, HISTORY_CACHE_EVICTIONS, HISTORY_CACHE_LOOKUPS
+from app.db.user_keys import user_key
+from app.utils.dates import day_range_filter, day_string
+
+MEAL_SLOTS = ("breakfast", "lunch", "dinner")
+# Column name -> array typecode
+MEAL_COLUMNS = {"slots": "b", "items": "l", "grams": "d", "kcal": "d"}
+WORKOUT_COLUMNS = {"logs": "l", "completed": "l", "exercises": "l", "exercises_done": "l", "sets": "l", "reps": "l"}
+
+REPS_RE = re.compile(r"\d+")
+
+
+def day_ordinal(value) -> int:
+    """Proleptic ordinal of a stored log date (native or legacy string)."""
+    return date.fromisoformat(day_string(value)).toordinal()
+
+
+def meal_row(meals: dict) -> dict:
+    """Columns for one day's meal log: a bitmask of logged slots, item count, grams and item calories."""
+    row = {"slots": 0, "items": 0, "grams": 0.0, "kcal": 0.0}
+    for i, slot in enumerate(MEAL_SLOTS):
+        items = (meals or {}).get(slot) or []
+        if items:
+            row["slots"] |= 1 << i
+        row["items"] += len(items)
+        row["grams"] += sum(item.get("weight_in_grams") or 0.0 for item in items)
+        row["kcal"] += sum(item.get("calories") or 0.0 for item in items)
+    return row
+
+
+def parse_reps(reps) -> int:
+    """Repetitions in a plan's reps field ("12", "8-10" -> 8); timed sets ("30 sec") count none."""
+    text = str(reps or "").lower()
+    if "sec" in text or "min" in text:
+        return 0
+    match = REPS_RE.search(text)
+    return int(match.group()) if match else 0
+
+
+def workout_row(log: dict) -> dict:
+    """Columns for one workout_completions document; several logs on a day are summed."""
+    exercises = log.get("exercises") or []
+    done = [e for e in exercises if e.get("completed")]
+    return {
+        "logs": 1,
+        "completed": 1 if log.get("status") == "completed" else 0,
+        "exercises": len(exercises),
+        "exercises_done": len(done),
+        "sets": sum(e.get("sets") or 0 for e in done),
+        "reps": sum((e.get("sets") or 0) * parse_reps(e.get("reps")) for e in done),
+    }
+
+
+class Series:
+    """
+    One row per day: a sorted array of day ordinals plus one typed array per
+    column. Range reads are two bisects and array slices.
+    """
+
+    def __init__(self, columns: dict):
+        self.days = array("l")
+        self.columns = {name: array(code) for name, code in columns.items()}
+
+    def _find(self, ordinal: int) -> int:
+        i = bisect_left(self.days, ordinal)
+        return i if i < len(self.days) and self.days[i] == ordinal else -1
+
+    def set(self, ordinal: int, row: dict):
+        i = self._find(ordinal)
+        if i >= 0:
+            for name, values in self.columns.items():
+                values[i] = row[name]
+            return
+        i = bisect_left(self.days, ordinal)
+        self.days.insert(i, ordinal)
+        for name, values in self.columns.items():
+            values.insert(i, row[name])
+
+    def add(self, ordinal: int, row: dict):
+        i = self._find(ordinal)
+        if i < 0:
+            self.set(ordinal, row)
+            return
+        for name, values in self.columns.items():
+            values[i] += row[name]
+
+    def remove(self, ordinal: int):
+        i = self._find(ordinal)
+        if i >= 0:
+            del self.days[i]
+            for values in self.columns.values():
+                del values[i]
+
+    def slice(self, start: int, end: int) -> tuple:
+        """(days, {column: values}) for start <= day <= end."""
+        lo, hi = bisect_left(self.days, start), bisect_right(self.days, end)
+        return self.days[lo:hi], {name: values[lo:hi] for name, values in self.columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.days, *self.columns.values()))
+
+
+class UserHistory:
+    def __init__(self):
+        self.meals = Series(MEAL_COLUMNS)
+        self.workouts = Series(WORKOUT_COLUMNS)
+        self.loaded_at = time.monotonic()
+
+    @property
+    def nbytes(self) -> int:
+        return self.meals.nbytes + self.workouts.nbytes
+
+    def range(self, start: date, end: date) -> dict:
+        """Per-day columns and totals for meals and workouts between two dates, inclusive."""
+        result = {}
+        for name, series in (("meals", self.meals), ("workouts", self.workouts)):
+            days, columns = series.slice(start.toordinal(), end.toordinal())
+            result[name] = {
+                "dates": [date.fromordinal(d).isoformat() for d in days],
+                **{column: values.tolist() for column, values in columns.items()},
+                "totals": {column: sum(values) for column, values in columns.items() if column != "slots"},
+            }
+        result["meals"]["totals"]["days_logged"] = len(result["meals"]["dates"])
+        return result
+
+
+async def read_user_history(meal_logs, workout_logs, user_id: str, start: date = None, end: date = None) -> UserHistory:
+    """Reads a user's meal and workout logs into columns, optionally only those between two dates."""
+    query = {"user_id": user_key(user_id)}
+    if start is not None and end is not None:
+        query.update(day_range_filter(start, end))
+
+    history = UserHistory()
+    async for log in meal_logs.find(query, {"date": 1, "meals": 1}):
+        history.meals.set(day_ordinal(log["date"]), meal_row(log.get("meals")))
+    async for log in workout_logs.find(
+        query, {"date": 1, "status": 1, "exercises.sets": 1, "exercises.reps": 1, "exercises.completed": 1}
+    ):
+        history.workouts.add(day_ordinal(log["date"]), workout_row(log))
+    return history
+
+
+class HistoryCache:
+    """
+    Per-user columnar copies of meal_logs and workout_completions for the
+    analytics endpoints. A user's history is read from Mongo once, on first
+    use, and then kept current by the write routes (apply_* below) instead of
+    being re-read per request. Users are evicted least recently used first
+    once the arrays exceed `max_bytes`. Entries also expire after
+    `ttl_seconds`, which bounds how long writes served by another worker
+    process stay invisible here.
+    """
+
+    def __init__(self, meal_logs, workout_logs, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 300):
+        self.meal_logs = meal_logs
+        self.workout_logs = workout_logs
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._users = OrderedDict()  # user_id -> UserHistory
+        self._bytes = 0
+        self._building = {}  # user_id -> writes seen while its history was being read
+
+    def _cached(self, user_id: str) -> Optional[UserHistory]:
+        history = self._users.get(user_id)
+        if history is not None and time.monotonic() - history.loaded_at > self.ttl_seconds:
+            self._drop(user_id)
+            return None
+        return history
+
+    def _drop(self, user_id: str):
+        history = self._users.pop(user_id, None)
+        if history is not None:
+            self._bytes -= history.nbytes
+            HISTORY_CACHE_BYTES.set(self._bytes)
+
+    def _store(self, user_id: str, history: UserHistory):
+        self._drop(user_id)
+        self._users[user_id] = history
+        self._bytes += history.nbytes
+        while self._bytes > self.max_bytes and len(self._users) > 1:
+            old_user, old_history = self._users.popitem(last=False)
+            self._bytes -= old_history.nbytes
+            HISTORY_CACHE_EVICTIONS.inc()
+        HISTORY_CACHE_BYTES.set(self._bytes)
+
+    async def get(self, user_id: str) -> UserHistory:
+        history = self._cached(user_id)
+        if history is not None:
+            HISTORY_CACHE_LOOKUPS.inc(result="hit")
+            self._users.move_to_end(user_id)
+            return history
+
+        HISTORY_CACHE_LOOKUPS.inc(result="miss")
+        self._building[user_id] = self._building.get(user_id, 0)
+        try:
+            history = await read_user_history(self.meal_logs, self.workout_logs, user_id)
+            # A write landed while reading, so the snapshot may miss it: serve it, don't keep it
+            if self._building.get(user_id) == 0:
+                self._store(user_id, history)
+        finally:
+            self._building.pop(user_id, None)
+        return history
+
+    def _touch_write(self, user_id: str) -> Optional[UserHistory]:
+        if user_id in self._building:
+            self._building[user_id] += 1
+        history = self._cached(user_id)
+        if history is not None:
+            self._bytes -= history.nbytes
+        return history
+
+    def _after_write(self, history: UserHistory):
+        self._bytes += history.nbytes
+        HISTORY_CACHE_BYTES.set(self._bytes)
+
+    def apply_meal_log(self, user_id: str, day, meals: dict):
+        history = self._touch_write(user_id)
+        if history is not None:
+            history.meals.set(day_ordinal(day), meal_row(meals))
+            self._after_write(history)
+
+    def apply_meal_log_deleted(self, user_id: str, day):
+        history = self._touch_write(user_id)
+        if history is not None:
+            history.meals.remove(day_ordinal(day))
+            self._after_write(history)
+
+    def apply_workout_log(self, user_id: str, log: dict):
+        history = self._touch_write(user_id)
+        if history is not None:
+            history.workouts.add(day_ordinal(log["date"]), workout_row(log))
+            self._after_write(history)
+
+
+_cache = None
+
+
+def get_history_cache() -> Optional[HistoryCache]:
+    global _cache
+    if not settings.HISTORY_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        from app.db.mongodb import db
+        _cache = HistoryCache(
+            db["meal_logs"],
+            db["workout_completions"],
+            max_bytes=settings.HISTORY_CACHE_MAX_MB * 1024 * 1024,
+            ttl_seconds=settings.HISTORY_CACHE_TTL_SECONDS
+        )
+    return _cache
@@ -0,0 +1,209 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Sequence, Tuple
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        # pymongo listeners and threadpool LLM calls report from worker threads
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last slot is +Inf), then sum and count
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+# 🌐 HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+HTTP_IN_FLIGHT = Gauge("http_requests_in_progress", "HTTP requests currently being served.", ["method"])
+
+# 🍃 MongoDB
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency.", ["command", "outcome"], buckets=MONGO_BUCKETS
+)
+
+# 🤖 LLM providers
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "LLM call latency.", ["provider", "call"])
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Prompt tokens sent to LLM providers.", ["provider", "call"])
+LLM_COMPLETION_TOKENS = Counter(
+    "llm_completion_tokens_total", "Completion tokens returned by LLM providers.", ["provider", "call"]
+)
+LLM_ERRORS = Counter("llm_errors_total", "Failed LLM calls.", ["provider", "call"])
+CHAT_TOPIC_DECISIONS = Counter(
+    "chat_topic_filter_total", "Chat messages passed to the LLM or answered by the topic filter.", ["decision"]
+)
+
+# 📊 Stored AI reports
+REPORT_CACHE_LOOKUPS = Counter(
+    "report_cache_lookups_total", "Stored AI report reuse: hit, miss (data changed) or refresh (forced).",
+    ["report", "result"]
+)
+
+# 💬 Chat answer cache
+CHAT_CACHE_LOOKUPS = Counter("chat_cache_lookups_total", "Chat answer cache lookups by result.", ["result"])
+CHAT_CACHE_EVICTIONS = Counter("chat_cache_evictions_total", "Chat answers evicted from the in-memory cache.")
+CHAT_CACHE_ENTRIES = Gauge("chat_cache_entries", "Chat answers held in the in-memory cache.")
+
+# 📈 Columnar per-user history
+HISTORY_CACHE_LOOKUPS = Counter("history_cache_lookups_total", "Per-user history cache lookups by result.", ["result"])
+HISTORY_CACHE_EVICTIONS = Counter("history_cache_evictions_total", "Users evicted from the history cache.")
+HISTORY_CACHE_BYTES = Gauge("history_cache_bytes", "Bytes of column arrays held in the history cache.")
+
+# 📚 Pre-generated plan catalog
+PLAN_CATALOG_LOOKUPS = Counter(
+    "plan_catalog_lookups_total", "Plan requests by catalog result: hit, miss (bucket not generated) or ineligible.",
+    ["kind", "result"]
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, outcome="success")
+
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, outcome="failure")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request. Routes are labelled by their
+    path template (e.g. /api/workout/plans/user) so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method=method)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_LATENCY.observe(elapsed, method=method, route=route_path)
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=status_code)
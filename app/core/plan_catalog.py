@@ -0,0 +1,125 @@
+import re
+from typing import Optional
+
+from app.config.settings import settings
+from app.core.metrics import PLAN_CATALOG_LOOKUPS
+from app.db.mongodb import db
+from app.utils.nutrition import ACTIVITY_MULTIPLIERS, GOAL_ADJUSTMENTS, activity_key, goal_key
+
+# Bucket dimensions: every combination is a catalog entry the batch job can generate
+GOALS = tuple(GOAL_ADJUSTMENTS)
+ACTIVITY_LEVELS = tuple(ACTIVITY_MULTIPLIERS)
+DIET_TYPES = ("vegetarian", "vegan", "non_vegetarian", "eggetarian", "pescatarian")
+WORKOUT_DURATIONS = (30, 45, 60)
+# Diet plans for users with calculated targets are built for the nearest band; half a band
+# off the lowest one is still within CALORIE_TOLERANCE, so adherence scores them as on target
+CALORIE_BAND = 200
+CALORIE_BANDS = tuple(range(1200, 4001, CALORIE_BAND))
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(h|hr|hour|m|min|minute)?", re.IGNORECASE)
+NONE_ANSWERS = {"", "none", "no", "n/a", "na", "nil", "nothing"}
+
+
+def diet_type_key(diet_type) -> Optional[str]:
+    text = re.sub(r"[\s_-]+", " ", str(diet_type or "").strip().lower())
+    if text.startswith(("non veg", "nonveg", "omni")) or text in ("non vegetarian", "meat", "everything"):
+        return "non_vegetarian"
+    if "vegan" in text or "plant" in text:
+        return "vegan"
+    if "egg" in text:
+        return "eggetarian"
+    if "pesc" in text or "fish" in text:
+        return "pescatarian"
+    if text.startswith("veg"):
+        return "vegetarian"
+    return None
+
+
+def duration_minutes(duration) -> Optional[int]:
+    """"45 minutes", "1 hour", "60" -> minutes, when it is one of the catalog's durations."""
+    match = DURATION_RE.search(str(duration or ""))
+    if not match:
+        return None
+    minutes = float(match.group(1)) * (60 if (match.group(2) or "").lower().startswith("h") else 1)
+    return int(minutes) if minutes in WORKOUT_DURATIONS else None
+
+
+def calorie_band(calories) -> Optional[int]:
+    """The catalog band nearest a daily calorie target, or None when it is outside the bands."""
+    band = CALORIE_BAND * round(float(calories) / CALORIE_BAND)
+    return band if band in CALORIE_BANDS else None
+
+
+def has_answers(*values) -> bool:
+    """True when any of the free-text or list fields names an actual condition, injury or allergy."""
+    for value in values:
+        items = value if isinstance(value, (list, tuple)) else [value]
+        if any(str(item or "").strip().lower() not in NONE_ANSWERS for item in items):
+            return True
+    return False
+
+
+def workout_key(goal: str, activity: str, days: int, minutes: int) -> str:
+    return f"workout:{goal}:{activity}:{days}d:{minutes}m"
+
+
+def diet_key(goal: str, activity: str, diet_type: str, days: int, calories: Optional[int] = None) -> str:
+    key = f"diet:{goal}:{activity}:{diet_type}:{days}d"
+    return f"{key}:{calories}kcal" if calories else key
+
+
+def workout_bucket(request) -> Optional[str]:
+    """Catalog key for a WorkoutDietPlanRequest, or None when it must be generated for the user."""
+    if has_answers(request.medical_conditions, request.injuries_or_limitations):
+        return None
+    activity = activity_key(request.activity_level)
+    minutes = duration_minutes(request.workout_duration)
+    days = request.workout_days_per_week if request.workout_days_per_week is not None else 3
+    if activity is None or minutes is None:
+        return None
+    return workout_key(goal_key(request.goal), activity, days, minutes)
+
+
+def diet_bucket(request, days: int, targets: Optional[dict] = None) -> Optional[str]:
+    """
+    Catalog key for a DietFormRequest planning `days` days, or None when it must be generated.
+    With calculated `targets` the key includes their calorie band.
+    """
+    if has_answers(request.medical_conditions, request.allergies, request.other_allergy):
+        return None
+    activity = activity_key(request.activity_level)
+    diet_type = diet_type_key(request.diet_type)
+    if activity is None or diet_type is None:
+        return None
+    calories = None
+    if targets is not None:
+        calories = calorie_band(targets["calories"])
+        if calories is None:
+            return None
+    return diet_key(goal_key(request.fitness_goal), activity, diet_type, days, calories)
+
+
+def all_workout_keys() -> list:
+    return [
+        workout_key(goal, activity, days, minutes)
+        for goal in GOALS for activity in ACTIVITY_LEVELS for days in range(1, 8) for minutes in WORKOUT_DURATIONS
+    ]
+
+
+def all_diet_keys() -> list:
+    return [
+        diet_key(goal, activity, diet_type, days, calories)
+        for goal in GOALS for activity in ACTIVITY_LEVELS for diet_type in DIET_TYPES for days in range(1, 8)
+        for calories in (None, *CALORIE_BANDS)
+    ]
+
+
+async def catalog_plan(kind: str, key: Optional[str]):
+    """The pre-generated plan for a bucket key, or None so the caller generates one with the LLM."""
+    if not settings.PLAN_CATALOG_ENABLED:
+        return None
+    if key is None:
+        PLAN_CATALOG_LOOKUPS.inc(kind=kind, result="ineligible")
+        return None
+    entry = await db["plan_catalog"].find_one({"_id": key}, {"plan": 1})
+    PLAN_CATALOG_LOOKUPS.inc(kind=kind, result="hit" if entry else "miss")
+    return entry["plan"] if entry else None
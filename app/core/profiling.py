@@ -0,0 +1,130 @@
+import hmac
+import os
+import random
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config.settings import settings
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval and aggregates the samples
+    in folded-stack format ("root;caller;callee count"), which flamegraph.pl,
+    speedscope and inferno all read. Samples cover everything running on that
+    thread, so concurrent requests on the event loop show up as well.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def is_admin_secret(secret: str) -> bool:
+    """True for a non-empty X-Admin-Secret matching API_SECRET, compared in constant time."""
+    return bool(secret) and hmac.compare_digest(secret, settings.API_SECRET)
+
+
+def _is_admin(headers: dict) -> bool:
+    return is_admin_secret(headers.get(b"x-admin-secret", b"").decode())
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when an admin sends `X-Profile: cpu` (or `cpu,memory` to add
+    a tracemalloc snapshot), or when it is picked by PROFILING_SAMPLE_RATE.
+    Output goes to PROFILING_OUTPUT_DIR and the file name is logged; it is also
+    returned in the `X-Profile-Id` response header, but only to requests with
+    a valid X-Admin-Secret, so sampled clients cannot tell they were profiled.
+    Only installed when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.output_dir = settings.PROFILING_OUTPUT_DIR
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        requested = headers.get(b"x-profile", b"").decode().lower()
+        admin = _is_admin(headers)
+        if requested and admin:
+            with_memory = "memory" in requested
+        elif self.sample_rate and random.random() < self.sample_rate:
+            with_memory = False
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid4().hex[:8]}"
+
+        async def send_wrapper(message):
+            if admin and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started_tracing = with_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            snapshot = tracemalloc.take_snapshot() if with_memory else None
+            if started_tracing:
+                tracemalloc.stop()
+            await run_in_threadpool(self._write, profile_id, scope, sampler, snapshot)
+
+    def _write(self, profile_id: str, scope: dict, sampler: StackSampler, snapshot):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, profile_id)
+
+        with open(f"{base}.folded", "w") as f:
+            f.write(sampler.folded())
+
+        if snapshot is not None:
+            with open(f"{base}.tracemalloc.txt", "w") as f:
+                f.write(f"{scope['method']} {scope['path']}\n")
+                for stat in snapshot.statistics("lineno")[:50]:
+                    f.write(f"{stat}\n")
+
+        print(f"📈 Profiled {scope['method']} {scope['path']} -> {base}.folded")
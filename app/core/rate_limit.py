@@ -0,0 +1,162 @@
+import math
+import time
+from typing import Callable, Dict
+
+from cachetools import LRUCache
+from fastapi import Depends, HTTPException, Request, status
+from pydantic import BaseModel, ConfigDict
+from pymongo import ReturnDocument
+
+from app.config.settings import settings
+from app.core.auth import get_current_user_id
+
+
+class RateLimit(BaseModel):
+    """
+    Token bucket: `capacity` requests in a burst, refilled evenly over `per_seconds`.
+    `key` picks what the bucket is keyed on: the authenticated user, the client IP,
+    or a caller-supplied value such as an email address.
+    """
+    name: str
+    capacity: int
+    per_seconds: float
+    key: str = "user"  # "user" | "ip" | "custom"
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+# 📋 Per-route limits
+RATE_LIMITS: Dict[str, RateLimit] = {
+    limit.name: limit for limit in [
+        # LLM-backed endpoints
+        RateLimit(name="chat", capacity=20, per_seconds=60, key="ip"),
+        RateLimit(name="generate_diet_plan", capacity=5, per_seconds=3600),
+        RateLimit(name="generate_workout_plan", capacity=5, per_seconds=3600),
+        RateLimit(name="regenerate_workout_days", capacity=20, per_seconds=3600),
+        RateLimit(name="diet_progress_report", capacity=10, per_seconds=3600),
+        RateLimit(name="workout_progress_report", capacity=10, per_seconds=3600),
+        # Auth endpoints
+        RateLimit(name="login", capacity=10, per_seconds=60, key="ip"),
+        RateLimit(name="register", capacity=5, per_seconds=60, key="ip"),
+        RateLimit(name="verify_otp", capacity=10, per_seconds=60, key="ip"),
+        RateLimit(name="resend_otp", capacity=1, per_seconds=60, key="custom"),
+        RateLimit(name="forgot_password", capacity=1, per_seconds=60, key="custom"),
+    ]
+}
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process buckets. Fine for a single worker; use the Mongo backend when
+    several workers must share limits.
+    """
+
+    def __init__(self, max_buckets: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        # An evicted bucket simply starts full again
+        self._buckets = LRUCache(maxsize=max_buckets)
+        self._clock = clock
+
+    async def consume(self, bucket_key: str, limit: RateLimit) -> float:
+        """Takes one token. Returns 0 when allowed, otherwise seconds until a token is available."""
+        now = self._clock()
+        tokens, updated_at = self._buckets.get(bucket_key, (float(limit.capacity), now))
+        tokens = min(float(limit.capacity), tokens + (now - updated_at) * limit.refill_rate)
+
+        if tokens >= 1:
+            self._buckets[bucket_key] = (tokens - 1, now)
+            return 0.0
+
+        self._buckets[bucket_key] = (tokens, now)
+        return (1 - tokens) / limit.refill_rate
+
+
+class MongoRateLimitBackend:
+    """
+    Shared buckets in Mongo. Each request is a single find_one_and_update with an
+    aggregation-pipeline update, so refill and take happen atomically on the server
+    clock. `expires_at` lets a TTL index drop buckets once they would be full again.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def consume(self, bucket_key: str, limit: RateLimit) -> float:
+        elapsed_seconds = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+        refilled = {"$min": [
+            limit.capacity,
+            {"$add": [{"$ifNull": ["$tokens", limit.capacity]}, {"$multiply": [elapsed_seconds, limit.refill_rate]}]}
+        ]}
+
+        bucket = await self.collection.find_one_and_update(
+            {"_id": bucket_key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": {"$add": ["$$NOW", int(limit.per_seconds * 1000)]}
+                }},
+            ],
+            projection={"tokens": 1, "allowed": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / limit.refill_rate
+
+
+_backend = None
+
+
+def get_rate_limit_backend():
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "mongo":
+            from app.db.mongodb import db
+            _backend = MongoRateLimitBackend(db["rate_limits"])
+        else:
+            _backend = InMemoryRateLimitBackend()
+    return _backend
+
+
+async def enforce_rate_limit(limit: RateLimit, key: str) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    retry_after = await get_rate_limit_backend().consume(f"{limit.name}:{key}", limit)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(name: str):
+    """
+    Route dependency for a limit declared in RATE_LIMITS, e.g.
+    `dependencies=[Depends(rate_limit("chat"))]`.
+    """
+    limit = RATE_LIMITS[name]
+
+    if limit.key == "user":
+        async def limit_by_user(user_id: str = Depends(get_current_user_id)):
+            await enforce_rate_limit(limit, user_id)
+        return limit_by_user
+
+    if limit.key == "ip":
+        async def limit_by_ip(request: Request):
+            await enforce_rate_limit(limit, client_ip(request))
+        return limit_by_ip
+
+    raise ValueError(f"Rate limit '{name}' is keyed on a custom value; call enforce_rate_limit directly")
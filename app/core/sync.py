@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from app.db.user_keys import user_key
+
+# Collections mirrored to offline clients by GET /sync
+SYNC_COLLECTIONS = ("user_profiles", "workout_plans", "diet_plans", "meal_logs", "workout_completions")
+CURSOR_VERSION = 1
+
+
+def encode_cursor(moment: datetime) -> str:
+    payload = json.dumps({"v": CURSOR_VERSION, "t": int(moment.timestamp() * 1000)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> datetime:
+    """The moment a cursor was issued; ValueError for anything that is not one of ours."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if payload["v"] != CURSOR_VERSION:
+            raise ValueError("Unsupported cursor version")
+        return datetime.fromtimestamp(payload["t"] / 1000, tz=timezone.utc)
+    except (KeyError, TypeError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid sync cursor: {e}")
+
+
+async def record_deletions(collection: str, user_id: str, ids: list):
+    """
+    Leaves tombstones so that the next /sync tells clients to drop these
+    documents. Best effort: the delete itself already happened.
+    """
+    if not ids:
+        return
+    from app.db.mongodb import db
+
+    now = datetime.now(timezone.utc)
+    try:
+        await db["sync_tombstones"].insert_many([
+            {"user_id": user_key(user_id), "collection": collection, "doc_id": doc_id, "deleted_at": now}
+            for doc_id in ids
+        ])
+    except Exception as e:
+        print(f"❌ Failed to record deletions from {collection}:", e)
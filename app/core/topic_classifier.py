@@ -0,0 +1,120 @@
+import math
+import os
+import random
+import re
+import threading
+import zlib
+
+from app.config.settings import settings
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "chat_topics.tsv")
+
+OFF_TOPIC_REPLY = (
+    "I'm only trained to help with fitness-related topics like workouts, nutrition, diet and health. "
+    "Please ask me something in that area!"
+)
+
+N_FEATURES = 2 ** 18
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Question words carry no topic signal and dominate short messages
+STOPWORDS = frozenset(
+    "a an the i my me you your to of for and or in on at is are be do does how what which who can "
+    "should with it this that when why best good".split()
+)
+# Greetings and short follow-ups ("hi", "what about creatine") carry too little
+# signal to refuse, so messages with fewer content words always reach the LLM
+MIN_TOPIC_TOKENS = 3
+
+
+def load_examples(path: str = DATA_PATH) -> list:
+    """Reads the bundled labeled set as (text, is_fitness) pairs."""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            label, text = line.rstrip("\n").split("\t", 1)
+            examples.append((text, label == "fitness"))
+    return examples
+
+
+def content_tokens(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def featurize(text: str) -> list:
+    """
+    Hashed word unigrams, bigrams and character 5-grams (within words, so
+    "workouts" and "workout" share most features). crc32 keeps the hashes
+    stable across processes, unlike hash().
+    """
+    tokens = content_tokens(text)
+    grams = [f"w:{t}" for t in tokens]
+    grams += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for t in tokens:
+        padded = f"<{t}>"
+        grams += [f"c:{padded[i:i + 5]}" for i in range(len(padded) - 4)]
+    return sorted({zlib.crc32(g.encode()) % N_FEATURES for g in grams})
+
+
+class TopicClassifier:
+    """
+    Logistic regression over hashed n-grams, trained with SGD on the bundled
+    labeled set. predict() returns P(fitness-related) for a message.
+    """
+
+    def __init__(self, epochs: int = 30, learning_rate: float = 2.0, l2: float = 1e-4, seed: int = 7):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.seed = seed
+        self.weights = {}
+        self.bias = 0.0
+
+    def _score(self, features: list) -> float:
+        z = self.bias + sum(self.weights.get(i, 0.0) for i in features) / math.sqrt(len(features) or 1)
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def fit(self, examples: list) -> "TopicClassifier":
+        rows = [(featurize(text), 1.0 if label else 0.0) for text, label in examples]
+        rng = random.Random(self.seed)
+        for _ in range(self.epochs):
+            rng.shuffle(rows)
+            for features, y in rows:
+                gradient = self._score(features) - y
+                step = self.learning_rate * gradient / math.sqrt(len(features) or 1)
+                for i in features:
+                    w = self.weights.get(i, 0.0)
+                    self.weights[i] = w - step - self.learning_rate * self.l2 * w
+                self.bias -= self.learning_rate * gradient
+        return self
+
+    def predict(self, text: str) -> float:
+        return self._score(featurize(text))
+
+
+_classifier = None
+_lock = threading.Lock()
+
+
+def get_topic_classifier() -> TopicClassifier:
+    global _classifier
+    if _classifier is None:
+        with _lock:
+            if _classifier is None:
+                _classifier = TopicClassifier().fit(load_examples())
+    return _classifier
+
+
+def is_off_topic(message: str) -> bool:
+    """
+    True when the message is confidently not about fitness, i.e. it has at
+    least MIN_TOPIC_TOKENS content words and its P(fitness) falls below
+    CHAT_TOPIC_THRESHOLD. The threshold is kept low so that only clearly
+    off-topic messages skip the LLM.
+    """
+    if not settings.CHAT_TOPIC_FILTER_ENABLED:
+        return False
+    if len(content_tokens(message)) < MIN_TOPIC_TOKENS:
+        return False
+    return get_topic_classifier().predict(message) < settings.CHAT_TOPIC_THRESHOLD
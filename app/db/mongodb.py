@@ -1,8 +1,10 @@
 from motor.motor_asyncio import AsyncIOMotorClient  # type: ignore
 import asyncio
 from app.config.settings import settings
+from app.core.metrics import MongoCommandMetrics
+from app.core.sync import SYNC_COLLECTIONS
 
-client = AsyncIOMotorClient(settings.MONGO_URL)
+client = AsyncIOMotorClient(settings.MONGO_URL, event_listeners=[MongoCommandMetrics()])
 db = client[settings.DB_NAME]
 
 async def check_mongo_connection():
@@ -12,6 +14,54 @@ async def check_mongo_connection():
     except Exception as e:
         print("❌ MongoDB connection failed:", e)
 
+# (collection, keys, options) for every index the app relies on
+INDEXES = [
+    ("rate_limits", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ("otp_codes", [("email", 1)], {"unique": True}),
+    ("otp_codes", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+    # Per-user lookups; user_id is an ObjectId everywhere (see app.db.user_keys)
+    ("user_profiles", [("user_id", 1)], {}),
+    ("workout_plans", [("user_id", 1)], {}),
+    ("diet_plans", [("user_id", 1)], {}),
+    # Unique only once app.jobs.dedupe_logs has merged duplicates written before the indexes
+    ("meal_logs", [("user_id", 1), ("date", 1)], {"unique": True}),
+    ("workout_completions", [("user_id", 1), ("plan_id", 1), ("date", 1)], {"unique": True}),
+    ("workout_completions", [("user_id", 1), ("date", 1), ("_id", 1)], {}),
+    ("workout_progress_logs", [("user_id", 1), ("start_date", 1), ("end_date", 1)], {"unique": True}),
+    ("workout_progress_logs", [("user_id", 1), ("end_date", -1)], {}),
+    # Unique only once app.jobs.compact_diet_progress_logs has merged the old per-call inserts
+    ("diet_progress_logs", [("user_id", 1), ("start_date", 1), ("end_date", 1)], {"unique": True}),
+    ("diet_progress_logs", [("user_id", 1), ("end_date", -1)], {}),
+    ("diet_progress_logs", [("generated_at", 1)], {"expireAfterSeconds": settings.DIET_REPORT_TTL_DAYS * 86400}),
+    # Delta sync (GET /sync): changes by updated_at, deletions by tombstone
+    *((collection, [("user_id", 1), ("updated_at", 1)], {}) for collection in SYNC_COLLECTIONS),
+    ("sync_tombstones", [("user_id", 1), ("deleted_at", 1)], {}),
+    ("sync_tombstones", [("deleted_at", 1)], {"expireAfterSeconds": settings.SYNC_TOMBSTONE_TTL_DAYS * 86400}),
+    ("chat_answer_cache", [("created_at", 1)], {"expireAfterSeconds": settings.CHAT_CACHE_TTL_DAYS * 86400}),
+    ("chat_sessions", [("updated_at", 1)], {"expireAfterSeconds": settings.CHAT_SESSION_TTL_DAYS * 86400}),
+]
+
+# "collection keys" -> error, for unique indexes whose last build failed (see GET /health)
+UNIQUE_INDEX_FAILURES = {}
+
+async def ensure_indexes() -> dict:
+    """
+    Creates INDEXES and returns the unique ones that could not be built. Those
+    usually mean duplicates written before the index existed; the routes rely
+    on them for correctness, so they are reported by GET /health until
+    app.jobs.dedupe_logs has merged the duplicates and the build succeeds.
+    """
+    for collection, keys, options in INDEXES:
+        name = f"{collection} {keys}"
+        try:
+            await db[collection].create_index(keys, **options)
+            UNIQUE_INDEX_FAILURES.pop(name, None)
+        except Exception as e:
+            print(f"❌ Failed to create index on {name}:", e)
+            if options.get("unique"):
+                UNIQUE_INDEX_FAILURES[name] = str(e)
+    return dict(UNIQUE_INDEX_FAILURES)
+
 # Run the check
 try:
     loop = asyncio.get_running_loop()
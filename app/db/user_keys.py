@@ -0,0 +1,32 @@
+from typing import Union
+
+from bson import ObjectId
+
+from app.config.settings import settings
+
+# Collections that used to store user_id as the token's string; app.jobs.migrate_user_keys converts them
+LEGACY_STRING_COLLECTIONS = frozenset({"user_profiles", "workout_plans"})
+
+
+def user_key(user_id: Union[str, ObjectId]) -> ObjectId:
+    """The canonical form of a user id in every per-user collection: an ObjectId."""
+    return user_id if isinstance(user_id, ObjectId) else ObjectId(user_id)
+
+
+def by_user(collection, user_id: Union[str, ObjectId], **fields) -> dict:
+    """
+    Filter for a user's documents in `collection`, plus any extra equality
+    `fields`. While LEGACY_USER_ID_STRINGS is on, collections that still hold
+    string ids also match the old form; both are point lookups on the same index.
+    """
+    key = user_key(user_id)
+    if settings.LEGACY_USER_ID_STRINGS and collection.name in LEGACY_STRING_COLLECTIONS:
+        return {"user_id": {"$in": [key, str(key)]}, **fields}
+    return {"user_id": key, **fields}
+
+
+def public_user_id(doc: dict) -> dict:
+    """Stringifies a document's user_id for JSON responses, which used to carry it as a string."""
+    if "user_id" in doc:
+        doc["user_id"] = str(doc["user_id"])
+    return doc
@@ -0,0 +1,227 @@
+# python -m app.jobs.build_plan_catalog [--kind workout|diet] [--limit 50 | --all-buckets] [--refresh] [--dry-run]
+# python -m app.jobs.build_plan_catalog --report
+#
+# Most plan requests come from a few profile combinations without medical
+# conditions, injuries or allergies. Those are canonicalized into bucket keys
+# (app.core.plan_catalog), and this job pre-generates and validates one plan per
+# bucket into plan_catalog, which the plan routes serve without calling the LLM.
+# Diet buckets of users with calculated targets carry a calorie band, and their
+# plans are generated to that band's calories.
+#
+# By default the buckets are the most requested ones, counted from the stored
+# workout_plans and diet_plans; --all-buckets walks the full grid instead.
+# Existing entries are kept unless --refresh. --report only prints coverage:
+# catalog entries per kind, and the share of stored plans whose bucket is in
+# the catalog, which is the hit rate those requests would have had.
+import argparse
+import asyncio
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.api.routes.diet import DAYS_OF_WEEK, generate_diet_days
+from app.api.routes.workout import WEEK_DAYS, build_workout_prompt
+from app.core.plan_catalog import all_diet_keys, all_workout_keys, diet_bucket, workout_bucket
+from app.db.mongodb import db
+from app.schemas.diet_plan import DietFormRequest
+from app.schemas.workout import WorkoutDietPlanRequest, WorkoutPlanDay
+from app.utils.groq import get_groq_response
+from app.utils.nutrition import FAT_SHARE, GOAL_ADJUSTMENTS
+
+WORKOUT_FIELDS = (
+    "goal", "activity_level", "workout_days_per_week", "workout_duration", "medical_conditions", "injuries_or_limitations"
+)
+DIET_FIELDS = ("diet_type", "activity_level", "fitness_goal", "medical_conditions", "allergies", "other_allergy")
+# Bucket goal -> how the forms phrase it, for the generation prompt
+GOAL_TEXT = {"lose": "Weight Loss", "maintain": "Maintain Fitness", "gain": "Muscle Gain"}
+# Stand-in body stats for a bucket plan
+REFERENCE_PROFILE = {"age": 30, "gender": "Other", "height_cm": 170, "weight_kg": 70}
+
+
+def parse_key(key: str) -> dict:
+    """"workout:lose:moderate:4d:45m" / "diet:gain:light:vegan:5d[:2200kcal]" -> bucket fields."""
+    kind, *parts = key.split(":")
+    if kind == "workout":
+        goal, activity, days, minutes = parts
+        return {"kind": kind, "goal": goal, "activity": activity, "days": int(days[:-1]), "minutes": int(minutes[:-1])}
+    goal, activity, diet_type, days, *calories = parts
+    bucket = {"kind": kind, "goal": goal, "activity": activity, "diet_type": diet_type, "days": int(days[:-1])}
+    if calories:
+        bucket["calories"] = int(calories[0][:-4])
+    return bucket
+
+
+def band_targets(bucket: dict) -> dict:
+    """Targets for a calorie band's plan, with the macros of the reference profile."""
+    calories = bucket["calories"]
+    protein = REFERENCE_PROFILE["weight_kg"] * GOAL_ADJUSTMENTS[bucket["goal"]][1]
+    fat = calories * FAT_SHARE / 9
+    return {
+        "goal": bucket["goal"],
+        "calories": calories,
+        "protein_g": round(protein),
+        "carbs_g": round(max(0.0, (calories - 4 * protein - 9 * fat) / 4)),
+        "fat_g": round(fat),
+    }
+
+
+async def demand(kind: str) -> tuple:
+    """(Counter of bucket keys, number of stored plans) over the stored plans of a kind."""
+    keys, total = Counter(), 0
+    if kind == "workout":
+        cursor = db["workout_plans"].find({}, {field: 1 for field in WORKOUT_FIELDS})
+        async for doc in cursor:
+            total += 1
+            keys[workout_bucket(SimpleNamespace(**{f: doc.get(f) for f in WORKOUT_FIELDS}))] += 1
+    else:
+        cursor = db["diet_plans"].find({}, {"user_profile": 1, "ai_generated_plan": 1, "targets": 1})
+        async for doc in cursor:
+            total += 1
+            profile = doc.get("user_profile") or {}
+            request = SimpleNamespace(**{f: profile.get(f) for f in DIET_FIELDS})
+            keys[diet_bucket(request, len(doc.get("ai_generated_plan") or {}) or 7, doc.get("targets"))] += 1
+    keys.pop(None, None)
+    return keys, total
+
+
+def validate_workout_plan(plan_data, days: int) -> list:
+    """The plan as dicts, or ValueError unless it is Monday..Sunday with exactly `days` training days."""
+    if not isinstance(plan_data, list):
+        raise ValueError("Plan is not a list of days")
+    plan = [WorkoutPlanDay(**day) for day in plan_data]
+    if [day.day for day in plan] != WEEK_DAYS:
+        raise ValueError(f"Expected days {WEEK_DAYS}, got {[day.day for day in plan]}")
+    training_days = sum(1 for day in plan if day.exercises)
+    if training_days != days:
+        raise ValueError(f"Expected {days} training days, got {training_days}")
+    return [day.model_dump() for day in plan]
+
+
+async def generate_workout(bucket: dict, retries: int) -> list:
+    request = WorkoutDietPlanRequest(
+        **REFERENCE_PROFILE,
+        activity_level=bucket["activity"],
+        goal=GOAL_TEXT[bucket["goal"]],
+        workout_days_per_week=bucket["days"],
+        workout_duration=f"{bucket['minutes']} minutes"
+    )
+    prompt = build_workout_prompt(request)
+    for attempt in range(retries + 1):
+        raw_response = await asyncio.to_thread(get_groq_response, prompt)
+        try:
+            cleaned_response = re.sub(r"^```(?:json)?\n|\n```$", "", raw_response.strip())
+            return validate_workout_plan(json.loads(cleaned_response), bucket["days"])
+        except Exception as e:
+            error = e
+            print(f"⚠️ Workout bucket attempt {attempt + 1} failed:", e)
+    raise ValueError(str(error))
+
+
+async def generate_diet(bucket: dict, retries: int) -> dict:
+    request = DietFormRequest(
+        diet_type=bucket["diet_type"].replace("_", "-"),
+        activity_level=bucket["activity"],
+        fitness_goal=GOAL_TEXT[bucket["goal"]],
+        experience_level="Beginner",
+        medical_conditions=[],
+        allergies=[],
+        other_allergy="",
+        preferred_workout_style="",
+        preferred_training_days_per_week=bucket["days"]
+    )
+    targets = band_targets(bucket) if "calories" in bucket else None
+    # generate_diet_days validates every day and retries failed shards itself
+    for attempt in range(retries + 1):
+        try:
+            return await generate_diet_days(request, DAYS_OF_WEEK[:bucket["days"]], targets)
+        except ValueError as e:
+            error = e
+            print(f"⚠️ Diet bucket attempt {attempt + 1} failed:", e)
+    raise ValueError(str(error))
+
+
+async def build(keys: list, retries: int, concurrency: int) -> dict:
+    stats = {"generated": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def build_one(key: str):
+        bucket = parse_key(key)
+        async with semaphore:
+            try:
+                if bucket["kind"] == "workout":
+                    plan = await generate_workout(bucket, retries)
+                else:
+                    plan = await generate_diet(bucket, retries)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ {key}:", e)
+                return
+        await db["plan_catalog"].replace_one(
+            {"_id": key},
+            {"kind": bucket["kind"], "bucket": bucket, "plan": plan, "generated_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+        stats["generated"] += 1
+        print(f"✅ {key}")
+
+    await asyncio.gather(*(build_one(key) for key in keys))
+    return stats
+
+
+async def report(kinds: list):
+    catalog = {doc["_id"] async for doc in db["plan_catalog"].find({}, {"_id": 1})}
+    for kind in kinds:
+        grid = all_workout_keys() if kind == "workout" else all_diet_keys()
+        keys, total = await demand(kind)
+        eligible = sum(keys.values())
+        covered = sum(count for key, count in keys.items() if key in catalog)
+        entries = sum(1 for key in grid if key in catalog)
+        print(f"📚 {kind}: {entries}/{len(grid)} buckets in the catalog")
+        if total:
+            print(
+                f"   {total} stored plans, {eligible} ({100 * eligible / total:.1f}%) in a bucket, "
+                f"{covered} ({100 * covered / total:.1f}%) would have been served from the catalog"
+            )
+
+
+async def main(args):
+    kinds = [args.kind] if args.kind else ["workout", "diet"]
+    if args.report:
+        await report(kinds)
+        return
+
+    keys = []
+    for kind in kinds:
+        if args.all_buckets:
+            keys.extend(all_workout_keys() if kind == "workout" else all_diet_keys())
+        else:
+            counts, _ = await demand(kind)
+            keys.extend(key for key, _ in counts.most_common(args.limit))
+    if not args.refresh:
+        existing = {doc["_id"] async for doc in db["plan_catalog"].find({"_id": {"$in": keys}}, {"_id": 1})}
+        keys = [key for key in keys if key not in existing]
+
+    if args.dry_run:
+        print(f"🧪 Would generate {len(keys)} plans:")
+        for key in keys:
+            print(f"   {key}")
+        return
+
+    stats = await build(keys, args.retries, args.concurrency)
+    print(f"📚 Generated {stats['generated']} catalog plans, {stats['failed']} failed validation")
+    await report(kinds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate plans for common profile buckets.")
+    parser.add_argument("--kind", choices=["workout", "diet"], help="only this kind of plan (default: both)")
+    parser.add_argument("--limit", type=int, default=50, help="most requested buckets per kind to generate")
+    parser.add_argument("--all-buckets", action="store_true", help="generate every bucket of the grid")
+    parser.add_argument("--refresh", action="store_true", help="regenerate buckets already in the catalog")
+    parser.add_argument("--retries", type=int, default=2, help="extra attempts for a plan that fails validation")
+    parser.add_argument("--concurrency", type=int, default=2, help="buckets generated at the same time")
+    parser.add_argument("--report", action="store_true", help="only print catalog coverage")
+    parser.add_argument("--dry-run", action="store_true", help="only list the buckets that would be generated")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,75 @@
+# python -m app.jobs.compact_diet_progress_logs [--dry-run]
+#
+# Until reports were upserted per (user, range), every /Diet/generate call
+# inserted a new diet_progress_logs document. This merges those duplicates
+# into the current layout: the newest generation stays as the report, up to
+# DIET_REPORT_HISTORY superseded ones move into its `history`, and the rest
+# are deleted. Afterwards the unique (user_id, start_date, end_date) index
+# can be built, which ensure_indexes() does at the end of the run.
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.config.settings import settings
+from app.db.mongodb import db, ensure_indexes
+
+BATCH_SIZE = 500
+
+
+def merge_reports(docs: list, history_size: int) -> tuple:
+    """
+    Splits the documents of one (user, range) into (kept _id, history, _ids to delete).
+    The newest generation is kept; its history gets the superseded generations
+    (including any history they already carried), oldest first, capped to `history_size`.
+    """
+    docs = sorted(docs, key=lambda d: d.get("generated_at") or datetime.min)
+    keep = docs[-1]
+
+    history = []
+    for doc in docs:
+        history.extend(doc.get("history", []))
+        if doc is not keep and doc.get("generated_summary") is not None:
+            history.append({"generated_summary": doc["generated_summary"], "generated_at": doc.get("generated_at")})
+    history.sort(key=lambda h: h.get("generated_at") or datetime.min)
+
+    return keep["_id"], history[-history_size:] if history_size > 0 else [], [d["_id"] for d in docs[:-1]]
+
+
+async def compact(collection, history_size: int, dry_run: bool = False) -> dict:
+    stats = {"ranges": 0, "deleted": 0}
+    duplicates = collection.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", "start_date": "$start_date", "end_date": "$end_date"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    async for group in duplicates:
+        # Only one range's documents are in memory at a time
+        docs = await collection.find({"_id": {"$in": group["ids"]}}).to_list(None)
+        keep_id, history, delete_ids = merge_reports(docs, history_size)
+        stats["ranges"] += 1
+        stats["deleted"] += len(delete_ids)
+        if dry_run:
+            continue
+        await collection.update_one({"_id": keep_id}, {"$set": {"history": history}})
+        for i in range(0, len(delete_ids), BATCH_SIZE):
+            await collection.delete_many({"_id": {"$in": delete_ids[i:i + BATCH_SIZE]}})
+    return stats
+
+
+async def main(dry_run: bool):
+    stats = await compact(db["diet_progress_logs"], settings.DIET_REPORT_HISTORY, dry_run=dry_run)
+    action = "Would delete" if dry_run else "Deleted"
+    print(f"🧹 {action} {stats['deleted']} superseded reports across {stats['ranges']} duplicated ranges")
+    if not dry_run:
+        await ensure_indexes()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate diet progress reports per (user, range).")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be merged")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
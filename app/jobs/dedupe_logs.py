@@ -0,0 +1,100 @@
+# python -m app.jobs.dedupe_logs [--dry-run]
+#
+# Before the unique meal_logs (user_id, date) and workout_completions
+# (user_id, plan_id, date) indexes, meal logs were plain inserts and the
+# workout duplicate check compared `logged_at`, so a past day logged later
+# was inserted again. The indexes cannot be built over those duplicates, and
+# without them nothing stops new ones. This merges each duplicated meal day
+# into one log (slots combined, later items replacing same-named earlier
+# ones) and collapses each duplicated (user, plan, day) to its most recently
+# logged completion; string and native dates of the same day count as one
+# day. Afterwards ensure_indexes() builds the indexes and the run fails if
+# one still can't be.
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.db.mongodb import db, ensure_indexes
+
+BATCH_SIZE = 500
+MEAL_SLOTS = ("breakfast", "lunch", "dinner")
+
+# The calendar day of a log date, whether still a 'YYYY-MM-DD' string or already native
+DAY_EXPRESSION = {"$cond": [
+    {"$eq": [{"$type": "$date"}, "string"]},
+    {"$substrCP": ["$date", 0, 10]},
+    {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}
+]}
+
+
+def merge_meal_logs(docs: list) -> tuple:
+    """
+    (kept _id, fields to set on it, _ids to delete) for one user's duplicated
+    day: the newest log is kept with every slot combined, the way the update
+    route merges (same item_name replaced in place, new ones appended).
+    """
+    docs = sorted(docs, key=lambda d: (d.get("updated_at") or datetime.min, d["_id"]))
+    meals = {}
+    for slot in MEAL_SLOTS:
+        items = {}
+        for doc in docs:
+            for item in (doc.get("meals") or {}).get(slot) or []:
+                items[item.get("item_name")] = item
+        meals[slot] = list(items.values())
+    return docs[-1]["_id"], {"meals": meals}, [d["_id"] for d in docs[:-1]]
+
+
+def merge_workout_logs(docs: list) -> tuple:
+    """(kept _id, fields to set on it, _ids to delete): the last logged completion of the day wins."""
+    docs = sorted(docs, key=lambda d: (d.get("logged_at") or datetime.min, d["_id"]))
+    return docs[-1]["_id"], None, [d["_id"] for d in docs[:-1]]
+
+
+async def dedupe(collection, group_fields: tuple, merge, dry_run: bool = False) -> dict:
+    stats = {"groups": 0, "deleted": 0}
+    duplicates = collection.aggregate([
+        {"$group": {
+            "_id": {**{field: f"${field}" for field in group_fields}, "day": DAY_EXPRESSION},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    async for group in duplicates:
+        # Only one group's documents are in memory at a time
+        docs = await collection.find({"_id": {"$in": group["ids"]}}).to_list(None)
+        keep_id, fields, delete_ids = merge(docs)
+        stats["groups"] += 1
+        stats["deleted"] += len(delete_ids)
+        if dry_run:
+            continue
+        if fields:
+            await collection.update_one({"_id": keep_id}, {"$set": fields})
+        for i in range(0, len(delete_ids), BATCH_SIZE):
+            await collection.delete_many({"_id": {"$in": delete_ids[i:i + BATCH_SIZE]}})
+    return stats
+
+
+async def main(dry_run: bool) -> int:
+    action = "Would delete" if dry_run else "Deleted"
+    for name, group_fields, merge in (
+        ("meal_logs", ("user_id",), merge_meal_logs),
+        ("workout_completions", ("user_id", "plan_id"), merge_workout_logs),
+    ):
+        stats = await dedupe(db[name], group_fields, merge, dry_run)
+        print(f"🧹 {name}: {action} {stats['deleted']} duplicates across {stats['groups']} days")
+    if dry_run:
+        return 0
+    failures = await ensure_indexes()
+    for name, error in failures.items():
+        print(f"❌ Unique index {name} still missing:", error)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate meal and workout logs so their unique indexes can be built.")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be merged")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.dry_run)))
@@ -0,0 +1,81 @@
+# python -m app.jobs.migrate_log_dates [--batch-size 500] [--pause-ms 50] [--dry-run]
+#
+# Converts the `date` of meal_logs and workout_completions from 'YYYY-MM-DD'
+# strings to native BSON dates (midnight UTC). It runs online next to the API:
+# while LEGACY_DATE_STRINGS is on (the default), reads match both forms and
+# each log write matches the string form too and converts it in the same
+# write. Batches are ordered by _id and every update is guarded on the old
+# string, so the job can be stopped and rerun at any time; only documents that
+# still hold a string are picked up again. Once it reports nothing left, set
+# LEGACY_DATE_STRINGS=false.
+#
+# Time-series collections were considered for these logs and not used: they
+# do not support the unique (user_id, date) / (user_id, plan_id, date)
+# indexes, nor the upserts and pipeline updates the meal log routes rely on.
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.mongodb import db
+from app.utils.dates import day_start
+
+COLLECTIONS = ("meal_logs", "workout_completions")
+
+
+async def migrate_collection(collection, batch_size: int, pause_ms: int, dry_run: bool = False) -> dict:
+    stats = {"converted": 0, "conflicts": 0, "invalid": 0}
+    last_id = None
+    while True:
+        query = {"date": {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await collection.find(query, {"date": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return stats
+        last_id = batch[-1]["_id"]
+
+        operations, ids = [], []
+        for doc in batch:
+            try:
+                day = day_start(doc["date"])
+            except ValueError:
+                stats["invalid"] += 1
+                print(f"❌ {collection.name} {doc['_id']}: unparseable date {doc['date']!r}")
+                continue
+            operations.append(UpdateOne({"_id": doc["_id"], "date": doc["date"]}, {"$set": {"date": day}}))
+            ids.append(doc["_id"])
+
+        if dry_run:
+            stats["converted"] += len(operations)
+        elif operations:
+            try:
+                result = await collection.bulk_write(operations, ordered=False)
+                stats["converted"] += result.modified_count
+            except BulkWriteError as e:
+                # A native log for the same day was written meanwhile; both are left for review
+                stats["converted"] += e.details.get("nModified", 0)
+                for error in e.details.get("writeErrors", []):
+                    stats["conflicts"] += 1
+                    print(f"❌ {collection.name} {ids[error['index']]}: {error['errmsg']}")
+
+        # Leave room for the API's own traffic
+        await asyncio.sleep(pause_ms / 1000)
+
+
+async def main(batch_size: int, pause_ms: int, dry_run: bool):
+    for name in COLLECTIONS:
+        stats = await migrate_collection(db[name], batch_size, pause_ms, dry_run)
+        action = "Would convert" if dry_run else "Converted"
+        print(f"📅 {name}: {action} {stats['converted']} dates "
+              f"({stats['conflicts']} conflicts, {stats['invalid']} invalid)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate meal and workout log dates to native BSON dates.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause-ms", type=int, default=50, help="sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be converted")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.pause_ms, args.dry_run))
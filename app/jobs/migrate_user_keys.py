@@ -0,0 +1,65 @@
+# python -m app.jobs.migrate_user_keys [--batch-size 500] [--pause-ms 50] [--dry-run]
+#
+# One-shot conversion of the string user_id in user_profiles and workout_plans
+# to the ObjectId every other per-user collection uses, so that all per-user
+# queries compare the same BSON type on the same index. Safe to run online
+# while LEGACY_USER_ID_STRINGS is on (reads match both forms); batches are
+# ordered by _id and guarded on the old value, so reruns pick up only what is
+# left. Once it reports nothing left, set LEGACY_USER_ID_STRINGS=false.
+import argparse
+import asyncio
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.db.mongodb import db
+from app.db.user_keys import LEGACY_STRING_COLLECTIONS
+
+
+async def migrate_collection(collection, batch_size: int, pause_ms: int, dry_run: bool = False) -> dict:
+    stats = {"converted": 0, "invalid": 0}
+    last_id = None
+    while True:
+        query = {"user_id": {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await collection.find(query, {"user_id": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return stats
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            if not ObjectId.is_valid(doc["user_id"]):
+                stats["invalid"] += 1
+                print(f"❌ {collection.name} {doc['_id']}: invalid user_id {doc['user_id']!r}")
+                continue
+            operations.append(UpdateOne(
+                {"_id": doc["_id"], "user_id": doc["user_id"]},
+                {"$set": {"user_id": ObjectId(doc["user_id"])}}
+            ))
+
+        if dry_run:
+            stats["converted"] += len(operations)
+        elif operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            stats["converted"] += result.modified_count
+
+        # Leave room for the API's own traffic
+        await asyncio.sleep(pause_ms / 1000)
+
+
+async def main(batch_size: int, pause_ms: int, dry_run: bool):
+    for name in sorted(LEGACY_STRING_COLLECTIONS):
+        stats = await migrate_collection(db[name], batch_size, pause_ms, dry_run)
+        action = "Would convert" if dry_run else "Converted"
+        print(f"🔑 {name}: {action} {stats['converted']} user ids ({stats['invalid']} invalid)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert string user ids to ObjectIds.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause-ms", type=int, default=50, help="sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be converted")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.pause_ms, args.dry_run))
@@ -1,15 +1,32 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.config.settings import settings
-from app.db.mongodb import db
+from app.core.chat_cache import get_chat_cache
+from app.core.metrics import REGISTRY, MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware, is_admin_secret
+from app.db.mongodb import UNIQUE_INDEX_FAILURES, db, ensure_indexes
 from app.utils.gemini import configure_gemini_model
 from app.api.api_v1 import api_router
 
 
 
-app = FastAPI(title=settings.APP_NAME)  
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build indexes in the background so startup never blocks on Mongo
+    asyncio.create_task(ensure_indexes())
+    chat_cache = get_chat_cache()
+    if chat_cache is not None:
+        asyncio.create_task(chat_cache.load())
+    yield
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 # Middleware
 app.add_middleware(
@@ -22,6 +39,13 @@ app.add_middleware(
 
 app.add_middleware(SessionMiddleware, secret_key=settings.SESSION_SECRET_KEY)
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Opt-in per-request profiler, not installed at all unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include all routes from api_v1
 app.include_router(api_router, prefix="/api")
 
@@ -30,3 +54,23 @@ app.include_router(api_router, prefix="/api")
 @app.get("/")
 async def root():
     return {"message": "Welcome to Workout Buddy API!"}
+
+
+# Unhealthy while a unique index the routes rely on is missing
+@app.get("/health", include_in_schema=False)
+async def health():
+    if UNIQUE_INDEX_FAILURES:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "missing_unique_indexes": UNIQUE_INDEX_FAILURES,
+                     "fix": "run python -m app.jobs.dedupe_logs / app.jobs.compact_diet_progress_logs"}
+        )
+    return {"status": "ok"}
+
+
+# Prometheus scrape endpoint; the scraper sends the same X-Admin-Secret as profiling requests
+@app.get("/metrics", include_in_schema=False)
+async def metrics(x_admin_secret: str = Header("")):
+    if not is_admin_secret(x_admin_secret):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -19,7 +19,7 @@ class UserOut(BaseModel):
 
 class VerifyOTP(BaseModel):
     email: EmailStr
-    otp: str
+    otp: str = Field(..., pattern=r"^\d{6}$")
 
 class ResendOTP(BaseModel):
     email:EmailStr
\ No newline at end of file
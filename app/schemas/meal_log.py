@@ -6,6 +6,7 @@ class MealItem(BaseModel):
     item_name: str
     quantity: Optional[float] = None
     weight_in_grams: Optional[float] = None
+    calories: Optional[float] = None
 
 
 class MealLogRequest(BaseModel):
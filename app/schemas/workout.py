@@ -36,6 +36,15 @@ class WorkoutDietPlanRequest(BaseModel):
     injuries_or_limitations: List[str] = Field(default_factory=list, description="Any injuries or limitations")
 
 
+class WorkoutDaysRegenerateRequest(BaseModel):
+    days: List[str] = Field(..., min_length=1, description="Days to regenerate (e.g., ['Wednesday'])")
+    notes: Optional[str] = Field(None, description="What should change on those days (e.g., 'lighter, no jumping')")
+    # Profile changes to apply to the plan; omitted fields keep their stored value
+    workout_duration: Optional[str] = None
+    medical_conditions: Optional[List[str]] = None
+    injuries_or_limitations: Optional[List[str]] = None
+
+
 class ExerciseCompletionInput(BaseModel):
     name: str
     sets: Optional[int] = None
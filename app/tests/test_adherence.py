@@ -0,0 +1,79 @@
+# app/tests/test_adherence.py
+
+from datetime import date
+
+from app.api.routes.diet_progress_routes import apply_local_scores, reported_daily_calories
+from app.utils.adherence import parse_calories, score_adherence, token_set_similarity, tokens
+
+PLAN = {"ai_generated_plan": {
+    "monday": {"date": "2025-06-02", "meals": {
+        "breakfast": "Oatmeal with berries and almond milk",
+        "lunch": "Grilled chicken salad with quinoa",
+        "dinner": "Baked salmon with steamed broccoli",
+        "calories": "2,000 kcal",
+    }},
+    "tuesday": {"date": "2025-06-03", "meals": {
+        "breakfast": "Greek yogurt with honey", "lunch": "Lentil soup", "dinner": "Tofu stir fry", "calories": 1800,
+    }},
+}}
+
+
+def items(*names, calories=None):
+    return [{"item_name": name, "quantity": 1, "calories": calories} for name in names]
+
+
+def test_tokens_ignore_filler_words_and_plurals():
+    assert tokens("Oatmeal with fresh berries and 2 boiled eggs") == {"oatmeal", "berry", "boiled", "egg"}
+    assert tokens(items("Egg", "Grilled Chicken")) == {"egg", "grilled", "chicken"}
+    assert token_set_similarity(tokens("Grilled chicken salad with quinoa"), tokens(items("chicken salad"))) == 1.0
+    assert token_set_similarity(tokens("Lentil soup"), frozenset()) == 0.0
+
+
+def test_parse_calories():
+    assert [parse_calories(v) for v in (2000, "1,950 kcal", "~1800", "n/a", None)] == [2000, 1950, 1800, None, None]
+
+
+def test_days_are_scored_against_the_plan_and_consistency_is_exact():
+    logs = {
+        "2025-06-02": {
+            "breakfast": items("oatmeal", "berries", calories=200),
+            "lunch": items("chicken salad", calories=600),
+            "dinner": items("pizza", calories=1000),
+        },
+        "2025-06-04": {"breakfast": items("toast")},
+    }
+    scores = score_adherence(date(2025, 6, 2), date(2025, 6, 5), logs, PLAN, calorie_target=2200,
+                             daily_calories={"2025-06-04": 2200})
+
+    monday, tuesday, wednesday, thursday = scores["days"]
+    assert monday["similarity"] == {"breakfast": 1.0, "lunch": 1.0, "dinner": 0.0}
+    # meals 2/3 weighted 0.7, calories 2000 of 2000 weighted 0.3
+    assert monday["calorie_target"] == 2000 and monday["score"] == round(100 * (0.7 * 2 / 3 + 0.3), 1)
+    # planned but nothing logged
+    assert tuesday["score"] == 0.0
+    # no plan entry: calories only, from the report estimate against the profile target
+    assert wednesday["similarity"] is None and wednesday["score"] == 100.0
+    # neither plan nor log: not scored
+    assert thursday["score"] is None
+
+    assert scores["adherence_percentage"] == round((monday["score"] + 0 + 100) / 3, 1)
+    assert scores["consistency_percentage"] == round(100 * 4 / 12, 1)
+    assert scores["missed_meals"] == {"breakfast": 2, "lunch": 3, "dinner": 3}
+
+
+def test_report_percentages_come_from_local_scores():
+    # The model is not asked for the percentages; they are only ever the local scores
+    data = {"dietProgressReport": {
+        "estimatedCalorieBreakdown": {"dailyLog": [{"date": "2025-06-02", "calories": {"total": 1900}}, {"bad": 1}]},
+        "adherenceAnalysis": {"summary": "..."},
+        "mealLoggingConsistency": {"summary": "..."},
+    }}
+    assert reported_daily_calories(data) == {"2025-06-02": 1900}
+
+    scores = score_adherence(date(2025, 6, 2), date(2025, 6, 2), {}, None)
+    assert scores["adherence_percentage"] is None
+    apply_local_scores(data, scores, {"calories": 2000})
+    report = data["dietProgressReport"]
+    assert report["adherenceAnalysis"]["adherencePercentage"] is None
+    assert report["mealLoggingConsistency"]["consistencyPercentage"] == 0.0
+    assert report["dailyTargets"] == {"calories": 2000}
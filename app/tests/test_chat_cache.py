@@ -0,0 +1,66 @@
+# app/tests/test_chat_cache.py
+
+import asyncio
+import importlib
+
+from app.core.chat_cache import ChatAnswerCache
+from app.core.metrics import CHAT_CACHE_LOOKUPS
+
+chat_routes = importlib.import_module("app.api.routes.chat")
+
+
+def test_near_duplicates_hit_and_different_questions_miss():
+    cache = ChatAnswerCache()
+    asyncio.run(cache.store("How many calories should I eat to lose weight?", "deficit"))
+
+    assert cache.lookup("hey, how many calories should i eat to lose weight please") == "deficit"
+    assert cache.lookup("How many calories should I eat to gain weight?") is None
+    assert cache.lookup("What is a good beginner workout routine?") is None
+
+
+def test_lru_eviction_drops_lsh_buckets():
+    cache = ChatAnswerCache(max_entries=2)
+    for i, question in enumerate(["best squat variations", "protein for breakfast", "stretching for runners"]):
+        asyncio.run(cache.store(question, str(i)))
+
+    assert len(cache) == 2
+    assert cache.lookup("best squat variations") is None
+    assert cache.lookup("protein for breakfast") == "1"
+    assert all(key in cache._entries for bucket in cache._buckets.values() for key in bucket)
+
+
+def test_messages_without_content_words_are_not_cached():
+    cache = ChatAnswerCache()
+    before = CHAT_CACHE_LOOKUPS._values.get(("skipped",), 0)
+    asyncio.run(cache.store("thank you!", "You are welcome!"))
+
+    assert len(cache) == 0
+    for message in ("hi", "hello", "how are you?", "why?", "what should I do?", "is it good?", "thank you!"):
+        assert cache.lookup(message) is None
+    assert CHAT_CACHE_LOOKUPS._values[("skipped",)] == before + 7
+
+
+class FakeMemory:
+    def __init__(self):
+        self.turns = []
+
+    async def context(self, user_id):
+        return []
+
+    async def append(self, user_id, user_message, answer):
+        self.turns.append(answer)
+
+
+def test_answers_are_cached_and_remembered_unformatted(monkeypatch):
+    cache, memory = ChatAnswerCache(), FakeMemory()
+    monkeypatch.setattr(chat_routes, "get_chat_cache", lambda: cache)
+    monkeypatch.setattr(chat_routes, "get_chat_memory", lambda: memory)
+    monkeypatch.setattr(chat_routes, "get_groq_chat_response", lambda message, context: "Eat **less**.\nMove more.")
+    question = chat_routes.ChatRequest(message="How many calories should I eat to lose weight?")
+
+    first = asyncio.run(chat_routes.chat(question, None, user_id="u1"))
+    second = asyncio.run(chat_routes.chat(question, None, user_id="u1"))
+
+    assert first == second == {"response": "Eat <b>less</b>.<br>Move more."}
+    assert cache.lookup(question.message) == "Eat **less**.\nMove more."
+    assert memory.turns == ["Eat **less**.\nMove more."] * 2
@@ -0,0 +1,65 @@
+# app/tests/test_chat_memory.py
+
+import asyncio
+
+from bson import ObjectId
+
+from app.api.routes.chat import topic_text
+from app.core.chat_memory import ChatMemory, build_context, estimate_tokens
+from app.core.topic_classifier import is_off_topic
+
+
+def make_turns(count: int, size: int = 200) -> list:
+    return [{"seq": i, "user": f"question {i} " + "x" * size, "assistant": f"answer {i} " + "y" * size}
+            for i in range(1, count + 1)]
+
+
+def test_context_keeps_summary_and_newest_turns_within_budget():
+    messages = build_context("Wants to lose 5 kg, bad left knee.", make_turns(6), token_budget=300)
+
+    assert messages[0]["role"] == "system" and "bad left knee" in messages[0]["content"]
+    assert messages[-1]["content"].startswith("answer 6")
+    assert sum(estimate_tokens(m["content"]) for m in messages) <= 300 + len(messages)
+
+
+def test_prompt_size_does_not_grow_with_history():
+    short = build_context("summary", make_turns(6), token_budget=500)
+    long = build_context("summary", make_turns(600), token_budget=500)
+
+    assert len(short) == len(long)
+    assert build_context("", [], token_budget=500) == []
+
+
+def test_follow_ups_are_judged_with_the_previous_turn():
+    context = build_context("", [{"seq": 1, "user": "How many sets should I do for squats?", "assistant": "3 to 5."}], 500)
+    for follow_up in ("why?", "can you repeat that", "what about tomorrow", "ok, make it shorter", "what about the second one"):
+        assert not is_off_topic(topic_text(follow_up, context))
+
+    assert topic_text("why?", []) == "why?"
+    summary_only = build_context("Training for a marathon.", [], 500)
+    assert topic_text("why?", summary_only).endswith("Training for a marathon. why?")
+
+
+def test_full_questions_after_a_fitness_turn_are_judged_alone():
+    context = build_context("", [{"seq": 1, "user": "How many sets should I do for squats?", "assistant": "3 to 5."}], 500)
+    for off_topic in ("Write a Python script that renames files", "Help me with my math homework tonight"):
+        assert topic_text(off_topic, context) == off_topic
+        assert is_off_topic(topic_text(off_topic, context))
+
+
+class FakeSessions:
+    def __init__(self, session):
+        self.session = session
+
+    async def find_one(self, query, projection=None):
+        return self.session
+
+
+def test_turns_stay_in_the_prompt_until_summarized():
+    # 10 turns, 2 already folded into the summary; none has been summarized past the window yet
+    memory = ChatMemory(FakeSessions({"summary": "s", "summarized_through": 2, "turns": make_turns(10, size=10)}),
+                        max_turns=6, token_budget=10_000)
+    messages = asyncio.run(memory.context(str(ObjectId())))
+
+    users = [m["content"] for m in messages if m["role"] == "user"]
+    assert [u.split()[1] for u in users] == [str(i) for i in range(3, 11)]
@@ -0,0 +1,47 @@
+# app/tests/test_dashboard.py
+
+import asyncio
+import json
+import time
+
+from bson import ObjectId
+
+from app.api.routes import dashboard
+
+USER_ID = str(ObjectId())
+
+
+def fake_sections(monkeypatch, delay=0.05):
+    async def reader(name):
+        await asyncio.sleep(delay)
+        if name == "diet_chart":
+            raise RuntimeError("boom")
+        return {"section": name}
+
+    sections = {name: (lambda user_id, name=name: reader(name)) for name in dashboard.SECTIONS}
+    monkeypatch.setattr(dashboard, "SECTIONS", sections)
+
+
+def body(response):
+    return json.loads(response.body) if hasattr(response, "body") else response
+
+
+def test_sections_are_read_concurrently_and_failures_isolated(monkeypatch):
+    fake_sections(monkeypatch)
+    start = time.perf_counter()
+    result = body(asyncio.run(dashboard.get_dashboard(user_id=USER_ID, fields=None)))
+    assert time.perf_counter() - start < 0.05 * 3
+
+    assert result["status"] == 200
+    assert result["data"]["profile"] == {"section": "profile"}
+    assert result["data"]["diet_chart"] is None
+    assert result["data"]["errors"] == {"diet_chart": "unavailable"}
+
+
+def test_fields_select_sections(monkeypatch):
+    fake_sections(monkeypatch, delay=0)
+    result = body(asyncio.run(dashboard.get_dashboard(user_id=USER_ID, fields="profile, workout_report")))
+    assert set(result["data"]) == {"profile", "workout_report"}
+
+    result = body(asyncio.run(dashboard.get_dashboard(user_id=USER_ID, fields="profile,plans")))
+    assert result["status"] == 400
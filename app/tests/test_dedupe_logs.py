@@ -0,0 +1,51 @@
+# app/tests/test_dedupe_logs.py
+
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from app.db import mongodb
+from app.jobs.dedupe_logs import merge_meal_logs, merge_workout_logs
+from app.main import app
+
+
+def test_duplicate_meal_days_are_combined_into_the_newest_log():
+    old, new = ObjectId(), ObjectId()
+    docs = [
+        {"_id": new, "updated_at": datetime(2025, 6, 2), "meals": {
+            "breakfast": [{"item_name": "oats", "quantity": 2}], "lunch": [], "dinner": None,
+        }},
+        {"_id": old, "meals": {
+            "breakfast": [{"item_name": "oats", "quantity": 1}, {"item_name": "banana", "quantity": 1}],
+            "dinner": [{"item_name": "rice", "quantity": 1}],
+        }},
+    ]
+    keep, fields, delete = merge_meal_logs(docs)
+    assert keep == new and delete == [old]
+    assert fields["meals"] == {
+        "breakfast": [{"item_name": "oats", "quantity": 2}, {"item_name": "banana", "quantity": 1}],
+        "lunch": [],
+        "dinner": [{"item_name": "rice", "quantity": 1}],
+    }
+
+
+def test_last_logged_workout_completion_is_kept():
+    first, late, retry = ObjectId(), ObjectId(), ObjectId()
+    docs = [
+        {"_id": late, "logged_at": datetime(2025, 6, 5)},
+        {"_id": first, "logged_at": datetime(2025, 6, 1)},
+        {"_id": retry, "logged_at": None},
+    ]
+    keep, fields, delete = merge_workout_logs(docs)
+    assert keep == late and fields is None and set(delete) == {first, retry}
+
+
+def test_health_fails_while_a_unique_index_is_missing(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+
+    monkeypatch.setitem(mongodb.UNIQUE_INDEX_FAILURES, "workout_completions [...]", "E11000 duplicate key")
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert "workout_completions [...]" in response.json()["missing_unique_indexes"]
@@ -0,0 +1,35 @@
+# app/tests/test_diet_progress_compaction.py
+
+from datetime import datetime, timedelta
+
+from app.jobs.compact_diet_progress_logs import merge_reports
+
+
+def report(day: int, history: list = None) -> dict:
+    doc = {
+        "_id": f"id-{day}",
+        "generated_summary": {"dietProgressReport": {"day": day}},
+        "generated_at": datetime(2025, 1, 1) + timedelta(days=day),
+    }
+    if history is not None:
+        doc["history"] = history
+    return doc
+
+
+def test_newest_generation_is_kept_and_older_ones_become_history():
+    docs = [report(3), report(1), report(2)]
+    keep_id, history, delete_ids = merge_reports(docs, history_size=5)
+
+    assert keep_id == "id-3"
+    assert sorted(delete_ids) == ["id-1", "id-2"]
+    assert [h["generated_summary"]["dietProgressReport"]["day"] for h in history] == [1, 2]
+
+
+def test_history_is_capped_to_the_newest_generations():
+    earlier = [{"generated_summary": {"dietProgressReport": {"day": 0}}, "generated_at": datetime(2024, 12, 1)}]
+    docs = [report(day) for day in range(1, 8)] + [report(8, history=earlier)]
+    keep_id, history, delete_ids = merge_reports(docs, history_size=3)
+
+    assert keep_id == "id-8"
+    assert len(delete_ids) == 7
+    assert [h["generated_summary"]["dietProgressReport"]["day"] for h in history] == [5, 6, 7]
@@ -0,0 +1,49 @@
+# app/tests/test_diet_sharding.py
+
+import asyncio
+import json
+import re
+
+import pytest
+
+from app.api.routes import diet
+from app.schemas.diet_plan import DietFormRequest
+
+REQUEST = DietFormRequest(
+    diet_type="vegetarian", activity_level="moderate", fitness_goal="lose_weight", experience_level="beginner",
+    medical_conditions=[], allergies=[], other_allergy="", preferred_workout_style="cardio",
+    preferred_training_days_per_week=7
+)
+
+
+def fake_llm(failures: dict):
+    """Answers with valid meals for the requested days, failing each day `failures[day]` times first."""
+    def respond(prompt: str) -> str:
+        days = re.search(r"Return only the following days: ([a-z, ]+)\.", prompt).group(1).split(", ")
+        if any(failures.get(day, 0) > 0 for day in days):
+            for day in days:
+                failures[day] = failures.get(day, 0) - 1
+            return '{"monday": {"breakfast": "oats"'
+        meals = {"breakfast": "oats", "lunch": "dal", "dinner": "tofu", "calories": "1900"}
+        return json.dumps({day: meals for day in days})
+    return respond
+
+
+def test_failed_shard_is_retried_alone(monkeypatch):
+    monkeypatch.setattr(diet.settings, "DIET_PLAN_SHARD_DAYS", 2)
+    calls = []
+    respond = fake_llm({"wednesday": 1})
+    monkeypatch.setattr(diet, "get_groq_response", lambda prompt: calls.append(prompt) or respond(prompt))
+
+    plan = asyncio.run(diet.generate_diet_days(REQUEST, diet.DAYS_OF_WEEK))
+
+    assert list(plan) == diet.DAYS_OF_WEEK
+    assert len(calls) == 5  # 4 shards + 1 retry of wednesday/thursday
+
+
+def test_shard_failing_every_attempt_fails_the_plan(monkeypatch):
+    monkeypatch.setattr(diet.settings, "DIET_PLAN_SHARD_DAYS", 1)
+    monkeypatch.setattr(diet, "get_groq_response", fake_llm({"friday": 99}))
+
+    with pytest.raises(ValueError, match="^friday:"):
+        asyncio.run(diet.generate_diet_days(REQUEST, diet.DAYS_OF_WEEK))
@@ -0,0 +1,64 @@
+# app/tests/test_downsample.py
+
+import math
+from datetime import date, timedelta
+
+from app.utils.downsample import downsample, lttb
+
+
+def daily_series(days: int) -> tuple:
+    start = date(2024, 1, 1)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    values = [2000 + 300 * math.sin(i / 9) for i in range(days)]
+    return dates, values
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    xs = list(range(100))
+    ys = [x % 7 for x in xs]
+    indices = lttb(xs, ys, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 99
+    assert indices == sorted(indices)
+
+
+def test_payload_size_does_not_grow_with_the_range():
+    sizes = []
+    for days in (90, 180, 365, 730):
+        dates, values = daily_series(days)
+        values[days // 3] = 4200  # a spike the chart must not lose
+        values[days // 2] = 800
+        chart = downsample(dates, values, 60)
+        assert chart["mode"] == "lttb"
+        sizes.append(len(chart["points"]))
+        kept = [p["value"] for p in chart["points"]]
+        assert 4200 in kept and 800 in kept
+    assert max(sizes) <= 60 and min(sizes) >= 55
+
+
+def test_short_series_are_returned_as_is():
+    dates, values = daily_series(10)
+    chart = downsample(dates, values, 60, key="total")
+    assert chart["mode"] == "raw"
+    assert chart["points"][0] == {"date": dates[0], "total": values[0]}
+
+
+def test_calendar_buckets_carry_extremes():
+    dates = ["2024-01-01", "2024-01-02", "2024-01-08", "2024-02-01"]
+    values = [10, 30, 5, 7]
+    weeks = downsample(dates, values, 60, mode="week")["points"]
+    assert [(p["date"], p["value"], p["min"], p["max"], p["days"]) for p in weeks] == [
+        ("2024-01-01", 20, 10, 30, 2), ("2024-01-08", 5, 5, 5, 1), ("2024-01-29", 7, 7, 7, 1)
+    ]
+    months = downsample(dates, values, 60, mode="month")["points"]
+    assert [(p["date"], p["sum"]) for p in months] == [("2024-01-01", 45), ("2024-02-01", 7)]
+
+
+def test_long_ranges_of_calendar_buckets_stay_within_points():
+    dates, values = daily_series(5 * 365)
+    values[1000] = 4200
+    chart = downsample(dates, values, 60, mode="week")
+    assert chart["mode"] == "week"
+    assert len(chart["points"]) <= 60
+    # The bucket holding the spike survives, with its own extremes
+    assert max(p["max"] for p in chart["points"]) == 4200
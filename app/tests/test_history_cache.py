@@ -0,0 +1,128 @@
+# app/tests/test_history_cache.py
+
+import asyncio
+import importlib
+from datetime import date, datetime, timezone
+
+from bson import ObjectId
+
+from app.core.history_cache import HistoryCache, parse_reps
+
+progress_chart = importlib.import_module("app.api.routes.progress_chart")
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for find() over an in-memory list."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        docs = [d for d in self.docs if d["user_id"] == query["user_id"]]
+
+        async def iterate():
+            for doc in docs:
+                yield doc
+        return iterate()
+
+
+def meal_log(user_id, day, items):
+    return {"user_id": user_id, "date": day, "meals": {"breakfast": items, "lunch": [], "dinner": items}}
+
+
+def workout_log(user_id, day, done):
+    return {"user_id": user_id, "date": day, "status": "completed", "exercises": [
+        {"sets": 3, "reps": "10", "completed": done},
+        {"sets": 2, "reps": "30 sec", "completed": True},
+    ]}
+
+
+def test_reps_are_parsed_from_plan_text():
+    assert parse_reps("12") == 12
+    assert parse_reps("8-10") == 8
+    assert parse_reps("30 sec") == 0
+    assert parse_reps("Max") == 0
+
+
+def test_ranges_come_from_columns_and_follow_writes():
+    user = ObjectId()
+    meals = FakeCollection([
+        meal_log(user, datetime(2025, 1, 2, tzinfo=timezone.utc), [{"item_name": "egg", "weight_in_grams": 50, "calories": 70}]),
+        meal_log(user, "2025-01-01", [{"item_name": "oats"}]),  # not yet migrated date
+    ])
+    workouts = FakeCollection([workout_log(user, "2025-01-01", True), workout_log(user, "2025-01-01", False)])
+    cache = HistoryCache(meals, workouts)
+
+    async def run():
+        first = (await cache.get(str(user))).range(date(2025, 1, 1), date(2025, 1, 31))
+        cache.apply_meal_log(str(user), "2025-01-03", {"lunch": [{"item_name": "rice"}]})
+        cache.apply_meal_log_deleted(str(user), "2025-01-01")
+        cache.apply_workout_log(str(user), workout_log(user, datetime(2025, 1, 3), True))
+        second = (await cache.get(str(user))).range(date(2025, 1, 2), date(2025, 1, 3))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert meals.finds == 1 and workouts.finds == 1
+
+    assert first["meals"]["dates"] == ["2025-01-01", "2025-01-02"]
+    assert first["meals"]["slots"] == [0b101, 0b101]
+    assert first["meals"]["kcal"] == [0.0, 140.0]
+    assert first["meals"]["totals"] == {"items": 4, "grams": 100.0, "kcal": 140.0, "days_logged": 2}
+    assert first["workouts"]["dates"] == ["2025-01-01"]
+    assert first["workouts"]["totals"]["logs"] == 2
+    assert first["workouts"]["sets"] == [3 + 2 + 2]
+    assert first["workouts"]["reps"] == [30]
+
+    assert second["meals"]["dates"] == ["2025-01-02", "2025-01-03"]
+    assert second["meals"]["slots"] == [0b101, 0b010]
+    assert second["workouts"]["dates"] == ["2025-01-03"]
+
+
+def test_least_recently_used_users_are_evicted_over_budget():
+    users = [ObjectId() for _ in range(3)]
+    meals = FakeCollection([meal_log(u, f"2025-01-{d:02d}", []) for u in users for d in range(1, 29)])
+    cache = HistoryCache(meals, FakeCollection([]), max_bytes=2000)  # ~920 bytes per user
+
+    async def run():
+        for user in users:
+            await cache.get(str(user))
+
+    asyncio.run(run())
+    assert list(cache._users) == [str(users[1]), str(users[2])]
+    assert cache._bytes == sum(h.nbytes for h in cache._users.values())
+
+
+class FakeReports:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        docs = self.docs
+
+        class Cursor:
+            async def to_list(self, length):
+                return list(docs)
+        return Cursor()
+
+
+def test_diet_chart_prefers_logged_item_calories(monkeypatch):
+    user = ObjectId()
+    report = {"generated_at": datetime(2025, 1, 4), "generated_summary": {"dietProgressReport": {
+        "estimatedCalorieBreakdown": {"dailyLog": [
+            {"date": "2025-01-01", "calories": {"total": 1800}},
+            {"date": "2025-01-02", "calories": {"total": 1900}},
+        ]}
+    }}}
+    meals = FakeCollection([meal_log(user, "2025-01-02", [{"item_name": "rice", "calories": 1000}])])
+    monkeypatch.setattr(progress_chart, "diet_logs_collection", FakeReports([report]))
+    monkeypatch.setattr(progress_chart, "get_history_cache", lambda: HistoryCache(meals, FakeCollection([])))
+
+    result = asyncio.run(progress_chart.get_diet_chart_data(
+        user_id=str(user), start_date="2025-01-01", end_date="2025-01-03", points=60, mode="auto"
+    ))
+
+    assert [(p["date"], p["total"]) for p in result["data"]["daily_chart_data"]] == [
+        ("2025-01-01", 1800.0), ("2025-01-02", 2000.0)
+    ]
@@ -0,0 +1,31 @@
+# app/tests/test_llm_cassette.py
+
+import pytest
+
+from app.utils.llm_cassette import LLMCassette
+
+MESSAGES = [{"role": "user", "content": "How much protein should I eat?"}]
+
+
+def test_recorded_entries_replay_from_disk(tmp_path):
+    path = str(tmp_path / "llm.jsonl.gz")
+    recorder = LLMCassette(path, mode="record")
+    recorder.record("model", "chat", MESSAGES, "About 1.6g/kg.", latency_ms=420.0)
+    recorder.record("model", "chat", [{"role": "user", "content": "Other"}], "Sure.", latency_ms=300.0)
+
+    replayer = LLMCassette(path, mode="replay")
+
+    assert len(replayer) == 2
+    assert replayer.replay("model", MESSAGES)["response"] == "About 1.6g/kg."
+
+
+def test_replay_misses_on_changed_prompt(tmp_path):
+    path = str(tmp_path / "llm.jsonl.gz")
+    LLMCassette(path, mode="record").record("model", "chat", MESSAGES, "About 1.6g/kg.", latency_ms=1.0)
+
+    replayer = LLMCassette(path, mode="replay")
+
+    with pytest.raises(LookupError):
+        replayer.replay("other-model", MESSAGES)
+    with pytest.raises(LookupError):
+        replayer.replay("model", [{"role": "user", "content": "How much protein?"}])
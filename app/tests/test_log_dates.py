@@ -0,0 +1,92 @@
+# app/tests/test_log_dates.py
+
+import asyncio
+import importlib
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from app.config.settings import settings
+from app.schemas.meal_log import MealItem, MealLogRequest
+from app.schemas.workout import WorkoutDayLogRequest
+from app.utils.dates import day_filter, day_range_filter, day_start, day_string
+
+meal_log_routes = importlib.import_module("app.api.routes.meal_log_routes")
+update_meal_log_module = importlib.import_module("app.api.routes.update_meal_log")
+workout_routes = importlib.import_module("app.api.routes.workout")
+
+
+class RecordingCollection:
+    """Records every call; writes behave as upserts that inserted a new document."""
+
+    def __init__(self, name, find_one_result=None):
+        self.name = name
+        self.calls = []
+        self.find_one_result = find_one_result
+
+    async def find_one(self, *args, **kwargs):
+        self.calls.append(("find_one", args))
+        return self.find_one_result
+
+    async def update_one(self, *args, **kwargs):
+        self.calls.append(("update_one", args))
+        return SimpleNamespace(upserted_id=ObjectId())
+
+    async def find_one_and_update(self, *args, **kwargs):
+        self.calls.append(("find_one_and_update", args))
+        return {"meals": {"breakfast": [], "lunch": [], "dinner": []}}
+
+
+def test_days_are_stored_as_utc_midnight():
+    expected = datetime(2025, 3, 9, tzinfo=timezone.utc)
+    assert day_start("2025-03-09") == expected
+    assert day_start(date(2025, 3, 9)) == expected
+    assert day_start(datetime(2025, 3, 9, 18, 30)) == expected
+    assert day_string(expected) == "2025-03-09"
+    assert day_string("2025-03-09") == "2025-03-09"
+
+
+def test_filters_match_legacy_strings_only_until_migrated(monkeypatch):
+    monkeypatch.setattr(settings, "LEGACY_DATE_STRINGS", True)
+    assert day_filter("2025-03-09") == {"date": {"$in": [day_start("2025-03-09"), "2025-03-09"]}}
+    assert day_range_filter("2025-03-01", "2025-03-09") == {"$or": [
+        {"date": {"$gte": day_start("2025-03-01"), "$lte": day_start("2025-03-09")}},
+        {"date": {"$gte": "2025-03-01", "$lte": "2025-03-09"}},
+    ]}
+
+    monkeypatch.setattr(settings, "LEGACY_DATE_STRINGS", False)
+    assert day_filter("2025-03-09") == {"date": day_start("2025-03-09")}
+    assert day_range_filter("2025-03-01", "2025-03-09") == {
+        "date": {"$gte": day_start("2025-03-01"), "$lte": day_start("2025-03-09")}
+    }
+
+
+def test_log_writes_are_one_round_trip_with_the_default_flag(monkeypatch):
+    # On by default: each write also matches a not yet migrated string date instead of adding a second log
+    assert settings.LEGACY_DATE_STRINGS is True
+    monkeypatch.setattr(settings, "HISTORY_CACHE_ENABLED", False)
+    user_id, plan_id = str(ObjectId()), ObjectId()
+    meal_logs = RecordingCollection("meal_logs")
+    monkeypatch.setattr(meal_log_routes, "db", {"meal_logs": meal_logs})
+    monkeypatch.setattr(update_meal_log_module, "db", {"meal_logs": meal_logs})
+    plans = RecordingCollection("workout_plans", {"_id": plan_id, "plan": [
+        {"day": "Monday", "focus": "Legs", "exercises": [{"name": "Squat", "sets": 3, "reps": "10"}]}
+    ]})
+    completions = RecordingCollection("workout_completions")
+    monkeypatch.setattr(workout_routes, "workout_collection", plans)
+    monkeypatch.setattr(workout_routes, "workout_log_collection", completions)
+    meal = MealLogRequest(date="2025-03-10", breakfast=[MealItem(item_name="oats", quantity=1)], lunch=[], dinner=[])
+
+    asyncio.run(meal_log_routes.log_meal(meal, user_id=user_id))
+    asyncio.run(update_meal_log_module.update_meal_log(meal, user_id=user_id))
+    response = asyncio.run(workout_routes.log_workout_day(
+        WorkoutDayLogRequest(plan_id=str(plan_id), date=date(2025, 3, 10), status="completed"), user_id=user_id
+    ))
+
+    assert [name for name, _ in meal_logs.calls] == ["update_one", "find_one_and_update"]
+    both_forms = {"$in": [day_start("2025-03-10"), "2025-03-10"]}
+    assert all(args[0]["date"] == both_forms for _, args in meal_logs.calls)
+    assert [name for name, _ in completions.calls] == ["update_one"]
+    assert completions.calls[0][1][0]["date"] == both_forms
+    assert response["status"] == 201
@@ -1,6 +1,7 @@
 # app/tests/test_main.py
 
 from fastapi.testclient import TestClient
+from app.config.settings import settings
 from app.main import app
 
 client = TestClient(app)
@@ -8,3 +9,10 @@ client = TestClient(app)
 def test_root():
     response = client.get("/")
     assert response.status_code == 200
+
+def test_metrics_need_the_admin_secret():
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Secret": "wrong"}).status_code == 403
+    response = client.get("/metrics", headers={"X-Admin-Secret": settings.API_SECRET})
+    assert response.status_code == 200
+    assert "llm_request_duration_seconds" in response.text
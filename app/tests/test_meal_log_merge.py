@@ -0,0 +1,68 @@
+# app/tests/test_meal_log_merge.py
+#
+# Needs a real MongoDB: TEST_MONGO_URL=mongodb://localhost:27017 python -m pytest
+
+import asyncio
+import importlib
+import os
+from collections import Counter
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient  # type: ignore
+from pymongo import monitoring
+
+from app.schemas.meal_log import MealItem, MealLogRequest
+
+TEST_MONGO_URL = os.getenv("TEST_MONGO_URL")
+pytestmark = pytest.mark.skipif(not TEST_MONGO_URL, reason="TEST_MONGO_URL not set")
+
+update_meal_log_module = importlib.import_module("app.api.routes.update_meal_log")
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def test_parallel_partial_updates_lose_no_items(monkeypatch):
+    counter = CommandCounter()
+    user_id = str(ObjectId())
+    requests = [
+        MealLogRequest(
+            date="2025-01-01",
+            **{("breakfast", "lunch", "dinner")[i % 3]: [MealItem(item_name=f"item-{i}", quantity=i)]}
+        )
+        for i in range(100)
+    ]
+
+    async def run():
+        client = AsyncIOMotorClient(TEST_MONGO_URL, event_listeners=[counter])
+        test_db = client["workoutbuddy_test"]
+        monkeypatch.setattr(update_meal_log_module, "db", test_db)
+        await test_db["meal_logs"].create_index([("user_id", 1), ("date", 1)], unique=True)
+        try:
+            counter.commands.clear()
+            await asyncio.gather(*(
+                update_meal_log_module.update_meal_log(data, user_id=user_id) for data in requests
+            ))
+            return await test_db["meal_logs"].find_one({"user_id": ObjectId(user_id)})
+        finally:
+            await test_db["meal_logs"].delete_many({"user_id": ObjectId(user_id)})
+            client.close()
+
+    meal_log = asyncio.run(run())
+
+    logged = {item["item_name"] for slot in meal_log["meals"].values() for item in slot}
+    assert logged == {f"item-{i}" for i in range(100)}
+    assert counter.commands["findAndModify"] == 100
+    assert sum(counter.commands.values()) == 100
@@ -0,0 +1,53 @@
+# app/tests/test_nutrition.py
+
+import pytest
+
+from app.utils.nutrition import activity_key, calorie_score, daily_targets, goal_key, targets_for_profiles
+
+PROFILE = {"age": 30, "gender": "male", "height": 180, "weight": 80, "activity_level": "moderate", "goal": "maintain_fitness"}
+
+
+def test_mifflin_st_jeor_with_activity_and_goal():
+    targets = daily_targets(PROFILE)
+    # 10*80 + 6.25*180 - 5*30 + 5 = 1780; x1.55
+    assert (targets["method"], targets["bmr"], targets["tdee"], targets["calories"]) == ("mifflin_st_jeor", 1780, 2759, 2759)
+    assert targets["protein_g"] == 128
+    assert abs(4 * targets["protein_g"] + 4 * targets["carbs_g"] + 9 * targets["fat_g"] - targets["calories"]) < 10
+
+    cut = daily_targets({**PROFILE, "goal": "Weight Loss"})
+    assert cut["calories"] == round(2759.0 * 0.8) and cut["protein_g"] == 160
+
+
+def test_katch_mcardle_and_calorie_floor():
+    lean = daily_targets({**PROFILE, "body_fat_pct": 20})
+    assert lean["method"] == "katch_mcardle" and lean["bmr"] == round(370 + 21.6 * 64)
+
+    small = daily_targets({"age": 70, "gender": "Female", "height_cm": 150, "weight_kg": 45,
+                           "activity_level": "Sedentary", "fitness_goal": "lose fat"})
+    assert small["calories"] == 1200
+
+
+def test_batch_keeps_positions_of_incomplete_profiles():
+    results = targets_for_profiles([PROFILE, {"age": 30}, {**PROFILE, "activity_level": "sometimes"}, PROFILE])
+    assert results[1] is None and results[2] is None
+    assert results[0] == results[3] == daily_targets(PROFILE)
+
+
+@pytest.mark.parametrize("text, key", [
+    ("Moderately Active", "moderate"), ("very_active", "very_active"), ("Lightly active", "light"),
+    ("Active", "active"), ("sedentary", "sedentary"), ("", None),
+])
+def test_activity_levels_are_normalized(text, key):
+    assert activity_key(text) == key
+
+
+def test_goals_are_normalized():
+    assert [goal_key(g) for g in ("lose_weight", "Muscle Gain", "maintain_fitness", None)] == ["lose", "gain", "maintain", "maintain"]
+    assert [goal_key(g) for g in ("Lean Muscle", "get lean", "build muscle and lose fat")] == ["gain", "lose", "gain"]
+
+
+def test_calorie_score_against_target():
+    # 1 within 10%, 0.5 at 30% off, 0 from 50% off; missing and zero totals are not scored
+    assert [calorie_score(total, 2000) for total in (2000, 2100, 1400, 3200)] == [1.0, 1.0, 0.5, 0.0]
+    assert calorie_score(None, 2000) is calorie_score(0, 2000) is calorie_score("n/a", 2000) is None
+
@@ -0,0 +1,96 @@
+# app/tests/test_plan_catalog.py
+
+import asyncio
+
+import pytest
+
+from app.core import plan_catalog
+from app.core.metrics import PLAN_CATALOG_LOOKUPS
+from app.core.plan_catalog import (
+    CALORIE_BAND, CALORIE_BANDS, all_diet_keys, all_workout_keys, catalog_plan, diet_bucket, diet_type_key,
+    duration_minutes, workout_bucket
+)
+from app.jobs.build_plan_catalog import band_targets, parse_key, validate_workout_plan
+from app.schemas.diet_plan import DietFormRequest
+from app.schemas.workout import WorkoutDietPlanRequest
+from app.utils.nutrition import CALORIE_TOLERANCE, calorie_score
+
+WORKOUT = WorkoutDietPlanRequest(
+    age=28, gender="Female", height_cm=165, weight_kg=60, activity_level="Moderately Active", goal="Weight Loss",
+    workout_days_per_week=4, workout_duration="45 minutes"
+)
+DIET = DietFormRequest(
+    diet_type="Non-Veg", activity_level="light", fitness_goal="Muscle Gain", experience_level="Beginner",
+    medical_conditions=[], allergies=["None"], other_allergy="", preferred_workout_style="Gym",
+    preferred_training_days_per_week=5
+)
+
+
+def test_profiles_are_canonicalized_into_bucket_keys():
+    assert workout_bucket(WORKOUT) == "workout:lose:moderate:4d:45m"
+    assert diet_bucket(DIET, 5) == "diet:gain:light:non_vegetarian:5d"
+    assert workout_bucket(WORKOUT) in all_workout_keys() and diet_bucket(DIET, 5) in all_diet_keys()
+    assert parse_key("diet:gain:light:non_vegetarian:5d") == {
+        "kind": "diet", "goal": "gain", "activity": "light", "diet_type": "non_vegetarian", "days": 5
+    }
+
+
+@pytest.mark.parametrize("text, key", [
+    ("Veg", "vegetarian"), ("vegetarian", "vegetarian"), ("non vegetarian", "non_vegetarian"),
+    ("Vegan", "vegan"), ("Eggetarian", "eggetarian"), ("keto", None),
+])
+def test_diet_types(text, key):
+    assert diet_type_key(text) == key
+
+
+def test_durations():
+    assert [duration_minutes(d) for d in ("30 min", "1 hour", "60", "50 minutes", None)] == [30, 60, 60, None, None]
+
+
+def test_diet_buckets_of_users_with_targets_carry_their_calorie_band():
+    key = diet_bucket(DIET, 5, {"calories": 2180})
+    assert key == "diet:gain:light:non_vegetarian:5d:2200kcal"
+    assert key in all_diet_keys()
+    assert parse_key(key)["calories"] == 2200
+    assert band_targets(parse_key(key))["calories"] == 2200
+    assert diet_bucket(DIET, 5, {"calories": 900}) is None
+    # The band's plan still scores as on target for every user mapped to it
+    assert CALORIE_BAND / 2 <= CALORIE_TOLERANCE * CALORIE_BANDS[0]
+    assert calorie_score(2200, 2180) == calorie_score(2200, 2100) == 1.0
+
+
+def test_conditions_injuries_and_allergies_are_not_served_from_the_catalog():
+    assert workout_bucket(WORKOUT.model_copy(update={"injuries_or_limitations": ["left knee"]})) is None
+    assert workout_bucket(WORKOUT.model_copy(update={"medical_conditions": ["none"]})) is not None
+    assert diet_bucket(DIET.model_copy(update={"other_allergy": "peanuts"}), 5) is None
+
+
+def test_catalog_plans_must_match_the_bucket():
+    exercise = {"name": "Squat", "sets": 3, "reps": "10", "equipment": "None", "duration_per_set": "40 sec", "instructions": []}
+    week = [{"day": day, "focus": "Legs" if i < 3 else "Rest", "exercises": [exercise] if i < 3 else []}
+            for i, day in enumerate(("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"))]
+    assert len(validate_workout_plan(week, 3)) == 7
+    with pytest.raises(ValueError):
+        validate_workout_plan(week, 4)
+    with pytest.raises(ValueError):
+        validate_workout_plan(week[:6], 3)
+
+
+class FakeCatalog:
+    def __init__(self, entries):
+        self.entries = entries
+
+    async def find_one(self, query, projection=None):
+        return self.entries.get(query["_id"])
+
+
+def test_lookups_are_counted_by_result(monkeypatch):
+    monkeypatch.setattr(plan_catalog, "db", {"plan_catalog": FakeCatalog({"diet:gain:light:vegan:5d": {"plan": {"monday": {}}}})})
+    before = dict(PLAN_CATALOG_LOOKUPS._values)
+
+    assert asyncio.run(catalog_plan("diet", "diet:gain:light:vegan:5d")) == {"monday": {}}
+    assert asyncio.run(catalog_plan("diet", "diet:gain:light:vegan:4d")) is None
+    assert asyncio.run(catalog_plan("diet", None)) is None
+
+    for result in ("hit", "miss", "ineligible"):
+        assert PLAN_CATALOG_LOOKUPS._values[("diet", result)] == before.get(("diet", result), 0) + 1
@@ -0,0 +1,38 @@
+# app/tests/test_profiling.py
+
+import asyncio
+
+from app.config.settings import settings
+from app.core.profiling import ProfilingMiddleware
+
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def run(headers, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+    middleware = ProfilingMiddleware(plain_app)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": headers}
+    asyncio.run(middleware(scope, None, send))
+    return dict(sent[0]["headers"])
+
+
+def test_sampled_requests_do_not_see_the_profile_id(monkeypatch, tmp_path):
+    headers = run([], monkeypatch, tmp_path)
+
+    assert b"x-profile-id" not in headers
+    assert list(tmp_path.glob("*.folded"))
+
+
+def test_admins_get_the_profile_id(monkeypatch, tmp_path):
+    headers = run([(b"x-admin-secret", settings.API_SECRET.encode())], monkeypatch, tmp_path)
+
+    assert (tmp_path / f"{headers[b'x-profile-id'].decode()}.folded").exists()
@@ -0,0 +1,44 @@
+# app/tests/test_rate_limit.py
+
+import asyncio
+
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_limits():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+    limit = RateLimit(name="test", capacity=3, per_seconds=30)
+
+    results = [asyncio.run(backend.consume("test:user", limit)) for _ in range(4)]
+
+    assert results[:3] == [0.0, 0.0, 0.0]
+    assert results[3] == 10.0  # one token every 10 seconds
+
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+    limit = RateLimit(name="test", capacity=1, per_seconds=60)
+
+    assert asyncio.run(backend.consume("test:user", limit)) == 0.0
+    assert asyncio.run(backend.consume("test:user", limit)) > 0
+
+    clock.now += 60
+    assert asyncio.run(backend.consume("test:user", limit)) == 0.0
+
+
+def test_buckets_are_independent_per_key():
+    backend = InMemoryRateLimitBackend(clock=FakeClock())
+    limit = RateLimit(name="test", capacity=1, per_seconds=60)
+
+    assert asyncio.run(backend.consume("test:a", limit)) == 0.0
+    assert asyncio.run(backend.consume("test:b", limit)) == 0.0
@@ -0,0 +1,20 @@
+# app/tests/test_sync_cursor.py
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.sync import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_to_the_millisecond():
+    moment = datetime(2025, 6, 1, 12, 30, 15, 123000, tzinfo=timezone.utc)
+    token = encode_cursor(moment)
+    assert "=" not in token
+    assert decode_cursor(token) == moment
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", encode_cursor(datetime.now(timezone.utc))[:-3], "eyJ2IjoyLCJ0IjoxfQ"])
+def test_foreign_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
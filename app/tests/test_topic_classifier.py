@@ -0,0 +1,34 @@
+# app/tests/test_topic_classifier.py
+
+import pytest
+
+from app.core.topic_classifier import featurize, get_topic_classifier, is_off_topic
+
+
+def test_clear_cases_are_separated():
+    classifier = get_topic_classifier()
+
+    assert classifier.predict("How many sets and reps should I do for bigger legs?") > 0.5
+    assert classifier.predict("What should I eat after my workout?") > 0.5
+    assert classifier.predict("Write a Python script that renames files") < 0.2
+    assert classifier.predict("Who won the election last year?") < 0.2
+
+
+def test_features_are_stable_and_ignore_question_words():
+    assert featurize("Protein for breakfast?") == featurize("what is the protein for breakfast")
+    assert featurize("how do I") == []
+
+
+@pytest.mark.parametrize("message", [
+    "what about creatine", "is paneer good for me", "hi", "hello", "thanks", "my knee hurts",
+    "Can I eat mango at night?", "Is coffee ok before the gym?",
+])
+def test_short_and_real_questions_are_not_refused(message):
+    assert not is_off_topic(message)
+
+
+@pytest.mark.parametrize("message", [
+    "Write a Python script that renames files", "What's the capital of France?", "Help me with my math homework",
+])
+def test_clearly_off_topic_messages_are_refused(message):
+    assert is_off_topic(message)
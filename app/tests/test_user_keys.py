@@ -0,0 +1,28 @@
+# app/tests/test_user_keys.py
+
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from app.config.settings import settings
+from app.db.user_keys import by_user, public_user_id, user_key
+
+profiles = SimpleNamespace(name="user_profiles")
+meal_logs = SimpleNamespace(name="meal_logs")
+
+
+def test_user_ids_are_keyed_as_object_ids():
+    user_id = str(ObjectId())
+    assert user_key(user_id) == ObjectId(user_id)
+    assert user_key(ObjectId(user_id)) == ObjectId(user_id)
+    assert public_user_id({"user_id": ObjectId(user_id)}) == {"user_id": user_id}
+
+
+def test_legacy_string_ids_are_matched_only_until_migrated(monkeypatch):
+    user_id = str(ObjectId())
+    monkeypatch.setattr(settings, "LEGACY_USER_ID_STRINGS", True)
+    assert by_user(profiles, user_id) == {"user_id": {"$in": [ObjectId(user_id), user_id]}}
+    assert by_user(meal_logs, user_id, date="x") == {"user_id": ObjectId(user_id), "date": "x"}
+
+    monkeypatch.setattr(settings, "LEGACY_USER_ID_STRINGS", False)
+    assert by_user(profiles, user_id) == {"user_id": ObjectId(user_id)}
@@ -0,0 +1,36 @@
+# app/tests/test_verify_otp.py
+
+import asyncio
+import importlib
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.auth import VerifyOTP
+
+auth_routes = importlib.import_module("app.api.routes.auth")
+
+
+class RecordingOTPs:
+    def __init__(self):
+        self.updates = []
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.updates.append(update)
+        return None
+
+
+@pytest.mark.parametrize("otp", ["$otp", "12345", "1234567", "12a456", ""])
+def test_otps_must_be_six_digits(otp):
+    with pytest.raises(ValidationError):
+        VerifyOTP(email="a@b.co", otp=otp)
+
+
+def test_submitted_otp_is_compared_as_a_literal(monkeypatch):
+    otps = RecordingOTPs()
+    monkeypatch.setattr(auth_routes, "otp_collection", otps)
+
+    # Bypasses validation, as a looser schema would: the pipeline must still not read "$otp" as a field path
+    asyncio.run(auth_routes.verify_account(VerifyOTP.model_construct(email="a@b.co", otp="$otp")))
+
+    assert otps.updates[0][0]["$set"]["verified"] == {"$eq": ["$otp", {"$literal": "$otp"}]}
@@ -0,0 +1,49 @@
+# app/tests/test_workout_charts.py
+
+import asyncio
+import importlib
+
+from bson import ObjectId
+
+workout_charts = importlib.import_module("app.api.routes.workout_charts")
+
+
+class FakeReports:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    async def find_one(self, query, sort=None):
+        self.calls.append((query, sort))
+        docs = [d for d in self.docs if "generated_summary" in d]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return docs[0] if docs else None
+
+
+def report(generated_at: str, completed_days: int) -> dict:
+    return {"generated_at": generated_at, "generated_summary": {
+        "start_date": "2025-01-01", "end_date": "2025-01-15", "completed_days": completed_days, "total_days": 15,
+        "consistency": 50.0, "average_rpe": 6.0, "total_sets": 10, "total_reps": 100, "calories_burned": 500,
+        "dailyLog": [], "sum_of_all_calorie_burnout": 500, "weight": 70, "tips": [],
+        "muscle_distribution": {"chest": 0, "back": 0, "legs": 0, "arms": 0, "core": 0, "shoulders": 0, "other": 0},
+    }}
+
+
+def test_summary_is_the_newest_report(monkeypatch):
+    reports = FakeReports([report("2025-01-16", 3), report("2025-02-01", 9), report("2025-01-20", 5)])
+    monkeypatch.setattr(workout_charts, "workout_logs", reports)
+
+    response = asyncio.run(workout_charts.get_workout_progress_summary(user_id=str(ObjectId())))
+
+    assert response["status"] == 200
+    assert response["data"].summary.completed_days == 9
+    assert reports.calls[0][1] == [("generated_at", -1)]
+
+
+def test_missing_summary_is_a_404(monkeypatch):
+    monkeypatch.setattr(workout_charts, "workout_logs", FakeReports([]))
+
+    response = asyncio.run(workout_charts.get_workout_progress_summary(user_id=str(ObjectId())))
+
+    assert response["status"] == 404
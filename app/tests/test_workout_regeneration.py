@@ -0,0 +1,109 @@
+# app/tests/test_workout_regeneration.py
+
+import asyncio
+import copy
+import importlib
+import json
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from app.api.routes.workout import build_workout_days_prompt, regenerate_workout_days
+from app.schemas.workout import WorkoutDaysRegenerateRequest
+
+workout_routes = importlib.import_module("app.api.routes.workout")
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+EXERCISES = [
+    {"name": name, "sets": 3, "reps": "10-12", "equipment": equipment, "duration_per_set": "45 sec",
+     "instructions": ["Keep your core braced", "Control the lowering phase"]}
+    for name, equipment in [("Goblet Squat", "Dumbbell"), ("Push-Up", "Bodyweight"), ("Plank", "Bodyweight")]
+]
+WORKOUT_PLAN = [
+    {"day": day, "focus": "Full Body Strength" if i < 5 else "Rest", "exercises": EXERCISES if i < 5 else []}
+    for i, day in enumerate(DAYS)
+]
+
+PLAN = {
+    "age": 30, "gender": "female", "height_cm": 168, "weight_kg": 64, "activity_level": "moderate",
+    "goal": "gain_muscle", "workout_days_per_week": 5, "workout_duration": "45 minutes",
+    "medical_conditions": [], "injuries_or_limitations": ["sore left wrist"], "plan": WORKOUT_PLAN
+}
+
+
+def test_prompt_keeps_other_days_as_context_only():
+    prompt = build_workout_days_prompt(PLAN, ["Wednesday"], "no push-ups")
+
+    assert "Regenerate these days only: Wednesday." in prompt
+    assert "- Monday: Full Body Strength (Goblet Squat, Push-Up" in prompt
+    assert "- Wednesday:" not in prompt
+    assert "Requested change: no push-ups" in prompt
+    assert "sore left wrist" in prompt
+    # Kept days carry exercise names only, not their full instructions
+    assert "Keep your core braced" not in prompt
+
+
+def test_plans_without_conditions_or_injuries_still_build_a_prompt():
+    older = {k: v for k, v in PLAN.items() if k not in ("medical_conditions", "injuries_or_limitations")}
+    prompt = build_workout_days_prompt(older, ["Wednesday"])
+
+    assert "- Medical Conditions: None" in prompt
+    assert "- Injuries or Limitations: None" in prompt
+
+
+def test_invalid_user_id_is_rejected():
+    response = asyncio.run(regenerate_workout_days(
+        "0123456789abcdef01234567", WorkoutDaysRegenerateRequest(days=["Monday"]), user_id="not-an-id"
+    ))
+    assert response["status"] == 400
+
+
+class FakePlans:
+    """One stored plan; applies $set (including positional "plan.N" paths) and $unset like Mongo would."""
+
+    name = "workout_plans"
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return {k: v for k, v in copy.deepcopy(self.doc).items() if k not in ("rendered", "rendered_for")}
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+        for path, value in update.get("$set", {}).items():
+            field, _, index = path.partition(".")
+            if index:
+                self.doc[field][int(index)] = value
+            else:
+                self.doc[field] = value
+        for path in update.get("$unset", {}):
+            self.doc.pop(path, None)
+        return SimpleNamespace(matched_count=1)
+
+    async def update_many(self, query, update):
+        return SimpleNamespace(matched_count=0)
+
+
+def test_only_the_regenerated_days_are_written(monkeypatch):
+    plan_id = ObjectId()
+    plans = FakePlans({"_id": plan_id, **copy.deepcopy(PLAN), "rendered": {"identity": b"{}"}})
+    new_wednesday = {"day": "Wednesday", "focus": "Mobility", "exercises": [
+        {**EXERCISES[2], "name": "Cat-Cow"}
+    ]}
+    monkeypatch.setattr(workout_routes, "workout_collection", plans)
+    monkeypatch.setattr(workout_routes, "get_groq_response", lambda prompt: json.dumps([new_wednesday]))
+
+    response = asyncio.run(regenerate_workout_days(
+        str(plan_id), WorkoutDaysRegenerateRequest(days=["wednesday"]), user_id=str(ObjectId())
+    ))
+
+    assert response["status"] == 200
+    update = plans.updates[0]
+    assert set(update["$set"]) == {"plan.2", "updated_at"}
+    assert plans.doc["plan"][2]["focus"] == "Mobility"
+    assert plans.doc["plan"][2]["exercises"][0]["name"] == "Cat-Cow"
+    assert [d for i, d in enumerate(plans.doc["plan"]) if i != 2] == [d for i, d in enumerate(WORKOUT_PLAN) if i != 2]
+    # The stored payload no longer matches the plan and is re-rendered on the next read
+    assert "rendered" not in plans.doc
@@ -0,0 +1,135 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+from app.utils.nutrition import calorie_score
+
+MEAL_SLOTS = ("breakfast", "lunch", "dinner")
+# Share of a day's score from matching the planned meals; the rest is the calorie delta
+MEAL_WEIGHT = 0.7
+WORD_RE = re.compile(r"[a-z]+")
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "bowl", "cup", "cups", "for", "fresh", "g", "glass", "grams", "in", "kcal",
+    "medium", "of", "on", "or", "piece", "pieces", "plate", "serving", "side", "slice", "slices", "small",
+    "some", "the", "to", "tbsp", "tsp", "with",
+}
+
+
+def tokens(value) -> frozenset:
+    """Normalized food words of a planned meal (text or list) or of logged items."""
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(v.get("item_name", "")) if isinstance(v, dict) else str(v) for v in value)
+    words = set()
+    for word in WORD_RE.findall(str(value or "").lower()):
+        if word in STOPWORDS:
+            continue
+        # Cheap singular form so "eggs" matches "egg" and "berries" matches "berry"
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+def token_set_similarity(planned: frozenset, logged: frozenset) -> float:
+    """Shared words over the smaller set, so a short log ("oats, banana") can fully match a longer plan line."""
+    if not planned or not logged:
+        return 0.0
+    return len(planned & logged) / min(len(planned), len(logged))
+
+
+def parse_calories(value) -> Optional[float]:
+    """Plan calories as stored by the model: 2000, "2000", "~1,950 kcal"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def logged_calories(meals: dict) -> Optional[float]:
+    """Sum of item calories when the client logged them, None otherwise."""
+    values = [item.get("calories") for slot in MEAL_SLOTS for item in (meals.get(slot) or [])]
+    values = [v for v in values if isinstance(v, (int, float))]
+    return float(sum(values)) if values else None
+
+
+def plan_by_date(plan: Optional[dict]) -> dict:
+    """The stored ai_generated_plan keyed by date: {"YYYY-MM-DD": {"breakfast": ..., "calories": ...}}."""
+    by_date = {}
+    for entry in ((plan or {}).get("ai_generated_plan") or {}).values():
+        if isinstance(entry, dict) and entry.get("date"):
+            by_date[entry["date"]] = entry.get("meals") or {}
+    return by_date
+
+
+def score_adherence(start: date, end: date, logs: dict, plan: Optional[dict] = None,
+                    calorie_target: Optional[float] = None, daily_calories: Optional[dict] = None) -> dict:
+    """
+    Adherence and logging consistency for every day from start to end, in one pass.
+
+    `logs` maps "YYYY-MM-DD" to that day's meals ({"breakfast": [items], ...}).
+    A day with a planned entry scores each planned slot by token-set similarity
+    between the planned meal and the logged item names (a missing slot scores 0);
+    a day's calorie total (item calories when logged, else `daily_calories`)
+    scores against the plan's calories for that day, or `calorie_target`.
+    The day score weighs the two by MEAL_WEIGHT, using whichever is available.
+    Days with neither a plan entry nor a calorie total are not scored.
+
+    Consistency is exact: logged slots over all slots in the range.
+    """
+    planned = plan_by_date(plan)
+    daily_calories = daily_calories or {}
+    days, day_scores = [], []
+    logged_slots, missed = 0, {slot: 0 for slot in MEAL_SLOTS}
+
+    day = start
+    while day <= end:
+        key = day.isoformat()
+        meals = logs.get(key) or {}
+        slots = [slot for slot in MEAL_SLOTS if meals.get(slot)]
+        logged_slots += len(slots)
+        for slot in MEAL_SLOTS:
+            if slot not in slots:
+                missed[slot] += 1
+
+        plan_meals = planned.get(key)
+        meal_score = similarity = None
+        if plan_meals is not None:
+            similarity = {
+                slot: round(token_set_similarity(tokens(plan_meals.get(slot)), tokens(meals.get(slot))), 3)
+                for slot in MEAL_SLOTS if plan_meals.get(slot)
+            }
+            meal_score = sum(similarity.values()) / len(similarity) if similarity else None
+
+        total = logged_calories(meals) if meals else None
+        if total is None:
+            total = daily_calories.get(key)
+        target = parse_calories(plan_meals.get("calories")) if plan_meals else None
+        target = target or calorie_target
+        cal_score = calorie_score(total, target) if slots else None
+
+        if meal_score is not None and cal_score is not None:
+            score = MEAL_WEIGHT * meal_score + (1 - MEAL_WEIGHT) * cal_score
+        else:
+            score = meal_score if meal_score is not None else cal_score
+        if score is not None:
+            day_scores.append(score)
+
+        days.append({
+            "date": key,
+            "logged_slots": slots,
+            "similarity": similarity,
+            "calories": total,
+            "calorie_target": target,
+            "score": round(100 * score, 1) if score is not None else None,
+        })
+        day += timedelta(days=1)
+
+    return {
+        "adherence_percentage": round(100 * sum(day_scores) / len(day_scores), 1) if day_scores else None,
+        "consistency_percentage": round(100 * logged_slots / (len(MEAL_SLOTS) * len(days)), 1) if days else None,
+        "missed_meals": missed,
+        "days": days,
+    }
@@ -0,0 +1,43 @@
+from datetime import date, datetime, timezone
+from typing import Union
+
+from app.config.settings import settings
+
+Day = Union[str, date, datetime]
+
+
+def day_start(value: Day) -> datetime:
+    """Midnight UTC of a calendar day, the form `date` is stored in for meal and workout logs."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def day_string(value: Day) -> str:
+    """'YYYY-MM-DD' for a stored log date, whether native or a not yet migrated string."""
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def day_filter(value: Day, field: str = "date") -> dict:
+    """
+    Equality filter on a log date. While LEGACY_DATE_STRINGS is on (until
+    app.jobs.migrate_log_dates has run) it also matches the old string form.
+    """
+    if settings.LEGACY_DATE_STRINGS:
+        return {field: {"$in": [day_start(value), day_string(value)]}}
+    return {field: day_start(value)}
+
+
+def day_range_filter(start: Day, end: Day, field: str = "date") -> dict:
+    """Inclusive range filter on a log date; see day_filter()."""
+    native = {field: {"$gte": day_start(start), "$lte": day_start(end)}}
+    if settings.LEGACY_DATE_STRINGS:
+        # Range operators only compare within a BSON type, so each form needs its own clause
+        return {"$or": [native, {field: {"$gte": day_string(start), "$lte": day_string(end)}}]}
+    return native
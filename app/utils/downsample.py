@@ -0,0 +1,104 @@
+from datetime import date
+
+MODES = ("auto", "lttb", "week", "month")
+
+
+def lttb(xs: list, ys: list, threshold: int) -> list:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of the series. First and last points are always kept.
+    """
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:threshold]
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def lttb_with_extremes(xs: list, ys: list, threshold: int, lows: list = None, highs: list = None) -> list:
+    """
+    LTTB indices that always include the series' minimum and maximum (of
+    `lows`/`highs` when given, e.g. per-bucket extremes of aggregates). Two
+    slots are reserved for them, so at most `threshold` points (threshold >= 5).
+    """
+    if threshold >= len(xs):
+        return list(range(len(xs)))
+    lows, highs = lows or ys, highs or ys
+    selected = set(lttb(xs, ys, max(3, threshold - 2)))
+    selected.add(min(range(len(lows)), key=lows.__getitem__))
+    selected.add(max(range(len(highs)), key=highs.__getitem__))
+    return sorted(selected)
+
+
+def period_start(day: date, period: str) -> date:
+    if period == "week":
+        return date.fromordinal(day.toordinal() - day.weekday())
+    return day.replace(day=1)
+
+
+def aggregate(days: list, values: list, period: str, key: str = "value") -> list:
+    """Calendar week (Monday-based) or month buckets with mean, min, max, sum and the number of days logged."""
+    buckets = {}
+    for day, value in zip(days, values):
+        buckets.setdefault(period_start(day, period), []).append(value)
+    return [
+        {
+            "date": start.isoformat(),
+            key: round(sum(bucket) / len(bucket), 2),
+            "min": min(bucket),
+            "max": max(bucket),
+            "sum": sum(bucket),
+            "days": len(bucket),
+        }
+        for start, bucket in sorted(buckets.items())
+    ]
+
+
+def downsample(dates: list, values: list, points: int, mode: str = "auto", key: str = "value") -> dict:
+    """
+    Reduces a daily series ('YYYY-MM-DD' dates, sorted) for charting:
+
+    - "week"/"month": calendar aggregates with min/max per bucket, reduced
+      with LTTB on their means when there are more than `points` buckets
+    - "lttb": at most `points` of the original points, extremes included
+    - "auto": the raw series when it already fits in `points`, LTTB otherwise
+
+    Returns {"mode": applied mode, "points": [...]}, each point's value under `key`.
+    """
+    if mode == "auto" and len(dates) <= points:
+        return {"mode": "raw", "points": [{"date": d, key: v} for d, v in zip(dates, values)]}
+    days = [date.fromisoformat(d) for d in dates]
+    if mode in ("week", "month"):
+        buckets = aggregate(days, values, mode, key)
+        if len(buckets) > points:
+            indices = lttb_with_extremes(
+                [date.fromisoformat(b["date"]).toordinal() for b in buckets], [b[key] for b in buckets], points,
+                lows=[b["min"] for b in buckets], highs=[b["max"] for b in buckets]
+            )
+            buckets = [buckets[i] for i in indices]
+        return {"mode": mode, "points": buckets}
+
+    indices = lttb_with_extremes([d.toordinal() for d in days], values, points)
+    return {"mode": "lttb", "points": [{"date": dates[i], key: values[i]} for i in indices]}
@@ -1,40 +1,81 @@
+import time
+
 from openai import OpenAI
 from app.config.settings import settings
+from app.core.metrics import LLM_COMPLETION_TOKENS, LLM_ERRORS, LLM_LATENCY, LLM_PROMPT_TOKENS
+from app.utils.llm_cassette import get_cassette
+
+PROVIDER = "groq"
+MODEL = "llama3-70b-8192"
 
 client = OpenAI(
-    base_url="https://api.groq.com/openai/v1",
+    base_url=settings.GROQ_BASE_URL,
     api_key=settings.GROQ_API_KEY
 )
 
-def get_groq_response(user_message: str) -> str:
+def create_completion(call: str, messages: list) -> str:
+    """
+    Runs a chat completion and records latency, token usage and errors per `call`
+    ("completion", "chat", "chat_summary"), not per HTTP route.
+    With LLM_CASSETTE_MODE=replay the answer comes from the cassette instead.
+    """
+    cassette = get_cassette()
+    start = time.perf_counter()
+
+    if cassette is not None and cassette.mode == "replay":
+        try:
+            return cassette.replay(MODEL, messages)["response"]
+        except LookupError:
+            LLM_ERRORS.inc(provider="cassette", call=call)
+            raise
+        finally:
+            LLM_LATENCY.observe(time.perf_counter() - start, provider="cassette", call=call)
+
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[
-                {"role": "system", "content": "You're a helpful fitness assistant."},
-                {"role": "user", "content": user_message}
-            ]
+        response = client.chat.completions.create(model=MODEL, messages=messages)
+    except Exception:
+        LLM_ERRORS.inc(provider=PROVIDER, call=call)
+        raise
+    finally:
+        LLM_LATENCY.observe(time.perf_counter() - start, provider=PROVIDER, call=call)
+
+    content = response.choices[0].message.content.strip()
+    prompt_tokens = response.usage.prompt_tokens if response.usage else 0
+    completion_tokens = response.usage.completion_tokens if response.usage else 0
+    LLM_PROMPT_TOKENS.inc(prompt_tokens, provider=PROVIDER, call=call)
+    LLM_COMPLETION_TOKENS.inc(completion_tokens, provider=PROVIDER, call=call)
+
+    if cassette is not None and cassette.mode == "record":
+        cassette.record(
+            MODEL, call, messages, content,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
         )
-        return response.choices[0].message.content.strip()
+    return content
+
+def get_groq_response(user_message: str) -> str:
+    try:
+        return create_completion("completion", [
+            {"role": "system", "content": "You're a helpful fitness assistant."},
+            {"role": "user", "content": user_message}
+        ])
     except Exception as e:
         return f"⚠️ Error: {str(e)}"
-def get_groq_chat_response(user_message: str) -> str:
+CHAT_SYSTEM_PROMPT = (
+    "You are a helpful and expert fitness assistant. "
+    "Only respond to questions strictly related to fitness, health, workouts, nutrition, or diet. "
+    "If the question is unrelated to fitness, politely refuse to answer and remind the user "
+    "that you are only trained to help with fitness-related topics."
+)
+
+def get_groq_chat_response(user_message: str, context: list = None) -> str:
+    """`context` holds earlier conversation messages to send between the system prompt and the question."""
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful and expert fitness assistant. "
-                        "Only respond to questions strictly related to fitness, health, workouts, nutrition, or diet. "
-                        "If the question is unrelated to fitness, politely refuse to answer and remind the user "
-                        "that you are only trained to help with fitness-related topics."
-                    )
-                },
-                {"role": "user", "content": user_message}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return create_completion("chat", [
+            {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+            *(context or []),
+            {"role": "user", "content": user_message}
+        ])
     except Exception as e:
         return f"⚠️ Error: {str(e)}"
@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from app.config.settings import settings
+
+
+def cassette_key(model: str, messages: list) -> str:
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCassette:
+    """
+    Prompt -> response store for deterministic offline runs. Entries are gzipped
+    JSON lines keyed by a hash of the model and messages. In "record" mode real
+    completions are appended as they happen; in "replay" mode they are served back
+    with an optional simulated latency:
+
+    - "none": return immediately
+    - "recorded": sleep for the latency measured when the entry was recorded
+    - "gauss": sleep for N(LLM_CASSETTE_LATENCY_MS, LLM_CASSETTE_JITTER_MS)
+
+    The sleep blocks like the HTTP call it stands in for, so async routes must
+    call get_groq_response through run_in_threadpool either way.
+    """
+
+    def __init__(self, path: str, mode: str, latency: str = "none",
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, model: str, call: str, messages: list, response: str,
+               latency_ms: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+        entry = {
+            "key": cassette_key(model, messages),
+            "call": call,
+            "response": response,
+            "latency_ms": round(latency_ms, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Each append adds a gzip member; gzip.open reads them back as one stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def replay(self, model: str, messages: list) -> dict:
+        entry = self._entries.get(cassette_key(model, messages))
+        if entry is None:
+            raise LookupError(f"No cassette entry for this prompt in {self.path}")
+
+        delay_ms = 0.0
+        if self.latency == "recorded":
+            delay_ms = entry.get("latency_ms", 0.0)
+        elif self.latency == "gauss":
+            delay_ms = max(0.0, random.gauss(self.latency_ms, self.jitter_ms))
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        return entry
+
+
+_cassette = None
+
+
+def get_cassette() -> Optional[LLMCassette]:
+    global _cassette
+    if settings.LLM_CASSETTE_MODE not in ("record", "replay"):
+        return None
+    if _cassette is None:
+        _cassette = LLMCassette(
+            path=settings.LLM_CASSETTE_PATH,
+            mode=settings.LLM_CASSETTE_MODE,
+            latency=settings.LLM_CASSETTE_LATENCY,
+            latency_ms=settings.LLM_CASSETTE_LATENCY_MS,
+            jitter_ms=settings.LLM_CASSETTE_JITTER_MS,
+        )
+    return _cassette
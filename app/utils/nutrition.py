@@ -0,0 +1,152 @@
+from array import array
+from typing import Optional
+
+# Mifflin-St Jeor sex constant; "other" takes the midpoint
+SEX_OFFSETS = {"male": 5.0, "female": -161.0, "other": -78.0}
+ACTIVITY_MULTIPLIERS = {"sedentary": 1.2, "light": 1.375, "moderate": 1.55, "active": 1.725, "very_active": 1.9}
+# Goal -> (calorie factor on TDEE, protein grams per kg of body weight)
+GOAL_ADJUSTMENTS = {"lose": (0.80, 2.0), "maintain": (1.0, 1.6), "gain": (1.10, 1.8)}
+FAT_SHARE = 0.25
+MIN_CALORIES = {"male": 1500, "female": 1200, "other": 1200}
+# Days within this fraction of the calorie target count as fully adherent
+CALORIE_TOLERANCE = 0.10
+# ...and score nothing this far off
+CALORIE_ZERO_SCORE = 0.50
+
+
+def sex_key(gender) -> str:
+    text = str(gender or "").strip().lower()
+    if text in ("male", "m", "man"):
+        return "male"
+    if text in ("female", "f", "woman"):
+        return "female"
+    return "other"
+
+
+def activity_key(activity_level) -> Optional[str]:
+    """Maps the free-text levels used across the forms ("Moderately Active", "very_active") to a multiplier key."""
+    text = str(activity_level or "").strip().lower().replace("_", " ").replace("-", " ")
+    if not text:
+        return None
+    if "very" in text or "extra" in text or "athlete" in text:
+        return "very_active"
+    if "sedentary" in text or "inactive" in text:
+        return "sedentary"
+    if "light" in text:
+        return "light"
+    if "moderate" in text:
+        return "moderate"
+    if "active" in text:
+        return "active"
+    return None
+
+
+def goal_key(goal) -> str:
+    text = str(goal or "").strip().lower()
+    # Gain first, so "lean muscle" or "build muscle, lose fat" keep their calorie surplus
+    if any(word in text for word in ("gain", "muscle", "bulk", "build", "mass", "strength")):
+        return "gain"
+    if any(word in text for word in ("lose", "loss", "fat", "cut", "slim", "lean")):
+        return "lose"
+    return "maintain"
+
+
+def profile_inputs(profile: dict) -> Optional[tuple]:
+    """(weight, height, age, sex, activity, goal, body fat %) from a profile or request, None if incomplete."""
+    try:
+        weight = float(profile.get("weight") or profile.get("weight_kg"))
+        height = float(profile.get("height") or profile.get("height_cm"))
+        age = float(profile["age"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    activity = activity_key(profile.get("activity_level"))
+    if weight <= 0 or height <= 0 or age <= 0 or activity is None:
+        return None
+    goal = goal_key(profile.get("goal") or profile.get("fitness_goal"))
+    body_fat = profile.get("body_fat_pct")
+    return weight, height, age, sex_key(profile.get("gender")), activity, goal, float(body_fat or 0)
+
+
+def targets_for_profiles(profiles: list) -> list:
+    """
+    Daily energy and macro targets for many profiles at once, or None for a
+    profile missing weight, height, age or a recognisable activity level.
+
+    BMR is Katch-McArdle when the profile has body_fat_pct, Mifflin-St Jeor
+    otherwise. TDEE applies the activity multiplier; the calorie target
+    applies the goal adjustment, floored at a safe minimum. Protein is set
+    per kg of body weight, fat as a share of calories, carbs take the rest.
+
+    Each profile's inputs are parsed once into stdlib arrays; every step is
+    then an ordinary Python loop over them (numpy is not a dependency).
+    """
+    inputs = [profile_inputs(profile) for profile in profiles]
+    rows = [row for row in inputs if row is not None]
+    if not rows:
+        return [None] * len(profiles)
+
+    columns = list(zip(*rows))
+    weights, heights, ages, body_fats = (array("d", columns[i]) for i in (0, 1, 2, 6))
+    sexes, activities, goals = columns[3:6]
+
+    bmrs = array("d", (
+        370 + 21.6 * w * (1 - bf / 100) if 0 < bf < 70 else 10 * w + 6.25 * h - 5 * a + SEX_OFFSETS[s]
+        for w, h, a, s, bf in zip(weights, heights, ages, sexes, body_fats)
+    ))
+    tdees = array("d", (bmr * ACTIVITY_MULTIPLIERS[act] for bmr, act in zip(bmrs, activities)))
+    calories = array("d", (
+        max(MIN_CALORIES[s], tdee * GOAL_ADJUSTMENTS[g][0]) for tdee, s, g in zip(tdees, sexes, goals)
+    ))
+    proteins = array("d", (w * GOAL_ADJUSTMENTS[g][1] for w, g in zip(weights, goals)))
+    fats = array("d", (kcal * FAT_SHARE / 9 for kcal in calories))
+    carbs = array("d", (max(0.0, (kcal - 4 * p - 9 * f) / 4) for kcal, p, f in zip(calories, proteins, fats)))
+
+    computed = iter(zip(bmrs, tdees, calories, proteins, carbs, fats, body_fats, goals))
+    results = []
+    for row in inputs:
+        if row is None:
+            results.append(None)
+            continue
+        bmr, tdee, kcal, protein, carb, fat, body_fat, goal = next(computed)
+        results.append({
+            "method": "katch_mcardle" if 0 < body_fat < 70 else "mifflin_st_jeor",
+            "goal": goal,
+            "bmr": round(bmr),
+            "tdee": round(tdee),
+            "calories": round(kcal),
+            "protein_g": round(protein),
+            "carbs_g": round(carb),
+            "fat_g": round(fat),
+        })
+    return results
+
+
+def daily_targets(profile: dict) -> Optional[dict]:
+    return targets_for_profiles([profile])[0]
+
+
+def targets_prompt(targets: dict) -> str:
+    """Fixed numbers for an LLM prompt, so the model uses them instead of estimating its own."""
+    return (
+        f"Daily targets (already calculated, use these exact numbers and do not recalculate):\n"
+        f"- Calories: {targets['calories']} kcal\n"
+        f"- Protein: {targets['protein_g']} g, Carbs: {targets['carbs_g']} g, Fat: {targets['fat_g']} g"
+    )
+
+
+def calorie_score(total, target) -> Optional[float]:
+    """
+    0..1 score of one day's calorie total against the target: within
+    CALORIE_TOLERANCE scores 1, falling linearly to 0 at CALORIE_ZERO_SCORE
+    off. None without a positive total and target.
+    """
+    try:
+        total, target = float(total), float(target)
+    except (TypeError, ValueError):
+        return None
+    if total <= 0 or target <= 0:
+        return None
+    off = abs(total - target) / target
+    if off <= CALORIE_TOLERANCE:
+        return 1.0
+    return max(0.0, 1 - (off - CALORIE_TOLERANCE) / (CALORIE_ZERO_SCORE - CALORIE_TOLERANCE))
@@ -0,0 +1,85 @@
+import gzip
+import json
+from typing import Any, Mapping
+
+from bson import ObjectId
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Canonical JSON rendering, byte-for-byte what JSONResponse would send.
+    """
+    return json.dumps(
+        jsonable_encoder(content, custom_encoder={ObjectId: str}),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def render_payload(content: Any) -> dict:
+    """
+    Renders a response body once and keeps every encoding we can serve,
+    so it can be stored next to the document it was built from.
+    """
+    body = render_json(content)
+    rendered = {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        rendered["br"] = brotli.compress(body, quality=11)
+    return rendered
+
+
+def negotiate_encoding(accept_encoding: str, available: Mapping[str, bytes]) -> str:
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding] = q
+
+    def quality(coding: str) -> float:
+        return qualities.get(coding, qualities.get("*", 0.0))
+
+    candidates = [
+        coding for coding in ENCODING_PREFERENCE
+        if coding != "identity" and coding in available and quality(coding) > 0
+    ]
+    if not candidates:
+        return "identity"
+    return max(candidates, key=lambda coding: (quality(coding), -ENCODING_PREFERENCE.index(coding)))
+
+
+def precompressed_response(request: Request, rendered: Mapping[str, bytes], status_code: int = 200) -> Response:
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), rendered)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=bytes(rendered[encoding]),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )